@@ -0,0 +1,84 @@
+"""Micro-benchmark of reading every schema field of a car.
+
+Compares the nested ``_vehicle_data.get(section, {}).get(key)`` lookups the
+properties used to do against the generated TeslaCar properties and direct
+reads from ``TeslaCar.fields``, and reports the cost of reloading the fields
+after a poll.
+
+Usage:
+    python -m benchmarks.car_reads [--number 20000]
+"""
+import argparse
+import timeit
+
+from teslajsonpy.car import TeslaCar
+from teslajsonpy.schema import VEHICLE_FIELDS
+
+from tests.tesla_mock import PRODUCT_LIST, VEHICLE_DATA
+
+NAMES = tuple(field.name for field in VEHICLE_FIELDS)
+LOOKUPS = tuple(
+    (field.section, field.key, field.default) for field in VEHICLE_FIELDS
+)
+
+
+class LegacyCar:
+    """Car with properties written the way TeslaCar had them by hand."""
+
+    def __init__(self, vehicle_data: dict) -> None:
+        """Initialize LegacyCar."""
+        self._vehicle_data = vehicle_data
+
+
+for _name, (_section, _key, _default) in zip(NAMES, LOOKUPS):
+    _lookup = (
+        f"self._vehicle_data.get({_key!r}, {_default!r})"
+        if _section is None
+        else f"self._vehicle_data.get({_section!r}, {{}}).get({_key!r}, {_default!r})"
+    )
+    _getter = eval(f"lambda self: {_lookup}")  # pylint: disable=eval-used
+    setattr(LegacyCar, _name, property(_getter))
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=20000)
+    args = parser.parse_args()
+
+    car = TeslaCar(PRODUCT_LIST[0], None, VEHICLE_DATA)
+    legacy_car = LegacyCar(VEHICLE_DATA)
+    fields = car.fields
+    assert [getattr(legacy_car, name) for name in NAMES] == [
+        getattr(car, name) for name in NAMES
+    ]
+
+    # Unrolled reads so attribute access is measured rather than getattr
+    properties = eval(  # pylint: disable=eval-used
+        "lambda car: [" + ", ".join(f"car.{name}" for name in NAMES) + "]"
+    )
+    direct = eval(  # pylint: disable=eval-used
+        "lambda fields: [" + ", ".join(f"fields.{name}" for name in NAMES) + "]"
+    )
+    results = {
+        "legacy properties": timeit.timeit(
+            lambda: properties(legacy_car), number=args.number
+        ),
+        "TeslaCar properties": timeit.timeit(
+            lambda: properties(car), number=args.number
+        ),
+        "TeslaCar.fields": timeit.timeit(lambda: direct(fields), number=args.number),
+    }
+    refresh = timeit.timeit(car.refresh_state, number=args.number)
+    legacy = results["legacy properties"]
+    print(f"full car read of {len(NAMES)} fields")
+    for name, elapsed in results.items():
+        print(
+            f"{name:<20} {elapsed / args.number * 1e6:7.2f} us"
+            f"  speedup {legacy / elapsed:4.2f}x"
+        )
+    print(f"refresh_state() per poll {refresh / args.number * 1e6:7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Memory per car of decoded versus compact VEHICLE_DATA.
+
+Decodes one VEHICLE_DATA response per car, as Connection does, and keeps it
+either verbatim or through compact_vehicle_data, then reports the traced
+memory per car and the decode time.
+
+Usage:
+    python -m benchmarks.compact_memory [--cars 1000]
+"""
+import argparse
+import copy
+import gc
+import time
+import tracemalloc
+
+import orjson
+
+from teslajsonpy.compact import compact_vehicle_data
+
+from tests.tesla_mock import VEHICLE_DATA
+
+
+def _responses(cars: int) -> list:
+    """Return a distinct encoded response per car."""
+    responses = []
+    for index in range(cars):
+        data = copy.deepcopy(VEHICLE_DATA)
+        data["vin"] = f"5YJSA1{index:011d}"
+        data["charge_state"]["battery_level"] = index % 100
+        responses.append(orjson.dumps(data))  # pylint: disable=no-member
+    return responses
+
+
+def _decode(responses: list, compact: bool) -> list:
+    """Decode and keep every response."""
+    kept = []
+    for body in responses:
+        data = orjson.loads(body)  # pylint: disable=no-member
+        kept.append(compact_vehicle_data(data) if compact else data)
+    return kept
+
+
+def _measure(responses: list, compact: bool):
+    """Return bytes per car and seconds per decode."""
+    start = time.perf_counter()
+    _decode(responses, compact)
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    kept = _decode(responses, compact)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    del kept
+    return used / len(responses), elapsed / len(responses)
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cars", type=int, default=1000)
+    args = parser.parse_args()
+
+    responses = _responses(args.cars)
+    print(f"{args.cars} cars, {len(responses[0])} byte responses")
+    for name, compact in (("decoded dicts", False), ("compact + raw", True)):
+        per_car, per_decode = _measure(responses, compact)
+        print(
+            f"{name:<14} {per_car / 1024:7.1f} KiB/car"
+            f"  {per_decode * 1e6:7.1f} us/decode"
+        )
+
+
+if __name__ == "__main__":
+    main()
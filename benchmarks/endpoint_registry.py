@@ -0,0 +1,66 @@
+"""Micro-benchmark of endpoint lookup and URI building.
+
+Compares the per-controller endpoints.json dict lookup and str.format used
+before the shared registry against EndpointRegistry.build_url.
+
+Usage:
+    python -m benchmarks.endpoint_registry [--number 200000]
+"""
+import argparse
+import pkgutil
+import timeit
+
+import orjson
+
+from teslajsonpy.endpoints import get_endpoint_registry
+
+CALLS = [
+    ("VEHICLE_DATA", {"vehicle_id": "5YJSA11111111111"}),
+    ("WAKE_UP", {"vehicle_id": "5YJSA11111111111"}),
+    ("SITE_DATA", {"site_id": 12345678}),
+    ("PRODUCT_LIST", {}),
+]
+
+
+def legacy_build_url(endpoints: dict, name: str, path_vars: dict):
+    """Resolve an endpoint the way Controller.api did with the raw json."""
+    endpoint = endpoints[name]
+    if endpoint.get("CONTENT", "JSON") != "JSON" or name == "STATUS":
+        raise NotImplementedError(f"Endpoint {name} not implemented")
+    uri = endpoint["URI"].format(**path_vars)
+    return endpoint["TYPE"].lower(), uri
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=200000)
+    args = parser.parse_args()
+
+    data = pkgutil.get_data("teslajsonpy", "endpoints.json")
+    load = timeit.timeit(lambda: orjson.loads(data), number=100) / 100
+    print(f"parse endpoints.json per controller: {load * 1e6:9.1f} us")
+
+    endpoints = orjson.loads(data)
+    registry = get_endpoint_registry()
+    for name, path_vars in CALLS:
+        assert legacy_build_url(endpoints, name, path_vars) == registry.build_url(
+            name, path_vars
+        )
+        legacy = timeit.timeit(
+            lambda n=name, p=path_vars: legacy_build_url(endpoints, n, p),
+            number=args.number,
+        )
+        compiled = timeit.timeit(
+            lambda n=name, p=path_vars: registry.build_url(n, p),
+            number=args.number,
+        )
+        print(
+            f"{name:<14} legacy {legacy / args.number * 1e9:7.0f} ns"
+            f"  registry {compiled / args.number * 1e9:7.0f} ns"
+            f"  speedup {legacy / compiled:4.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
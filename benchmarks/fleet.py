@@ -0,0 +1,285 @@
+"""Fleet scale benchmark of Controller against a local Tesla API stand-in.
+
+Exercises the real request path, Connection.__open, JSON decode, tenacity
+retries and the update locks, instead of the monkeypatched Controller.api of
+tests/tesla_mock.py. Reports throughput, p50/p99 latency and memory per
+vehicle for generate_car_objects(), update(), commands and websocket parsing.
+
+Usage:
+    python -m benchmarks.fleet --vehicles 1 10 100 1000 --latency 0.02
+    python -m benchmarks.fleet --url http://127.0.0.1:8765 --vehicles 100
+"""
+import argparse
+import asyncio
+import gc
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import aiohttp
+import httpx
+import orjson
+
+from teslajsonpy.controller import Controller
+
+from benchmarks.server import TeslaStandIn
+
+
+def _percentile(samples: List[float], percent: float) -> float:
+    """Return the nearest rank percentile of samples."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, round(percent / 100 * (len(ordered) - 1)))]
+
+
+def _stats(name: str, count: int, elapsed: float, latencies: List[float]) -> Dict:
+    """Return a result row for a phase."""
+    return {
+        "phase": name,
+        "count": count,
+        "seconds": elapsed,
+        "per_second": count / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50) * 1000,
+        "p99_ms": _percentile(latencies, 99) * 1000,
+        "mean_ms": statistics.fmean(latencies) * 1000 if latencies else 0.0,
+    }
+
+
+class RequestTimer:
+    """httpx event hooks recording the time to response headers of each request."""
+
+    def __init__(self) -> None:
+        """Initialize RequestTimer."""
+        self.latencies: List[float] = []
+        self.statuses: Dict[int, int] = {}
+
+    async def on_request(self, request: httpx.Request) -> None:
+        """Stamp the request start."""
+        request.extensions["benchmark_start"] = time.perf_counter()
+
+    async def on_response(self, response: httpx.Response) -> None:
+        """Record latency and status."""
+        start = response.request.extensions.get("benchmark_start")
+        if start is not None:
+            self.latencies.append(time.perf_counter() - start)
+        self.statuses[response.status_code] = (
+            self.statuses.get(response.status_code, 0) + 1
+        )
+
+    def reset(self) -> None:
+        """Forget recorded requests."""
+        self.latencies.clear()
+        self.statuses.clear()
+
+
+def _controller(
+    url: str, timer: RequestTimer, max_concurrency: int, compact: bool = False
+) -> Controller:
+    """Return a Controller pointed at the stand-in."""
+    websession = httpx.AsyncClient(
+        timeout=60,
+        limits=httpx.Limits(max_keepalive_connections=max(20, max_concurrency)),
+        event_hooks={"request": [timer.on_request], "response": [timer.on_response]},
+    )
+    return Controller(
+        websession,
+        access_token="benchmark",
+        refresh_token="benchmark",
+        expiration=int(time.time()) + 86400,
+        update_interval=0,
+        api_proxy_url=url,
+        max_concurrency=max_concurrency,
+        compact_vehicle_data=compact,
+    )
+
+
+async def _timed(calls: List[Callable], concurrency: int) -> List[float]:
+    """Await calls with bounded concurrency; return the latency of each call."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+
+    async def _run(call: Callable) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                await call()
+            except Exception:  # pylint: disable=broad-except
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(_run(call) for call in calls))
+    return latencies
+
+
+async def _stream_parse(controller: Controller, url: str, frames: int) -> Dict:
+    """Receive streaming frames for every vehicle and time their processing."""
+    latencies: List[float] = []
+    received = 0
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(f"{url}/streaming/") as websocket:
+            for vin in controller.cars:
+                await websocket.send_json(
+                    {
+                        "msg_type": "data:subscribe_oauth",
+                        "token": "benchmark",
+                        "value": "shift_state,speed",
+                        "tag": controller.vin_to_vehicle_id(vin),
+                    }
+                )
+            start = time.perf_counter()
+            async for msg in websocket:
+                parse_start = time.perf_counter()
+                data = orjson.loads(msg.data)  # pylint: disable=no-member
+                # pylint: disable=protected-access
+                controller._process_websocket_message(data)
+                latencies.append(time.perf_counter() - parse_start)
+                received += 1
+                if received >= frames:
+                    break
+            elapsed = time.perf_counter() - start
+    return _stats("stream frames", received, elapsed, latencies)
+
+
+async def _memory_per_vehicle(url: str, vehicles: int, compact: bool) -> float:
+    """Return bytes allocated per vehicle by connect, generate and one update."""
+    gc.collect()
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    controller = _controller(url, RequestTimer(), 1, compact)
+    await controller.connect()
+    await controller.generate_car_objects()
+    await controller.generate_energysite_objects()
+    await controller.update(force=True)
+    gc.collect()
+    used = tracemalloc.get_traced_memory()[0] - baseline
+    tracemalloc.stop()
+    await controller.disconnect()
+    return used / max(1, vehicles)
+
+
+async def run(
+    vehicles: int,
+    args: argparse.Namespace,
+    url: Optional[str] = None,
+) -> List[Dict]:
+    """Run every phase for a fleet size and return the result rows."""
+    server = None
+    if url is None:
+        server = TeslaStandIn(
+            vehicles=vehicles,
+            sites=args.sites,
+            latency=args.latency,
+            jitter=args.jitter,
+            error_rate=args.error_rate,
+        )
+        url = await server.start()
+    timer = RequestTimer()
+    controller = _controller(url, timer, args.concurrency, args.compact)
+    results = []
+    try:
+        start = time.perf_counter()
+        await controller.connect()
+        await controller.generate_car_objects()
+        await controller.generate_energysite_objects()
+        elapsed = time.perf_counter() - start
+        results.append(
+            _stats("generate_car_objects", len(controller.cars), elapsed, timer.latencies)
+        )
+
+        timer.reset()
+        round_latencies = []
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            round_start = time.perf_counter()
+            await controller.update(force=True)
+            round_latencies.append(time.perf_counter() - round_start)
+        elapsed = time.perf_counter() - start
+        results.append(_stats("update() rounds", args.rounds, elapsed, round_latencies))
+        results.append(
+            _stats("update() requests", len(timer.latencies), elapsed, timer.latencies)
+        )
+
+        timer.reset()
+        cars = list(controller.cars.values())
+        start = time.perf_counter()
+        latencies = await _timed(
+            [car.honk_horn for car in cars for _ in range(args.commands)],
+            args.concurrency,
+        )
+        results.append(
+            _stats("commands", len(latencies), time.perf_counter() - start, latencies)
+        )
+
+        if server and args.frames:
+            results.append(
+                await _stream_parse(controller, url, args.frames * len(cars))
+            )
+    finally:
+        await controller.disconnect()
+    if args.memory:
+        results.append(
+            {
+                "phase": "memory per vehicle",
+                "count": vehicles,
+                "bytes": await _memory_per_vehicle(url, vehicles, args.compact),
+            }
+        )
+    if server:
+        await server.stop()
+    for row in results:
+        row["vehicles"] = vehicles
+    return results
+
+
+def _print(results: List[Dict]) -> None:
+    """Print result rows as a table."""
+    print(
+        f"{'vehicles':>8} {'phase':<22} {'count':>7} {'per sec':>10} "
+        f"{'p50 ms':>9} {'p99 ms':>9}"
+    )
+    for row in results:
+        if "bytes" in row:
+            print(
+                f"{row['vehicles']:>8} {row['phase']:<22} {row['count']:>7} "
+                f"{row['bytes'] / 1024:>9.1f} KiB"
+            )
+            continue
+        print(
+            f"{row['vehicles']:>8} {row['phase']:<22} {row['count']:>7} "
+            f"{row['per_second']:>10.1f} {row['p50_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument(
+        "--compact", action="store_true", help="use compact_vehicle_data"
+    )
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--commands", type=int, default=1)
+    parser.add_argument("--frames", type=int, default=20, help="frames per vehicle")
+    parser.add_argument("--no-memory", dest="memory", action="store_false")
+    parser.add_argument("--url", help="use a running benchmarks.server")
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args()
+
+    results = []
+    for vehicles in args.vehicles:
+        results.extend(asyncio.run(run(vehicles, args, args.url)))
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())  # pylint: disable=no-member
+    else:
+        _print(results)
+
+
+if __name__ == "__main__":
+    main()
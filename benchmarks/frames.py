@@ -0,0 +1,133 @@
+"""Micro-benchmark of decoding streaming data:update frames.
+
+Compares the per-frame loop over (name, type) pairs building a dict that
+Controller._process_websocket_message used to run against FrameDecoder.decode
+and FrameDecoder.decode_batch, then times the controller applying frames.
+
+Usage:
+    python -m benchmarks.frames [--frames 20000] [--vehicles 100] [--repeat 5]
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.frames import FrameDecoder
+
+from tests.tesla_mock import PRODUCT_LIST, VEHICLE_DATA
+
+LEGACY_KEYS = [
+    ("timestamp", int),
+    ("shift_state", str),
+    ("speed", int),
+    ("power", int),
+    ("est_lat", float),
+    ("est_lng", float),
+    ("est_heading", int),
+    ("est_corrected_lat", float),
+    ("est_corrected_lng", float),
+    ("native_latitude", float),
+    ("native_longitude", float),
+    ("native_heading", float),
+    ("native_type", str),
+    ("native_location_supported", int),
+]
+
+
+def legacy_decode(value: str) -> Dict:
+    """Decode a value the way the controller used to."""
+    update_json = {}
+    for num, part in enumerate(value.split(",")):
+        update_json[LEGACY_KEYS[num][0]] = LEGACY_KEYS[num][1](part) if part else None
+    return update_json
+
+
+def _messages(frames: int, vehicles: int) -> List[dict]:
+    return [
+        {
+            "msg_type": "data:update",
+            "tag": str(100 + i % vehicles),
+            "value": (
+                f"{1650000000000 + i},D,{i % 120},{i % 90},37.1,-122.1,90,37.2,"
+                f"-122.2,37.3,-122.3,91.5,wgs,1"
+            ),
+        }
+        for i in range(frames)
+    ]
+
+
+def _time(label: str, func, frames: int, repeat: int) -> None:
+    """Print the best time per frame of repeat runs of func."""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    print(f"{label:<28} {elapsed / frames * 1e6:8.2f} us/frame")
+
+
+async def _controller(vehicles: int) -> Controller:
+    """Return a controller with vehicles cars and no API access."""
+    controller = Controller(None)
+    # pylint: disable=protected-access
+    controller._vehicle_list = [
+        dict(PRODUCT_LIST[0], id=str(i), vehicle_id=str(100 + i), vin=f"VIN{i:014d}")
+        for i in range(vehicles)
+    ]
+
+    async def _get_vehicle_data(vin, wake_if_asleep=False):
+        # pylint: disable=unused-argument
+        return dict(VEHICLE_DATA, vin=vin)
+
+    controller.get_vehicle_data = _get_vehicle_data
+    await controller.generate_car_objects()
+    return controller
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--frames", type=int, default=20000)
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    messages = _messages(args.frames, args.vehicles)
+    values = [message["value"] for message in messages]
+    decoder = FrameDecoder()
+    decode = decoder.decode
+    assert decoder.as_dict(decode(values[0])) == legacy_decode(values[0])
+
+    _time(
+        "legacy loop",
+        lambda: [legacy_decode(value) for value in values],
+        args.frames,
+        args.repeat,
+    )
+    _time(
+        "FrameDecoder.decode",
+        lambda: [decode(value) for value in values],
+        args.frames,
+        args.repeat,
+    )
+    _time(
+        "FrameDecoder.decode_batch",
+        lambda: decoder.decode_batch(messages),
+        args.frames,
+        args.repeat,
+    )
+
+    controller = asyncio.run(_controller(args.vehicles))
+    # pylint: disable=protected-access
+    process = controller._process_websocket_message
+    _time(
+        "controller per frame",
+        lambda: [process(message) for message in messages],
+        args.frames,
+        args.repeat,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""Record API traffic and replay it offline to profile update() and streaming.
+
+``record`` runs a Controller against a local Tesla API stand-in, or a
+running server given by --url, and writes its REST traffic and streaming
+messages to a recording. ``replay`` feeds a recording back through
+ReplayTransport at recorded or accelerated speed and times
+generate_car_objects(), update() rounds and the streaming path, optionally
+under cProfile.
+
+Usage:
+    python -m benchmarks.replay record session.jsonl.gz --vehicles 100
+    python -m benchmarks.replay replay session.jsonl.gz --rounds 20 --profile
+"""
+import argparse
+import asyncio
+import cProfile
+import pstats
+import time
+
+import aiohttp
+import httpx
+import orjson
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.recording import ReplayTransport, TrafficRecorder
+
+from benchmarks.server import TeslaStandIn
+
+
+def _controller(url: str, **kwargs) -> Controller:
+    return Controller(
+        access_token="benchmark",
+        refresh_token="benchmark",
+        expiration=int(time.time()) + 86400,
+        update_interval=0,
+        api_proxy_url=url,
+        **kwargs,
+    )
+
+
+async def _record_messages(
+    recorder: TrafficRecorder, controller: Controller, url: str, frames: int
+) -> None:
+    """Record streaming frames for every vehicle."""
+    received = 0
+    async with aiohttp.ClientSession() as session:
+        async with session.ws_connect(f"{url}/streaming/") as websocket:
+            for vin in controller.cars:
+                await websocket.send_json(
+                    {
+                        "msg_type": "data:subscribe_oauth",
+                        "token": "benchmark",
+                        "value": "shift_state,speed",
+                        "tag": controller.vin_to_vehicle_id(vin),
+                    }
+                )
+            async for msg in websocket:
+                # pylint: disable=no-member
+                recorder.record_message(orjson.loads(msg.data))
+                received += 1
+                if received >= frames:
+                    break
+
+
+async def record(args: argparse.Namespace) -> None:
+    """Write a recording."""
+    server = None
+    url = args.url
+    if not url:
+        server = TeslaStandIn(
+            vehicles=args.vehicles, latency=args.latency, stream_interval=0.05
+        )
+        url = await server.start()
+    with TrafficRecorder(args.path) as recorder:
+        controller = _controller(url, recorder=recorder)
+        try:
+            await controller.connect()
+            await controller.generate_car_objects()
+            await controller.generate_energysite_objects()
+            for _ in range(args.rounds):
+                await controller.update(force=True)
+            if args.frames:
+                await _record_messages(
+                    recorder, controller, url, args.frames * len(controller.cars)
+                )
+        finally:
+            await controller.disconnect()
+    if server:
+        await server.stop()
+    print(f"Recorded {recorder.entries} entries to {args.path}")
+
+
+async def replay(args: argparse.Namespace) -> None:
+    """Replay a recording and print timings."""
+    transport = ReplayTransport(args.path, speed=args.speed)
+    controller = _controller(
+        "http://replay",
+        websession=httpx.AsyncClient(transport=transport),
+        max_concurrency=args.concurrency,
+    )
+    try:
+        start = time.perf_counter()
+        await controller.connect()
+        await controller.generate_car_objects()
+        await controller.generate_energysite_objects()
+        elapsed = time.perf_counter() - start
+        print(f"generate_car_objects  {len(controller.cars):>6} cars {elapsed:8.3f} s")
+
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            await controller.update(force=True)
+        elapsed = time.perf_counter() - start
+        print(
+            f"update() rounds       {args.rounds:>6}      "
+            f"{elapsed / args.rounds * 1000:8.2f} ms/round"
+        )
+
+        # pylint: disable=protected-access
+        start = time.perf_counter()
+        frames = await transport.replay_messages(controller._process_websocket_message)
+        elapsed = time.perf_counter() - start
+        if frames:
+            print(
+                f"stream messages       {frames:>6}      "
+                f"{elapsed / frames * 1e6:8.2f} us/message"
+            )
+        if transport.unmatched:
+            print(f"unrecorded requests   {transport.unmatched:>6}")
+    finally:
+        await controller.disconnect()
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+    record_parser = commands.add_parser("record")
+    record_parser.add_argument("path")
+    record_parser.add_argument("--vehicles", type=int, default=10)
+    record_parser.add_argument("--latency", type=float, default=0.0)
+    record_parser.add_argument("--rounds", type=int, default=3)
+    record_parser.add_argument("--frames", type=int, default=20, help="per vehicle")
+    record_parser.add_argument("--url", help="use a running benchmarks.server")
+    replay_parser = commands.add_parser("replay")
+    replay_parser.add_argument("path")
+    replay_parser.add_argument("--rounds", type=int, default=10)
+    replay_parser.add_argument(
+        "--speed", type=float, default=0.0, help="1 for recorded timing, 0 for none"
+    )
+    replay_parser.add_argument("--concurrency", type=int, default=1)
+    replay_parser.add_argument("--profile", action="store_true")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        asyncio.run(record(args))
+        return
+    if not args.profile:
+        asyncio.run(replay(args))
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    asyncio.run(replay(args))
+    profiler.disable()
+    pstats.Stats(profiler).sort_stats("cumulative").print_stats(25)
+
+
+if __name__ == "__main__":
+    main()
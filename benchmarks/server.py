@@ -0,0 +1,307 @@
+"""Local stand-in for the Tesla owner API used by the benchmarks.
+
+Serves PRODUCT_LIST, VEHICLE_DATA, VEHICLE_SUMMARY, WAKE_UP, vehicle commands,
+SITE_DATA, SITE_CONFIG, SITE_SUMMARY and the streaming websocket for a
+generated fleet, with configurable latency and error rate.
+
+Usage:
+    python -m benchmarks.server --vehicles 100 --sites 10 --port 8765
+"""
+import argparse
+import asyncio
+import copy
+import random
+import time
+from typing import Dict, List, Optional
+
+from aiohttp import WSMsgType, web
+import orjson
+
+from tests.tesla_mock import (
+    PRODUCT_LIST,
+    SITE_CONFIG,
+    SITE_DATA,
+    SITE_SUMMARY,
+    VEHICLE_DATA,
+)
+
+STREAM_COLUMNS = (
+    "shift_state,speed,power,est_lat,est_lng,est_heading,est_corrected_lat,"
+    "est_corrected_lng,native_latitude,native_longitude,native_heading,"
+    "native_type,native_location_supported"
+)
+ERRORS = (
+    (408, {"response": None, "error": "vehicle unavailable", "error_description": ""}),
+    (500, {"response": None, "error": "server error", "error_description": ""}),
+    (504, {"response": None, "error": "upstream_timeout", "error_description": ""}),
+)
+
+
+def make_vin(index: int) -> str:
+    """Return a 17 character VIN for a fleet index."""
+    return f"5YJSA1{index:011d}"
+
+
+class TeslaStandIn:
+    """Tesla API stand-in serving a generated fleet."""
+
+    def __init__(
+        self,
+        vehicles: int = 10,
+        sites: int = 1,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        asleep_rate: float = 0.0,
+        wake_delay: float = 0.0,
+        stream_interval: float = 0.0,
+        seed: int = 0,
+    ) -> None:
+        """Initialize the stand-in.
+
+        Args
+            vehicles: Number of vehicles in the fleet
+            sites: Number of energy sites, alternating solar and battery
+            latency: Seconds added to every REST response
+            jitter: Maximum random seconds added on top of latency
+            error_rate: Fraction of vehicle data requests answered with an error
+            asleep_rate: Fraction of vehicles initially asleep
+            wake_delay: Seconds a WAKE_UP takes before the vehicle is online
+            stream_interval: Seconds between streaming frames per vehicle
+            seed: Random seed
+
+        """
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.wake_delay = wake_delay
+        self.stream_interval = stream_interval
+        self.random = random.Random(seed)
+        self.requests: Dict[str, int] = {}
+        self.frames_sent = 0
+        self.products: List[dict] = []
+        self.vehicles: Dict[str, dict] = {}
+        self.vehicle_data: Dict[str, bytes] = {}
+        self.sites: Dict[str, dict] = {}
+        for index in range(vehicles):
+            vin = make_vin(index)
+            car = copy.deepcopy(PRODUCT_LIST[0])
+            car.update(
+                id=10**16 + index,
+                id_s=str(10**16 + index),
+                vehicle_id=10**9 + index,
+                vin=vin,
+                display_name=f"Car {index}",
+                state="asleep" if self.random.random() < asleep_rate else "online",
+            )
+            self.products.append(car)
+            self.vehicles[vin] = car
+            data = copy.deepcopy(VEHICLE_DATA)
+            data.update(
+                id=car["id"],
+                id_s=car["id_s"],
+                vehicle_id=car["vehicle_id"],
+                vin=vin,
+                display_name=car["display_name"],
+            )
+            data["charge_state"]["battery_level"] = self.random.randint(10, 100)
+            self.vehicle_data[vin] = orjson.dumps(  # pylint: disable=no-member
+                {"response": data}
+            )
+        for index in range(sites):
+            site = copy.deepcopy(PRODUCT_LIST[1 + index % 2])
+            site["energy_site_id"] = 10**5 + index
+            self.products.append(site)
+            self.sites[str(site["energy_site_id"])] = site
+        self._products = orjson.dumps(  # pylint: disable=no-member
+            {"response": self.products, "count": len(self.products)}
+        )
+        self.app = web.Application(middlewares=[self._middleware])
+        self.app.add_routes(
+            [
+                web.get("/api/1/products", self.product_list),
+                web.get("/api/1/vehicles/{vin}", self.vehicle_summary),
+                web.get("/api/1/vehicles/{vin}/vehicle_data", self.vehicle_data_),
+                web.post("/api/1/vehicles/{vin}/wake_up", self.wake_up),
+                web.post("/api/1/vehicles/{vin}/command/{command}", self.command),
+                web.get("/api/1/energy_sites/{site_id}/live_status", self.site_data),
+                web.get("/api/1/energy_sites/{site_id}/site_info", self.site_config),
+                web.get("/api/1/energy_sites/{site_id}/site_status", self.site_summary),
+                web.get("/streaming/", self.streaming),
+            ]
+        )
+        self._runner: Optional[web.AppRunner] = None
+        self.url = ""
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving and return the base url."""
+        self._runner = web.AppRunner(self.app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        host, port = self._runner.addresses[0][:2]
+        self.url = f"http://{host}:{port}"
+        return self.url
+
+    async def stop(self) -> None:
+        """Stop serving."""
+        if self._runner:
+            await self._runner.cleanup()
+
+    @web.middleware
+    async def _middleware(self, request: web.Request, handler):
+        """Count requests and apply latency."""
+        route = request.match_info.route.resource
+        name = route.canonical if route else request.path
+        self.requests[name] = self.requests.get(name, 0) + 1
+        if name != "/streaming/" and (self.latency or self.jitter):
+            await asyncio.sleep(self.latency + self.random.uniform(0, self.jitter))
+        return await handler(request)
+
+    def _error(self) -> Optional[web.Response]:
+        if self.error_rate and self.random.random() < self.error_rate:
+            status, body = self.random.choice(ERRORS)
+            return web.json_response(body, status=status)
+        return None
+
+    def _vehicle(self, request: web.Request) -> dict:
+        vin = request.match_info["vin"]
+        if vin not in self.vehicles:
+            raise web.HTTPNotFound()
+        return self.vehicles[vin]
+
+    async def product_list(self, request: web.Request) -> web.Response:
+        """Return PRODUCT_LIST."""
+        # pylint: disable=unused-argument
+        return web.Response(body=self._products, content_type="application/json")
+
+    async def vehicle_summary(self, request: web.Request) -> web.Response:
+        """Return VEHICLE_SUMMARY."""
+        return web.json_response({"response": self._vehicle(request)})
+
+    async def vehicle_data_(self, request: web.Request) -> web.Response:
+        """Return VEHICLE_DATA."""
+        car = self._vehicle(request)
+        if car["state"] != "online":
+            status, body = ERRORS[0]
+            return web.json_response(body, status=status)
+        return self._error() or web.Response(
+            body=self.vehicle_data[car["vin"]], content_type="application/json"
+        )
+
+    async def wake_up(self, request: web.Request) -> web.Response:
+        """Return WAKE_UP and bring the vehicle online after wake_delay."""
+        car = self._vehicle(request)
+        if car["state"] != "online":
+            if self.wake_delay:
+                asyncio.get_running_loop().call_later(
+                    self.wake_delay, car.__setitem__, "state", "online"
+                )
+            else:
+                car["state"] = "online"
+        return web.json_response({"response": car})
+
+    async def command(self, request: web.Request) -> web.Response:
+        """Return a successful command result."""
+        car = self._vehicle(request)
+        if car["state"] != "online":
+            status, body = ERRORS[0]
+            return web.json_response(body, status=status)
+        return self._error() or web.json_response(
+            {"response": {"reason": "", "result": True}}
+        )
+
+    async def site_data(self, request: web.Request) -> web.Response:
+        """Return SITE_DATA."""
+        # pylint: disable=unused-argument
+        return web.json_response({"response": SITE_DATA})
+
+    async def site_config(self, request: web.Request) -> web.Response:
+        """Return SITE_CONFIG."""
+        # pylint: disable=unused-argument
+        return web.json_response({"response": SITE_CONFIG})
+
+    async def site_summary(self, request: web.Request) -> web.Response:
+        """Return SITE_SUMMARY."""
+        # pylint: disable=unused-argument
+        return web.json_response({"response": SITE_SUMMARY})
+
+    async def streaming(self, request: web.Request) -> web.WebSocketResponse:
+        """Stream data:update frames for every subscribed vehicle tag."""
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        await websocket.send_bytes(
+            orjson.dumps({"msg_type": "control:hello"})  # pylint: disable=no-member
+        )
+        tags: List[str] = []
+
+        async def _send_frames() -> None:
+            speed = 0
+            while not websocket.closed:
+                speed = (speed + 1) % 120
+                timestamp = round(time.time() * 1000)
+                for tag in list(tags):
+                    value = (
+                        f"{timestamp},D,{speed},{speed * 2},37.1,-122.1,90,37.1,"
+                        f"-122.1,37.1,-122.1,90.5,wgs,1"
+                    )
+                    await websocket.send_bytes(
+                        orjson.dumps(  # pylint: disable=no-member
+                            {"msg_type": "data:update", "tag": tag, "value": value}
+                        )
+                    )
+                    self.frames_sent += 1
+                await asyncio.sleep(self.stream_interval)
+
+        sender = None
+        async for msg in websocket:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = orjson.loads(msg.data)  # pylint: disable=no-member
+            if data.get("msg_type") == "data:subscribe_oauth" and data["tag"] not in tags:
+                tags.append(data["tag"])
+                if sender is None:
+                    sender = asyncio.ensure_future(_send_frames())
+            elif data.get("msg_type") == "data:unsubscribe" and data["tag"] in tags:
+                tags.remove(data["tag"])
+        if sender:
+            sender.cancel()
+        return websocket
+
+
+async def _serve(args: argparse.Namespace) -> None:
+    server = TeslaStandIn(
+        vehicles=args.vehicles,
+        sites=args.sites,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        asleep_rate=args.asleep_rate,
+        stream_interval=args.stream_interval,
+    )
+    print(f"Serving {args.vehicles} vehicles on {await server.start(port=args.port)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    """Run the stand-in server until interrupted."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=10)
+    parser.add_argument("--sites", type=int, default=1)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--asleep-rate", type=float, default=0.0)
+    parser.add_argument("--stream-interval", type=float, default=0.5)
+    parser.add_argument("--port", type=int, default=8765)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+"""Worker scaling benchmark of ShardedRunner against a local Tesla API stand-in.
+
+Splits one fleet by VIN across 1, 2, 4... worker processes and reports the
+vehicles updated per second and the seconds to start, so the gain from more
+cores is measured on the full request, decode and diff path.
+
+Usage:
+    python -m benchmarks.sharding --vehicles 1000 --workers 1 2 4
+    python -m benchmarks.sharding --url http://127.0.0.1:8765 --vehicles 100
+"""
+import argparse
+import asyncio
+import time
+from typing import Dict, List, Optional
+
+import orjson
+
+from teslajsonpy.sharding import ShardedRunner, assign_shards
+
+from benchmarks.server import TeslaStandIn, make_vin
+
+
+async def run(
+    workers: int, args: argparse.Namespace, url: Optional[str] = None
+) -> Dict:
+    """Update the fleet for a number of rounds and return the result row."""
+    server = None
+    if url is None:
+        server = TeslaStandIn(vehicles=args.vehicles, latency=args.latency)
+        url = await server.start()
+    runner = ShardedRunner(workers=workers, interval=0, update_kwargs={"force": True})
+    vins = [make_vin(index) for index in range(args.vehicles)]
+    for index, shard in enumerate(assign_shards(vins, workers)):
+        runner.add_account(
+            f"shard{index}",
+            filtered_vins=shard,
+            access_token="benchmark",
+            expiration=int(time.time()) + 86400,
+            update_interval=0,
+            api_proxy_url=url,
+            max_concurrency=args.concurrency,
+        )
+    finished = asyncio.Event()
+    baseline: Dict[int, int] = {}
+    deltas = 0
+    errors = 0
+
+    def _on_round(rounds: int, payload: dict) -> None:
+        # Workers start updating once connected; count from the slowest start
+        nonlocal deltas, errors
+        if not baseline:
+            return
+        deltas += sum(len(update["vehicles"]) for update in payload.values())
+        errors += sum(bool(update["error"]) for update in payload.values())
+        if all(
+            shard["rounds"] - baseline[index] >= args.rounds
+            for index, shard in enumerate(runner.health())
+        ):
+            finished.set()
+
+    runner.on_round(_on_round)
+    try:
+        start = time.perf_counter()
+        failed = await runner.start()
+        started = time.perf_counter() - start
+        if failed:
+            raise RuntimeError(f"Accounts failed to connect: {failed}")
+        baseline.update(
+            (index, shard["rounds"]) for index, shard in enumerate(runner.health())
+        )
+        start = time.perf_counter()
+        await finished.wait()
+        elapsed = time.perf_counter() - start
+    finally:
+        await runner.stop()
+        if server:
+            await server.stop()
+    return {
+        "workers": workers,
+        "vehicles": len(runner.cars),
+        "start_seconds": started,
+        "seconds": elapsed,
+        "per_second": len(runner.cars) * args.rounds / elapsed if elapsed else 0.0,
+        "deltas": deltas,
+        "errors": errors,
+    }
+
+
+def _print(results: List[Dict]) -> None:
+    """Print result rows as a table."""
+    print(
+        f"{'workers':>7} {'vehicles':>8} {'start s':>8} {'veh/sec':>10} {'deltas':>7} "
+        f"{'errors':>6}"
+    )
+    for row in results:
+        print(
+            f"{row['workers']:>7} {row['vehicles']:>8} {row['start_seconds']:>8.2f} "
+            f"{row['per_second']:>10.1f} {row['deltas']:>7} {row['errors']:>6}"
+        )
+
+
+def main() -> None:
+    """Run the benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--vehicles", type=int, default=100)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--url", help="use a running benchmarks.server")
+    parser.add_argument("--json", action="store_true", help="print JSON results")
+    args = parser.parse_args()
+
+    results = [asyncio.run(run(workers, args, args.url)) for workers in args.workers]
+    if args.json:
+        print(orjson.dumps(results, option=orjson.OPT_INDENT_2).decode())  # pylint: disable=no-member
+    else:
+        _print(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+from contextvars import ContextVar
+import logging
+from typing import Any, Callable, List, Optional, Tuple
+
+from teslajsonpy.exceptions import TeslaException
+
+_LOGGER = logging.getLogger(__name__)
+
+# (batch, call index) of the commands a batch task sends
+_BATCH: ContextVar = ContextVar("teslajsonpy_batch", default=None)
+
+
+def current_batch(car) -> Optional[Tuple["CommandBatch", int]]:
+    """Return the batch and call index queueing the commands of car, if any."""
+    entry = _BATCH.get()
+    if entry is None or entry[0].car is not car:
+        return None
+    return entry
+
+
+class CommandBatch:
+    """Commands of a TeslaCar queued by TeslaCar.batch and sent together.
+
+    Calling a command method on the batch, e.g., ``batch.set_temperature(21)``,
+    runs it as a task whose API requests are queued. On exit the car is woken
+    once if any queued command wakes it, then the commands are sent back to
+    back in call order and each method applies its response as usual. The first
+    non-retryable error, e.g., 401 or 429, fails the rest of the batch without
+    sending it.
+    """
+
+    def __init__(self, car) -> None:
+        """Initialize CommandBatch.
+
+        Args
+            car: TeslaCar sending the commands
+
+        """
+        self.car = car
+        self.results: List[Tuple[str, Any]] = []
+        self._tasks: List[asyncio.Task] = []
+        self._queued: List[tuple] = []
+        self._changed: Optional[asyncio.Event] = None
+        self._error: Optional[Exception] = None
+
+    def __getattr__(self, name: str) -> Callable[..., asyncio.Task]:
+        """Return a command method of the car that runs in the batch."""
+        method = getattr(self.car, name)
+        if name.startswith("_") or not asyncio.iscoroutinefunction(method):
+            raise AttributeError(f"{name} is not a command of TeslaCar")
+
+        def _command(*args, **kwargs) -> asyncio.Task:
+            if self._changed is None:
+                raise RuntimeError("Commands are queued inside async with car.batch()")
+            index = len(self._tasks)
+
+            async def _run():
+                _BATCH.set((self, index))
+                return await method(*args, **kwargs)
+
+            task = asyncio.ensure_future(_run())
+            task.add_done_callback(lambda _: self._changed.set())
+            self._tasks.append(task)
+            return task
+
+        return _command
+
+    async def __aenter__(self) -> "CommandBatch":
+        """Start queueing commands."""
+        self._changed = asyncio.Event()
+        return self
+
+    async def __aexit__(self, exc_type, exc, traceback) -> None:
+        """Send the queued commands and wait for their methods."""
+        if exc_type is not None:
+            for task in self._tasks:
+                task.cancel()
+        while exc_type is None:
+            pending = [task for task in self._tasks if not task.done()]
+            if not pending:
+                break
+            # Send once every running method is waiting on a queued request
+            if len(self._queued) >= len(pending):
+                await self._flush()
+            else:
+                self._changed.clear()
+                await self._changed.wait()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def queue(
+        self,
+        index: int,
+        name: str,
+        path_vars: dict,
+        wake_if_asleep: bool,
+        kwargs: dict,
+    ) -> asyncio.Future:
+        """Queue an API request of a command.
+
+        Args
+            index: Call index of the command method in the batch
+            name: Name of command to send, from endpoints.json
+            path_vars: URI variables of the command
+            wake_if_asleep: Wake car if it's asleep before sending the command
+            kwargs: Parameters of the api call
+
+        Returns
+            asyncio.Future: Response of the request once sent
+
+        """
+        future = asyncio.get_event_loop().create_future()
+        self._queued.append((index, name, path_vars, wake_if_asleep, kwargs, future))
+        self._changed.set()
+        return future
+
+    async def _flush(self) -> None:
+        """Wake the car once if needed, then send the queued requests in order."""
+        queued = sorted(self._queued, key=lambda entry: entry[0])
+        self._queued = []
+        controller = self.car._controller  # pylint: disable=protected-access
+        if (
+            self._error is None
+            and any(entry[3] for entry in queued)
+            and not self.car.is_on
+        ):
+            try:
+                if not await controller.wake_up(car_id=self.car.id):
+                    self._error = TeslaException(408)
+            except Exception as ex:  # pylint: disable=broad-except
+                self._error = ex
+        for _, name, path_vars, wake_if_asleep, kwargs, future in queued:
+            if future.cancelled():
+                continue
+            if self._error is not None:
+                result = self._error
+            else:
+                _LOGGER.debug("Sending batched command: %s", name)
+                try:
+                    result = await controller.api(
+                        name,
+                        path_vars=path_vars,
+                        wake_if_asleep=wake_if_asleep,
+                        **kwargs,
+                    )
+                except TeslaException as ex:
+                    result = ex
+                    if not ex.retryable:
+                        self._error = ex
+                except Exception as ex:  # pylint: disable=broad-except
+                    result = ex
+            self.results.append((name, result))
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
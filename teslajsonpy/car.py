@@ -8,7 +8,9 @@ https://github.com/zabuldon/teslajsonpy
 import logging
 from typing import Optional, Tuple
 
+from teslajsonpy.batch import CommandBatch, current_batch
 from teslajsonpy.exceptions import HomelinkError, TeslaException
+from teslajsonpy.schema import VEHICLE_FIELDS, VehicleState, field_properties
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -35,12 +37,16 @@ DAY_SELECTION_MAP = {
 }
 
 
+@field_properties(VEHICLE_FIELDS)
 class TeslaCar:
     #  pylint: disable=too-many-public-methods
     """Represents a Tesla car.
 
     This class shouldn't be instantiated directly; it will be instantiated
     by :meth:`teslajsonpy.controller.generate_car_objects`.
+
+    Properties for the fields in :data:`teslajsonpy.schema.VEHICLE_FIELDS` are
+    generated and read from a compact copy of the vehicle data, see :attr:`fields`.
     """
 
     def __init__(self, car: dict, controller, vehicle_data: dict) -> None:
@@ -48,6 +54,7 @@ class TeslaCar:
         self._car = car
         self._controller = controller
         self._vehicle_data = vehicle_data
+        self._state = VehicleState(vehicle_data)
 
         self._previous_driver_temp = self.driver_temp_setting
         self._previous_fan_status = self.fan_status
@@ -79,6 +86,33 @@ class TeslaCar:
         """Return car vin."""
         return self._car.get("vin")
 
+    @property
+    def fields(self) -> VehicleState:
+        """Return the schema fields of the vehicle data as plain attributes."""
+        return self._state
+
+    def refresh_state(
+        self, section: Optional[str] = None, keys: Optional[Tuple[str, ...]] = None
+    ) -> None:
+        """Reload the schema fields after the vehicle data changed.
+
+        Args
+            section: Only reload this section, e.g., drive_state. Defaults to all.
+            keys: Only reload these keys of section. Defaults to all.
+
+        """
+        if section is None:
+            self._state.load(self._vehicle_data)
+        elif keys is not None:
+            self._state.load_keys(section, self._vehicle_data.get(section, {}), keys)
+        else:
+            self._state.load_section(section, self._vehicle_data.get(section))
+
+    def _update_section(self, section: str, params: dict) -> None:
+        """Merge params into a section of the vehicle data."""
+        self._vehicle_data[section].update(params)
+        self._state.load_section(section, self._vehicle_data[section])
+
     @property
     def data_available(self) -> bool:
         """Return if data from VEHICLE_DATA endpoint is available."""
@@ -89,239 +123,11 @@ class TeslaCar:
             return True
         return None
 
-    @property
-    def battery_level(self) -> float:
-        """Return car battery level (SOC). This is not affected by temperature."""
-        return self._vehicle_data.get("charge_state", {}).get("battery_level")
-
-    @property
-    def usable_battery_level(self) -> float:
-        """Return car usable battery level (uSOE). This is the value used in the app and car."""
-        return self._vehicle_data.get("charge_state", {}).get("usable_battery_level")
-
-    @property
-    def battery_range(self) -> float:
-        """Return car battery range."""
-        return self._vehicle_data.get("charge_state", {}).get("battery_range")
-
-    @property
-    def cabin_overheat_protection(self) -> str:
-        """Return cabin overheat protection."""
-        return self._vehicle_data.get("climate_state", {}).get(
-            "cabin_overheat_protection"
-        )
-
     @property
     def car_type(self) -> str:
         """Return car type."""
         return f"Model {str(self.vin[3]).upper()}"
 
-    @property
-    def car_version(self) -> str:
-        """Return installed car software version."""
-        return self._vehicle_data.get("vehicle_state", {}).get("car_version")
-
-    @property
-    def charger_actual_current(self) -> int:
-        """Return charger actual current."""
-        return self._vehicle_data.get("charge_state", {}).get("charger_actual_current")
-
-    @property
-    def charge_current_request(self) -> int:
-        """Return charge current request."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_current_request")
-
-    @property
-    def charge_current_request_max(self) -> int:
-        """Return charge current request max."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "charge_current_request_max"
-        )
-
-    @property
-    def charge_port_latch(self) -> str:
-        """Return charger port latch state.
-
-        Returns
-            str: Engaged
-
-        Other states?
-
-        """
-        return self._vehicle_data.get("charge_state", {}).get("charge_port_latch")
-
-    @property
-    def charge_energy_added(self) -> float:
-        """Return charge energy added."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_energy_added")
-
-    @property
-    def charge_limit_soc(self) -> int:
-        """Return charge limit soc."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_limit_soc")
-
-    @property
-    def charge_limit_soc_max(self) -> int:
-        """Return charge limit soc max."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_limit_soc_max")
-
-    @property
-    def charge_limit_soc_min(self) -> int:
-        """Return charge limit soc min."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_limit_soc_min")
-
-    @property
-    def charge_miles_added_ideal(self) -> float:
-        """Return charge ideal miles added."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "charge_miles_added_ideal"
-        )
-
-    @property
-    def charge_miles_added_rated(self) -> float:
-        """Return charge rated miles added."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "charge_miles_added_rated"
-        )
-
-    @property
-    def charger_phases(self) -> int:
-        """Return charger phase."""
-        return self._vehicle_data.get("charge_state", {}).get("charger_phases")
-
-    @property
-    def charger_power(self) -> int:
-        """Return charger power."""
-        return self._vehicle_data.get("charge_state", {}).get("charger_power")
-
-    @property
-    def charge_rate(self) -> str:
-        """Return charge rate."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_rate")
-
-    @property
-    def charging_state(self) -> str:
-        """Return charging state.
-
-        Returns
-            str: Charging, Stopped, Complete, Disconnected, NoPower
-            None: When car is asleep
-
-        """
-        return self._vehicle_data.get("charge_state", {}).get("charging_state")
-
-    @property
-    def charger_voltage(self) -> int:
-        """Return charger voltage."""
-        return self._vehicle_data.get("charge_state", {}).get("charger_voltage")
-
-    @property
-    def bioweapon_mode(self) -> bool:
-        """Return bioweapon defense mode."""
-        return self._vehicle_data.get("climate_state", {}).get("bioweapon_mode")
-    
-    @property
-    def climate_keeper_mode(self) -> str:
-        """Return climate keeper mode mode.
-
-        Returns
-            str: dog, camp, on, off
-
-        Not supported on all Tesla models.
-
-        """
-        return self._vehicle_data.get("climate_state", {}).get("climate_keeper_mode")
-
-    @property
-    def conn_charge_cable(self) -> str:
-        """Return charge cable connection."""
-        return self._vehicle_data.get("charge_state", {}).get("conn_charge_cable")
-
-    @property
-    def defrost_mode(self) -> int:
-        """Return defrost mode.
-
-        Returns
-            int: 2 (on), 0 (off)
-
-        """
-        return self._vehicle_data.get("climate_state", {}).get("defrost_mode", 0)
-
-    @property
-    def driver_temp_setting(self) -> float:
-        """Return driver temperature setting."""
-        return self._vehicle_data.get("climate_state", {}).get("driver_temp_setting")
-
-    @property
-    def fan_status(self) -> int:
-        """Return fan status setting."""
-        return self._vehicle_data.get("climate_state", {}).get("fan_status")
-
-    @property
-    def fast_charger_present(self) -> bool:
-        """Return fast charger present."""
-        return self._vehicle_data.get("charge_state", {}).get("fast_charger_present")
-
-    @property
-    def fast_charger_brand(self) -> str:
-        """Return fast charger brand."""
-        return self._vehicle_data.get("charge_state", {}).get("fast_charger_brand")
-
-    @property
-    def fast_charger_type(self) -> str:
-        """Return fast charger type."""
-        return self._vehicle_data.get("charge_state", {}).get("fast_charger_type")
-
-    @property
-    def door_df(self) -> int:
-        """Return driver front door status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("df")
-
-    @property
-    def door_dr(self) -> int:
-        """Return driver rear door status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("dr")
-
-    @property
-    def door_pf(self) -> int:
-        """Return passenger front door status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("pf")
-
-    @property
-    def door_pr(self) -> int:
-        """Return passenger rear door status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("pr")
-
-    @property
-    def gui_distance_units(self) -> str:
-        """Return gui distance units."""
-        return self._vehicle_data.get("gui_settings", {}).get("gui_distance_units")
-
-    @property
-    def gui_range_display(self) -> str:
-        """Return range display."""
-        return self._vehicle_data.get("gui_settings", {}).get("gui_range_display")
-
-    @property
-    def heading(self) -> int:
-        """Return heading."""
-        return self._vehicle_data.get("drive_state", {}).get("heading")
-
-    @property
-    def homelink_device_count(self) -> int:
-        """Return Homelink device count."""
-        return self._vehicle_data.get("vehicle_state", {}).get("homelink_device_count")
-
-    @property
-    def homelink_nearby(self) -> bool:
-        """Return Homelink nearby."""
-        return self._vehicle_data.get("vehicle_state", {}).get("homelink_nearby")
-
-    @property
-    def ideal_battery_range(self) -> float:
-        """Return car ideal battery range."""
-        return self._vehicle_data.get("charge_state", {}).get("ideal_battery_range")
-
     @property
     def in_service(self) -> bool:
         """Return car in_service."""
@@ -329,21 +135,6 @@ class TeslaCar:
             return self._vehicle_data.get("in_service")
         return None
 
-    @property
-    def inside_temp(self) -> float:
-        """Return inside temperature."""
-        return self._vehicle_data.get("climate_state", {}).get("inside_temp")
-
-    @property
-    def is_charge_port_door_open(self) -> bool:
-        """Return charger port door open."""
-        return self._vehicle_data.get("charge_state", {}).get("charge_port_door_open")
-
-    @property
-    def is_climate_on(self) -> bool:
-        """Return climate is on."""
-        return self._vehicle_data.get("climate_state", {}).get("is_climate_on")
-
     @property
     def is_frunk_closed(self) -> bool:
         """Return car frunk is closed.
@@ -360,16 +151,6 @@ class TeslaCar:
         """Return car is gear (i.e. drive or reverse)."""
         return self.shift_state in ["D", "R"]
 
-    @property
-    def is_locked(self) -> bool:
-        """Return car is locked."""
-        return self._vehicle_data.get("vehicle_state", {}).get("locked")
-
-    @property
-    def is_steering_wheel_heater_on(self) -> bool:
-        """Return steering wheel heater."""
-        return self._vehicle_data.get("climate_state", {}).get("steering_wheel_heater")
-
     @property
     def is_trunk_closed(self) -> bool:
         """Return car trunk is closed.
@@ -386,125 +167,10 @@ class TeslaCar:
         """Return car is on."""
         return self._controller.is_car_online(vin=self.vin)
 
-    @property
-    def longitude(self) -> float:
-        """Return longitude."""
-        return self._vehicle_data.get("drive_state", {}).get("longitude")
-
-    @property
-    def latitude(self) -> float:
-        """Return latitude."""
-        return self._vehicle_data.get("drive_state", {}).get("latitude")
-
-    @property
-    def max_avail_temp(self) -> float:
-        """Return max available temperature."""
-        return self._vehicle_data.get("climate_state", {}).get("max_avail_temp")
-
-    @property
-    def min_avail_temp(self) -> float:
-        """Return min available temperature."""
-        return self._vehicle_data.get("climate_state", {}).get("min_avail_temp")
-
-    @property
-    def native_heading(self) -> int:
-        """Return native heading."""
-        return self._vehicle_data.get("drive_state", {}).get("native_heading")
-
-    @property
-    def native_location_supported(self) -> int:
-        """Return native location supported."""
-        return self._vehicle_data.get("drive_state", {}).get(
-            "native_location_supported"
-        )
-
-    @property
-    def native_longitude(self) -> float:
-        """Return native longitude."""
-        return self._vehicle_data.get("drive_state", {}).get("native_longitude")
-
-    @property
-    def native_latitude(self) -> float:
-        """Return native latitude."""
-        return self._vehicle_data.get("drive_state", {}).get("native_latitude")
-
-    @property
-    def native_type(self) -> float:
-        """Return native type."""
-        return self._vehicle_data.get("drive_state", {}).get("native_type")
-
-    @property
-    def odometer(self) -> float:
-        """Return odometer."""
-        return self._vehicle_data.get("vehicle_state", {}).get("odometer")
-
-    @property
-    def outside_temp(self) -> float:
-        """Return outside temperature."""
-        return self._vehicle_data.get("climate_state", {}).get("outside_temp")
-
-    @property
-    def passenger_temp_setting(self) -> float:
-        """Return passenger temperature setting."""
-        return self._vehicle_data.get("climate_state", {}).get("passenger_temp_setting")
-
-    @property
-    def power(self) -> int:
-        """Return power."""
-        return self._vehicle_data.get("drive_state", {}).get("power")
-
-    @property
-    def powered_lift_gate(self) -> bool:
-        """Return True if car has power lift gate."""
-        return self._vehicle_data.get("vehicle_config", {}).get("plg")
-
-    @property
-    def rear_seat_heaters(self) -> int:
-        """Return if car has rear (second row) heated seats.
-
-        Returns
-            int: 0 (no rear heated seats), int: ? (rear heated seats)
-
-        """
-        return self._vehicle_data.get("vehicle_config", {}).get("rear_seat_heaters")
-
-    @property
-    def has_seat_cooling(self) -> bool:
-        """Return if car has cooled seats."""
-        return self._vehicle_data.get("vehicle_config", {}).get("has_seat_cooling")
-
-    @property
-    def sentry_mode(self) -> bool:
-        """Return sentry mode."""
-        return self._vehicle_data.get("vehicle_state", {}).get("sentry_mode")
-
-    @property
-    def sentry_mode_available(self) -> bool:
-        """Return sentry mode available."""
-        return self._vehicle_data.get("vehicle_state", {}).get("sentry_mode_available")
-
-    @property
-    def shift_state(self) -> str:
-        """Return shift state."""
-        return self._vehicle_data.get("drive_state", {}).get("shift_state")
-
-    @property
-    def speed(self) -> float:
-        """Return speed."""
-        return self._vehicle_data.get("drive_state", {}).get("speed")
-
-    @property
-    def software_update(self) -> dict:
-        """Return software update version information."""
-        return self._vehicle_data.get("vehicle_state", {}).get("software_update")
-
     @property
     def steering_wheel_heater(self) -> bool:
         """Return steering wheel heater option."""
-        return (
-            self._vehicle_data.get("climate_state", {}).get("steering_wheel_heater")
-            is not None
-        )
+        return self._state.is_steering_wheel_heater_on is not None
 
     @property
     def pedestrian_speaker(self) -> Optional[bool]:
@@ -515,160 +181,14 @@ class TeslaCar:
             return True
         return False
 
-    @property
-    def tpms_pressure_fl(self) -> float:
-        """Return tire pressure sensor for front left tire."""
-        return self._vehicle_data.get("vehicle_state", {}).get("tpms_pressure_fl")
-
-    @property
-    def tpms_pressure_fr(self) -> float:
-        """Return tire pressure sensor for front right tire."""
-        return self._vehicle_data.get("vehicle_state", {}).get("tpms_pressure_fr")
-
-    @property
-    def tpms_pressure_rl(self) -> float:
-        """Return tire pressure sensor for rear left tire."""
-        return self._vehicle_data.get("vehicle_state", {}).get("tpms_pressure_rl")
-
-    @property
-    def tpms_pressure_rr(self) -> float:
-        """Return tire pressure sensor for rear right tire."""
-        return self._vehicle_data.get("vehicle_state", {}).get("tpms_pressure_rr")
-
-    @property
-    def third_row_seats(self) -> str:
-        """Return third row seats option.
-
-        Returns
-            str: None
-
-        """
-        return self._vehicle_data.get("vehicle_config", {}).get("third_row_seats")
-
-    @property
-    def time_to_full_charge(self) -> float:
-        """Return time to full charge."""
-        return self._vehicle_data.get("charge_state", {}).get("time_to_full_charge")
-
-    @property
-    def window_fd(self) -> int:
-        """Return front driver window status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("fd_window")
-
-    @property
-    def window_fp(self) -> int:
-        """Return front passenger window status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("fp_window")
-
-    @property
-    def window_rd(self) -> int:
-        """Return rear driver window status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("rd_window")
-
-    @property
-    def window_rp(self) -> int:
-        """Return rear passenger window status."""
-        return self._vehicle_data.get("vehicle_state", {}).get("rp_window")
-
     @property
     def is_window_closed(self) -> bool:
         """Return all car windows are close."""
-        if (
-            self._vehicle_data.get("vehicle_state", {}).get("fd_window")
-            or self._vehicle_data.get("vehicle_state", {}).get("fp_window")
-            or self._vehicle_data.get("vehicle_state", {}).get("rd_window")
-            or self._vehicle_data.get("vehicle_state", {}).get("rp_window")
-        ):
+        state = self._state
+        if state.window_fd or state.window_fp or state.window_rd or state.window_rp:
             return False
         return True
 
-    @property
-    def is_remote_start(self) -> bool:
-        """Return if remote start active."""
-        return self._vehicle_data.get("vehicle_state", {}).get("remote_start")
-
-    @property
-    def is_valet_mode(self) -> bool:
-        """Return state of valet mode."""
-        return self._vehicle_data.get("vehicle_state", {}).get("valet_mode")
-
-    @property
-    def is_auto_seat_climate_left(self) -> bool:
-        """Return state of auto seat climate left."""
-        return self._vehicle_data.get("climate_state", {}).get("auto_seat_climate_left")
-
-    @property
-    def is_auto_seat_climate_right(self) -> bool:
-        """Return state of auto seat climate right."""
-        return self._vehicle_data.get("climate_state", {}).get(
-            "auto_seat_climate_right"
-        )
-
-    @property
-    def is_auto_steering_wheel_heat(self) -> bool:
-        """Return the state of auto steering wheel heat."""
-        return self._vehicle_data.get("climate_state", {}).get(
-            "auto_steering_wheel_heat"
-        )
-
-    @property
-    def active_route_destination(self) -> Optional[str]:
-        """Return active route destination."""
-        if "active_route_destination" in self._vehicle_data.get("drive_state", {}):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_destination"
-            )
-        return None
-
-    @property
-    def active_route_energy_at_arrival(self) -> Optional[int]:
-        """Return active route latitude."""
-        if "active_route_energy_at_arrival" in self._vehicle_data.get(
-            "drive_state", {}
-        ):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_energy_at_arrival"
-            )
-        return None
-
-    @property
-    def active_route_latitude(self) -> Optional[float]:
-        """Return active route latitude."""
-        if "active_route_latitude" in self._vehicle_data.get("drive_state", {}):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_latitude"
-            )
-        return None
-
-    @property
-    def active_route_longitude(self) -> Optional[float]:
-        """Return active route longitude."""
-        if "active_route_longitude" in self._vehicle_data.get("drive_state", {}):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_longitude"
-            )
-        return None
-
-    @property
-    def active_route_miles_to_arrival(self) -> Optional[float]:
-        """Return active route latitude."""
-        if "active_route_miles_to_arrival" in self._vehicle_data.get("drive_state", {}):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_miles_to_arrival"
-            )
-        return None
-
-    @property
-    def active_route_minutes_to_arrival(self) -> Optional[float]:
-        """Return active route minutes to arrival."""
-        if "active_route_minutes_to_arrival" in self._vehicle_data.get(
-            "drive_state", {}
-        ):
-            return self._vehicle_data.get("drive_state", {}).get(
-                "active_route_minutes_to_arrival"
-            )
-        return None
-
     @property
     def active_route_traffic_minutes_delay(self) -> Optional[float]:
         """Return active route traffic minutes delay."""
@@ -680,27 +200,6 @@ class TeslaCar:
             )
         return None
 
-    @property
-    def scheduled_departure_time(self) -> int:
-        """Return the scheduled departure time."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "scheduled_departure_time"
-        )
-
-    @property
-    def scheduled_departure_time_minutes(self) -> int:
-        """Return the scheduled departure time in minutes after midnight."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "scheduled_departure_time_minutes"
-        )
-
-    @property
-    def is_off_peak_charging_enabled(self) -> bool:
-        """Return if peak charging is enabled for scheduled departure."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "off_peak_charging_enabled"
-        )
-
     @property
     def is_off_peak_charging_weekday_only(self) -> bool:
         """Return if off off peak charging is weekday only for scheduled departure."""
@@ -708,16 +207,6 @@ class TeslaCar:
             self._vehicle_data.get("charge_state", {}).get("off_peak_charging_times")
         )
 
-    @property
-    def off_peak_hours_end_time(self) -> int:
-        """Return end of off peak hours in minutes after midnight for scheduled departure."""
-        return self._vehicle_data.get("charge_state", {}).get("off_peak_hours_end_time")
-
-    @property
-    def is_preconditioning_enabled(self) -> bool:
-        """Return if preconditioning is enabled for scheduled departure."""
-        return self._vehicle_data.get("charge_state", {}).get("preconditioning_enabled")
-
     @property
     def is_preconditioning_weekday_only(self) -> bool:
         """Return if preconditioning is weekday only for scheduled departure."""
@@ -725,25 +214,6 @@ class TeslaCar:
             self._vehicle_data.get("charge_state", {}).get("preconditioning_times")
         )
 
-    @property
-    def scheduled_charging_mode(self) -> str:
-        """Return 'Off', 'DepartBy', or 'StartAt' for schedule disabled, scheduled departure, and scheduled charging respectively."""
-        return self._vehicle_data.get("charge_state", {}).get("scheduled_charging_mode")
-
-    @property
-    def is_scheduled_charging_pending(self) -> bool:
-        """Return if scheduled charging is pending."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "scheduled_charging_pending"
-        )
-
-    @property
-    def scheduled_charging_start_time_app(self) -> int:
-        """Return the scheduled charging start time."""
-        return self._vehicle_data.get("charge_state", {}).get(
-            "scheduled_charging_start_time_app"
-        )
-
     async def _send_command(
         self,
         name: str,
@@ -765,11 +235,18 @@ class TeslaCar:
         if additional_path_vars:
             path_vars.update(additional_path_vars)
 
-        _LOGGER.debug("Sending command: %s", name)
+        batch = current_batch(self)
         try:
-            data = await self._controller.api(
-                name, path_vars=path_vars, wake_if_asleep=wake_if_asleep, **kwargs
-            )
+            if batch:
+                _LOGGER.debug("Queueing command: %s", name)
+                data = await batch[0].queue(
+                    batch[1], name, path_vars, wake_if_asleep, kwargs
+                )
+            else:
+                _LOGGER.debug("Sending command: %s", name)
+                data = await self._controller.api(
+                    name, path_vars=path_vars, wake_if_asleep=wake_if_asleep, **kwargs
+                )
             _LOGGER.debug("Response from command %s: %s", name, data)
             return data
         except TeslaException as ex:
@@ -784,6 +261,22 @@ class TeslaCar:
                 return None
             raise ex
 
+    def batch(self) -> CommandBatch:
+        """Return a context sending the commands called on it together.
+
+        The car is woken at most once for the batch and its commands are sent
+        in call order. The first non-retryable error fails the rest.
+
+            async with car.batch() as batch:
+                batch.set_hvac_mode("heat_cool")
+                batch.set_temperature(21)
+            batch.results  # [(command name, response or exception), ...]
+
+        Each call returns the task of the command method, holding its result or
+        any exception it raised.
+        """
+        return CommandBatch(self)
+
     def _get_lat_long(self) -> Tuple[Optional[float], Optional[float]]:
         """Get current latitude and longitude."""
         lat = None
@@ -833,7 +326,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"charge_limit_soc": int(value)}
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def charge_port_door_close(self) -> None:
         """Send command to close charge port door."""
@@ -841,7 +334,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"charge_port_door_open": False}
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def charge_port_door_open(self) -> None:
         """Send command to open charge port door."""
@@ -849,7 +342,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"charge_port_door_open": True}
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def flash_lights(self) -> None:
         """Send command to flash lights."""
@@ -864,7 +357,7 @@ class TeslaCar:
         data = await self._send_command("LOCK")
         if data and data["response"]["result"] is True:
             params = {"locked": True}
-            self._vehicle_data["vehicle_state"].update(params)
+            self._update_section("vehicle_state", params)
 
     async def remote_seat_heater_request(self, level: int, seat_id: int) -> None:
         """Send command to change seat heat.
@@ -885,7 +378,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {f"seat_heater_{SEAT_ID_MAP[seat_id]}": level}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     def get_seat_heater_status(self, seat_id: int) -> int:
         """Return status of seat heater for a given seat."""
@@ -912,7 +405,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {f"seat_fan_front_{SEAT_ID_MAP[seat_id]}": level}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
     
     def get_seat_cooler_status(self, seat_id: int) -> int:
         """Return status of seat heater for a given seat."""
@@ -945,7 +438,7 @@ class TeslaCar:
                 "charge_amps": int(value),
                 "charge_current_request": int(value),
             }
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def set_cabin_overheat_protection(self, option: str) -> None:
         """Send command to set cabin overheat protection.
@@ -970,7 +463,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {"cabin_overheat_protection": option}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def set_climate_keeper_mode(self, keeper_id: int) -> None:
         """Send command to set climate keeper mode.
@@ -991,7 +484,7 @@ class TeslaCar:
                 "climate_keeper_mode": CLIMATE_KEEPER_ID_MAP[keeper_id],
                 "is_climate_on": True,
             }
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def set_bioweapon_mode(self, enable: bool) -> None:
         """Send command to set bioweapon mode.
@@ -1011,7 +504,7 @@ class TeslaCar:
                 "bioweapon_mode": enable,
                 "is_climate_on": True,
             }
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
     
     async def remote_auto_seat_climate_request(
         self, seat_id: int, enable: bool
@@ -1032,7 +525,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {f"auto_seat_climate_{SEAT_ID_MAP[seat_id]}": enable}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def remote_auto_steering_wheel_heat_climate_request(
         self, enable: bool
@@ -1049,7 +542,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {"auto_steering_wheel_heat": enable}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def set_heated_steering_wheel(self, value: bool) -> None:
         """Send command to set heated steering wheel."""
@@ -1059,7 +552,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"steering_wheel_heater": value}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def set_heated_steering_wheel_level(self, level: int) -> None:
         """Send command to set the heated steering wheel level."""
@@ -1069,7 +562,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"steering_wheel_heat_level": level}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     def get_heated_steering_wheel_level(self) -> int:
         """Return the status of the heated steering wheel."""
@@ -1099,13 +592,13 @@ class TeslaCar:
                     "is_rear_defroster_on": False,
                     "passenger_temp_setting": self._previous_passenger_temp,
                 }
-                self._vehicle_data["climate_state"].update(params)
+                self._update_section("climate_state", params)
 
         elif value == "on":
             data = await self._send_command("CLIMATE_ON")
             if data and data["response"]["result"] is True:
                 params = {"is_climate_on": True}
-                self._vehicle_data["climate_state"].update(params)
+                self._update_section("climate_state", params)
 
     async def set_max_defrost(self, state: int) -> None:
         """Send command to set max defrost.
@@ -1144,7 +637,7 @@ class TeslaCar:
                     "is_rear_defroster_on": False,
                     "passenger_temp_setting": self._previous_passenger_temp,
                 }
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def set_sentry_mode(self, value: bool) -> None:
         """Send command to set sentry mode."""
@@ -1155,7 +648,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"sentry_mode": value}
-            self._vehicle_data["vehicle_state"].update(params)
+            self._update_section("vehicle_state", params)
 
     async def set_temperature(self, temp: float) -> None:
         """Send command to set temperature."""
@@ -1164,7 +657,7 @@ class TeslaCar:
         )
         if data and data["response"]["result"] is True:
             params = {"driver_temp_setting": temp}
-            self._vehicle_data["climate_state"].update(params)
+            self._update_section("climate_state", params)
 
     async def start_charge(self) -> None:
         """Send command to start charge."""
@@ -1172,7 +665,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"charging_state": "Charging"}
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def stop_charge(self) -> None:
         """Send command to stop charge."""
@@ -1181,7 +674,7 @@ class TeslaCar:
 
         if data and data["response"]["result"] is True:
             params = {"charging_state": "Stopped"}
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def wake_up(self) -> None:
         """Send command to wake up."""
@@ -1194,10 +687,10 @@ class TeslaCar:
         if data and data["response"]["result"] is True:
             if not prev_is_trunk_closed:
                 params = {"rt": 0}
-                self._vehicle_data["vehicle_state"].update(params)
+                self._update_section("vehicle_state", params)
             if prev_is_trunk_closed:
                 params = {"rt": 255}
-                self._vehicle_data["vehicle_state"].update(params)
+                self._update_section("vehicle_state", params)
 
     async def toggle_frunk(self) -> None:
         """Actuate front trunk."""
@@ -1206,10 +699,10 @@ class TeslaCar:
         if data and data["response"]["result"] is True:
             if not prev_is_frunk_closed:
                 params = {"ft": 0}
-                self._vehicle_data["vehicle_state"].update(params)
+                self._update_section("vehicle_state", params)
             if prev_is_frunk_closed:
                 params = {"ft": 255}
-                self._vehicle_data["vehicle_state"].update(params)
+                self._update_section("vehicle_state", params)
 
     async def trigger_homelink(self) -> None:
         """Send command to trigger homelink."""
@@ -1235,7 +728,7 @@ class TeslaCar:
         data = await self._send_command("UNLOCK")
         if data and data["response"]["result"] is True:
             params = {"locked": False}
-            self._vehicle_data["vehicle_state"].update(params)
+            self._update_section("vehicle_state", params)
 
     async def vent_windows(self) -> None:
         """Vent Windows."""
@@ -1247,7 +740,7 @@ class TeslaCar:
                 "rd_window": 1,
                 "rp_window": 1,
             }
-            self._vehicle_data["vehicle_state"].update(params)
+            self._update_section("vehicle_state", params)
 
     async def close_windows(self) -> None:
         """Close Windows."""
@@ -1261,7 +754,7 @@ class TeslaCar:
                 "rd_window": 0,
                 "rp_window": 0,
             }
-            self._vehicle_data["vehicle_state"].update(params)
+            self._update_section("vehicle_state", params)
 
     async def valet_mode(self, enable, pin=None) -> None:
         """Set Valet Mode.
@@ -1290,7 +783,7 @@ class TeslaCar:
                     params = {"valet_mode": True}
                 else:
                     params = {"valet_mode": False}
-                self._vehicle_data["vehicle_state"].update(params)
+                self._update_section("vehicle_state", params)
 
     async def remote_start(self) -> None:
         """Remote start."""
@@ -1303,7 +796,7 @@ class TeslaCar:
             if result is False:
                 _LOGGER.debug("Error calling remote start: %s", reason)
             else:
-                self._vehicle_data["vehicle_state"].update({"remote_start": True})
+                self._update_section("vehicle_state", {"remote_start": True})
 
     async def set_scheduled_departure(
         self,
@@ -1357,7 +850,7 @@ class TeslaCar:
                 ).index(off_peak_charging_weekdays_only),
                 "end_off_peak_time": end_off_peak_time,
             }
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def set_scheduled_charging(self, enable: bool, time: int) -> None:
         """Send command to set scheduled charging time.
@@ -1380,7 +873,7 @@ class TeslaCar:
                 "scheduled_charging_start_time": time,
                 "scheduled_charging_pending": enable,
             }
-            self._vehicle_data["charge_state"].update(params)
+            self._update_section("charge_state", params)
 
     async def remote_boombox(self) -> None:
         """Remote boombox."""
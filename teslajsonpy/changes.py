@@ -0,0 +1,167 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import logging
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Text, Tuple
+
+_LOGGER = logging.getLogger(__name__)
+
+# Changed leaf fields by dotted path, e.g., charge_state.battery_level: (old, new)
+Changes = Dict[Text, Tuple[Any, Any]]
+ChangeCallback = Callable[[Text, Changes], None]
+# Sections may be dicts or compact mappings
+_MAPPINGS = (dict, Mapping)
+
+
+def diff_update(current: Mapping, update: Mapping, prefix: Text = "") -> Changes:
+    """Return the leaf fields changed by ``current.update(update)``.
+
+    Top level keys missing from update are kept by dict.update and so are not
+    reported. Below the top level update replaces whole dicts, so missing
+    leaves are reported as changed to None.
+
+    Args
+        current: The cached data, e.g., the vehicle data of a car
+        update: The new data about to be merged into current
+        prefix: Path of current, e.g., drive_state. for a section
+
+    Returns
+        Changes: (old, new) values by dotted path; None stands in for a missing value
+
+    """
+    changes: Changes = {}
+    for key, value in update.items():
+        _diff(current.get(key), value, f"{prefix}{key}", changes)
+    return changes
+
+
+def _diff(old: Any, new: Any, path: Text, changes: Changes) -> None:
+    """Add the leaf differences between old and new below path to changes."""
+    if old is new:
+        return
+    if isinstance(new, _MAPPINGS):
+        if isinstance(old, _MAPPINGS):
+            for key, value in new.items():
+                _diff(old.get(key), value, f"{path}.{key}", changes)
+            for key, value in old.items():
+                if key not in new:
+                    _diff(value, None, f"{path}.{key}", changes)
+        else:
+            if old is not None:
+                changes[path] = (old, None)
+            for key, value in new.items():
+                _diff(None, value, f"{path}.{key}", changes)
+    elif isinstance(old, _MAPPINGS):
+        for key, value in old.items():
+            _diff(value, None, f"{path}.{key}", changes)
+        if new is not None:
+            changes[path] = (None, new)
+    elif old != new:
+        changes[path] = (old, new)
+
+
+class _Subscription:
+    """A callback for the changes to a set of paths."""
+
+    __slots__ = ("callback", "paths", "vin")
+
+    def __init__(
+        self,
+        callback: ChangeCallback,
+        paths: Optional[Tuple[Text, ...]],
+        vin: Optional[Text],
+    ) -> None:
+        self.callback = callback
+        self.paths = paths
+        self.vin = vin
+
+
+class ChangeDispatcher:
+    """Calls subscribers with the changed fields they subscribed to.
+
+    A subscription to a path receives changes to that leaf or, for a section
+    like ``charge_state``, to any leaf below it.
+    """
+
+    def __init__(self) -> None:
+        """Initialize ChangeDispatcher."""
+        self._all: List[_Subscription] = []
+        self._by_path: Dict[Text, List[_Subscription]] = {}
+
+    def __bool__(self) -> bool:
+        """Return whether there are subscribers."""
+        return bool(self._all or self._by_path)
+
+    def subscribe(
+        self,
+        callback: ChangeCallback,
+        paths: Optional[Iterable[Text]] = None,
+        vin: Optional[Text] = None,
+    ) -> Callable[[], None]:
+        """Subscribe callback to changes.
+
+        Args
+            callback: Called with the vin and the subscribed changes
+            paths: Dotted paths, e.g., charge_state.battery_level. None for all changes.
+            vin: Only changes of this vin. None for all vehicles.
+
+        Returns
+            Callable[[], None]: Function that unsubscribes the callback
+
+        """
+        subscription = _Subscription(
+            callback, tuple(paths) if paths is not None else None, vin
+        )
+        if subscription.paths is None:
+            self._all.append(subscription)
+        else:
+            for path in subscription.paths:
+                self._by_path.setdefault(path, []).append(subscription)
+
+        def _unsubscribe() -> None:
+            if subscription.paths is None:
+                if subscription in self._all:
+                    self._all.remove(subscription)
+                return
+            for path in subscription.paths:
+                subscribers = self._by_path.get(path, [])
+                if subscription in subscribers:
+                    subscribers.remove(subscription)
+                if not subscribers:
+                    self._by_path.pop(path, None)
+
+        return _unsubscribe
+
+    def dispatch(self, vin: Text, changes: Changes) -> None:
+        """Call the subscribers of changed paths once each with their changes."""
+        if not changes:
+            return
+        matched: Dict[int, Tuple[_Subscription, Changes]] = {}
+        by_path = self._by_path
+        if by_path:
+            for path, change in changes.items():
+                # Match the leaf and each of its parent sections
+                prefix = path
+                while True:
+                    for subscription in by_path.get(prefix, ()):
+                        if subscription.vin is None or subscription.vin == vin:
+                            entry = matched.get(id(subscription))
+                            if entry is None:
+                                entry = matched[id(subscription)] = (subscription, {})
+                            entry[1][path] = change
+                    dot = prefix.rfind(".")
+                    if dot < 0:
+                        break
+                    prefix = prefix[:dot]
+        for subscription in self._all:
+            if subscription.vin is None or subscription.vin == vin:
+                matched[id(subscription)] = (subscription, changes)
+        for subscription, subscribed in matched.values():
+            try:
+                subscription.callback(vin, subscribed)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("Error in change callback for %s", vin[-5:])
@@ -0,0 +1,280 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from collections.abc import MutableMapping
+import sys
+from typing import Any, Dict, Iterator, Optional, Text, Tuple
+import zlib
+
+import orjson
+
+from teslajsonpy.car import SEAT_ID_MAP
+from teslajsonpy.schema import VEHICLE_FIELDS
+
+# Top level vehicle data keys kept in compact mode
+TOP_LEVEL_KEYS: Tuple[Text, ...] = (
+    "id",
+    "id_s",
+    "vehicle_id",
+    "vin",
+    "display_name",
+    "state",
+    "in_service",
+    "option_codes",
+)
+# Vehicle data keys read by TeslaCar and Controller besides VEHICLE_FIELDS
+EXTRA_KEYS: Dict[Text, Tuple[Text, ...]] = {
+    "charge_state": ("off_peak_charging_times", "preconditioning_times"),
+    "climate_state": (
+        "steering_wheel_heat_level",
+        *(f"seat_heater_{seat}" for seat in SEAT_ID_MAP.values()),
+        *(f"seat_fan_front_{seat}" for seat in SEAT_ID_MAP.values()),
+    ),
+    "drive_state": ("timestamp", "active_route_traffic_minutes_delay"),
+    "vehicle_state": ("ft", "rt"),
+}
+# Strings longer than this are not interned, e.g., software versions
+MAX_INTERNED_LENGTH = 32
+# Raw JSON blobs shorter than this are stored uncompressed
+MIN_COMPRESSED_LENGTH = 256
+
+_MISSING = object()
+
+
+class SectionLayout:
+    """Interned keys of a section shared by every car."""
+
+    __slots__ = ("name", "keys", "index")
+
+    def __init__(self, name: Text, keys: Tuple[Text, ...]) -> None:
+        """Initialize SectionLayout."""
+        self.name: Text = sys.intern(name)
+        self.keys: Tuple[Text, ...] = tuple(dict.fromkeys(map(sys.intern, keys)))
+        self.index: Dict[Text, int] = {key: i for i, key in enumerate(self.keys)}
+
+
+class CompactSection(MutableMapping):
+    """Dict-like section of vehicle data storing values in a list.
+
+    Keys come from a shared SectionLayout, so a car only pays for a list slot
+    per value. Keys outside the layout, e.g., set by a command, are kept in a
+    small overflow dict.
+    """
+
+    __slots__ = ("_layout", "_values", "_extra")
+
+    def __init__(self, layout: SectionLayout, values: dict) -> None:
+        """Initialize CompactSection with the layout keys found in values."""
+        self._layout = layout
+        self._values = [
+            _compact_value(values.get(key, _MISSING)) for key in layout.keys
+        ]
+        self._extra: Optional[dict] = None
+
+    def get(self, key: Text, default: Any = None) -> Any:
+        """Return value for key if present, else default."""
+        index = self._layout.index.get(key)
+        if index is None:
+            return self._extra.get(key, default) if self._extra else default
+        value = self._values[index]
+        return default if value is _MISSING else value
+
+    def __getitem__(self, key: Text) -> Any:
+        """Return value for key."""
+        value = self.get(key, _MISSING)
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: Text, value: Any) -> None:
+        """Set value for key."""
+        index = self._layout.index.get(key)
+        if index is None:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+        else:
+            self._values[index] = value
+
+    def __delitem__(self, key: Text) -> None:
+        """Remove key."""
+        index = self._layout.index.get(key)
+        if index is not None and self._values[index] is not _MISSING:
+            self._values[index] = _MISSING
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key: object) -> bool:
+        """Return if key is present."""
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __iter__(self) -> Iterator[Text]:
+        """Iterate over present keys."""
+        for key, value in zip(self._layout.keys, self._values):
+            if value is not _MISSING:
+                yield key
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self) -> int:
+        """Return number of present keys."""
+        count = len(self._values) - self._values.count(_MISSING)
+        return count + (len(self._extra) if self._extra else 0)
+
+    def __repr__(self) -> str:
+        """Return representation of the section."""
+        return f"CompactSection({self._layout.name}, {self.to_dict()})"
+
+    def to_dict(self) -> dict:
+        """Return the present keys and values as a new dict."""
+        data = {
+            key: value
+            for key, value in zip(self._layout.keys, self._values)
+            if value is not _MISSING
+        }
+        if self._extra:
+            data.update(self._extra)
+        return data
+
+
+def _layouts() -> Dict[Text, SectionLayout]:
+    """Return the layout of each section kept in compact mode."""
+    keys: Dict[Text, list] = {}
+    for field in VEHICLE_FIELDS:
+        if field.section is not None:
+            keys.setdefault(field.section, []).append(field.key)
+    for section, extra in EXTRA_KEYS.items():
+        keys.setdefault(section, []).extend(extra)
+    return {
+        sys.intern(section): SectionLayout(section, tuple(section_keys))
+        for section, section_keys in keys.items()
+    }
+
+
+SECTION_LAYOUTS = _layouts()
+_TOP_LEVEL_KEYS = {sys.intern(key): key for key in TOP_LEVEL_KEYS}
+
+
+class RawVehicleData:
+    """Vehicle data fields left out of the compact dict, as compressed JSON.
+
+    Holds the top level keys outside TOP_LEVEL_KEYS, the sections without a
+    layout and, for every section of the response, the keys outside its
+    layout, so a section without such keys is kept as an empty dict. Each
+    section is compressed on its own and the top level keys together, so a
+    partial response only replaces the blobs of its sections.
+    """
+
+    __slots__ = ("blobs",)
+
+    def __init__(self, data: dict) -> None:
+        """Initialize RawVehicleData from the fields left out."""
+        top_level = {}
+        self.blobs: Dict[Optional[Text], bytes] = {}
+        for key, value in data.items():
+            if isinstance(value, dict):
+                self.blobs[key] = _compress(value)
+            else:
+                top_level[key] = value
+        # None holds the top level keys, which every response includes
+        self.blobs[None] = _compress(top_level)
+
+    def __len__(self) -> int:
+        """Return size in bytes."""
+        return sum(map(len, self.blobs.values()))
+
+    def decode(self) -> dict:
+        """Return the fields left out as a new dict."""
+        data = {}
+        for key, blob in self.blobs.items():
+            if key is None:
+                data.update(_decompress(blob))
+            else:
+                data[key] = _decompress(blob)
+        return data
+
+    def update(self, other: "RawVehicleData") -> None:
+        """Replace the top level keys and sections found in other."""
+        self.blobs.update(other.blobs)
+
+
+def _compress(data: dict) -> bytes:
+    """Return data as JSON, compressed unless it is short."""
+    encoded = orjson.dumps(data)  # pylint: disable=no-member
+    if len(encoded) < MIN_COMPRESSED_LENGTH:
+        # A copy, since orjson over-allocates its output
+        return memoryview(encoded).tobytes()
+    return zlib.compress(encoded, 1)
+
+
+def _decompress(blob: bytes) -> dict:
+    """Return the data of a blob from _compress."""
+    # A JSON object starts with "{" and zlib data with 0x78
+    if blob[:1] != b"{":
+        blob = zlib.decompress(blob)
+    return orjson.loads(blob)  # pylint: disable=no-member
+
+
+def _compact_value(value):
+    if isinstance(value, str) and len(value) <= MAX_INTERNED_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def compact_vehicle_data(data: dict) -> Tuple[dict, Optional[RawVehicleData]]:
+    """Split a VEHICLE_DATA response into the fields used and a raw blob.
+
+    The compact dict holds the top level keys in TOP_LEVEL_KEYS and a
+    CompactSection per section with only the keys the library reads. Keys are
+    shared interned strings and short string values are interned. The other
+    fields are kept as compressed JSON bytes, see expand_vehicle_data.
+
+    Args
+        data: Decoded VEHICLE_DATA response
+
+    Returns
+        Tuple[dict, Optional[RawVehicleData]]: The compact data and the fields
+        left out, or data unchanged and None if it is empty
+
+    """
+    if not data:
+        return data, None
+    compact = {}
+    rest = {}
+    for key, value in data.items():
+        layout = SECTION_LAYOUTS.get(key)
+        if layout is not None and isinstance(value, dict):
+            compact[layout.name] = CompactSection(layout, value)
+            rest[key] = {
+                name: item for name, item in value.items() if name not in layout.index
+            }
+        elif key in _TOP_LEVEL_KEYS:
+            compact[sys.intern(key)] = _compact_value(value)
+        else:
+            rest[key] = value
+    return compact, RawVehicleData(rest)
+
+
+def expand_vehicle_data(compact: dict, raw: Optional[RawVehicleData]) -> dict:
+    """Return the full vehicle data from compact data and the fields left out.
+
+    Sections are new dicts; their values are shared with the compact data.
+    """
+    data = {
+        key: value.to_dict() if isinstance(value, CompactSection) else value
+        for key, value in compact.items()
+    }
+    if raw is not None:
+        for key, value in raw.decode().items():
+            section = data.get(key)
+            if isinstance(section, dict) and isinstance(value, dict):
+                section.update(value)
+            else:
+                data[key] = value
+    return data
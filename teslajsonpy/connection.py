@@ -12,11 +12,11 @@ import datetime
 import hashlib
 import logging
 import secrets
+import sys
 import time
-from typing import Dict, Text
+from typing import Dict, Optional, Text, Tuple
 
 from json import JSONDecodeError
-import aiohttp
 from bs4 import BeautifulSoup
 import httpx
 import orjson
@@ -28,10 +28,17 @@ from teslajsonpy.const import (
     CLIENT_ID,
     AUTH_DOMAIN,
     DOMAIN_KEY,
-    WEBSOCKET_TIMEOUT,
+    TOKEN_REFRESH_MARGIN,
     WS_URL,
 )
 from teslajsonpy.exceptions import IncompleteCredentials, TeslaException
+from teslajsonpy.instrumentation import (
+    Instrumentation,
+    RequestEvent,
+    TokenRefreshEvent,
+)
+from teslajsonpy.ratelimit import PRIORITY_COMMAND, PRIORITY_POLL, RateLimiter
+from teslajsonpy.streaming import StreamingManager
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -51,6 +58,9 @@ class Connection:
         auth_domain: str = AUTH_DOMAIN,
         client_id: str = CLIENT_ID,
         api_proxy_url: str = None,
+        coalesce_requests: bool = True,
+        rate_limiter: RateLimiter = None,
+        instrumentation: Instrumentation = None,
     ) -> None:
         """Initialize connection object."""
         self.user_agent: Text = "TeslaApp/4.10.0"
@@ -84,85 +94,206 @@ class Connection:
         if self.access_token:
             self.__sethead(access_token=self.access_token, expiration=self.expiration)
             _LOGGER.debug("Connecting with existing access token")
-        self.websocket = None
+        self.streaming = StreamingManager(
+            lambda: self.access_token,
+            url=self.websocket_url,
+            refresh_token=self.refresh_streaming_token,
+        )
         self.mfa_code: Text = ""
+        self.__token_refresh: Optional[asyncio.Future] = None
+        self.__refresh_ahead_expiration: int = 0
+        self.coalesce_requests: bool = coalesce_requests
+        self.__inflight: Dict[Tuple[Text, bytes], asyncio.Future] = {}
+        # Callers still waiting on each in-flight GET
+        self.__inflight_callers: Dict[asyncio.Future, int] = {}
+        self.rate_limiter: RateLimiter = rate_limiter or RateLimiter()
+        self.instrumentation: Optional[Instrumentation] = instrumentation
         self.auth_domain: URL = URL(auth_domain)
 
     async def get(self, command):
         """Get data from API."""
         return await self.post(command, "get", None)
 
-    async def post(self, command, method="post", data=None, url=""):
-        """Post data to API."""
+    async def post(self, command, method="post", data=None, url="", endpoint=None):
+        """Post data to API.
+
+        endpoint is the endpoint name reported to instrumentation.
+        """
         now = calendar.timegm(datetime.datetime.now().timetuple())
         _LOGGER.debug(
             "Token expiration in %s",
             str(datetime.timedelta(seconds=self.expiration - now)),
         )
         if now > self.expiration:
-            self.token_refreshed = False
-            auth = {}
-            _LOGGER.debug("Oauth expiration detected")
-            if (self.code or (self.email and self.password)) and (
-                not self.sso_oauth
-                or (
-                    now > self.sso_oauth.get("expires_in", 0)
-                    and not self.sso_oauth.get("refresh_token")
-                )
-            ):
-                if self.email and self.password:
-                    _LOGGER.debug("Getting sso auth code using credentials")
-                    self.code = await self.get_authorization_code(
-                        self.email, self.password, mfa_code=self.mfa_code
+            # Concurrent callers share the single in-flight refresh
+            await asyncio.shield(self.__start_token_refresh())
+        elif (
+            self.expiration - now < TOKEN_REFRESH_MARGIN
+            and self.__refresh_ahead_expiration != self.expiration
+            and (self.refresh_token or self.sso_oauth.get("refresh_token"))
+        ):
+            _LOGGER.debug("Refreshing oauth ahead of expiration in background")
+            self.__refresh_ahead_expiration = self.expiration
+            self.__start_token_refresh()
+        if not url:
+            url = f"{self.api}{command}"
+        if method == "get" and self.coalesce_requests:
+            return await self.__coalesced_get(url, data, endpoint)
+        return await self.__governed_open(url, method, data, endpoint)
+
+    async def __governed_open(
+        self, url: Text, method: Text = "get", data=None, endpoint: Text = None
+    ):
+        """Open url once the rate limiter allows it."""
+        await self.rate_limiter.acquire(
+            PRIORITY_POLL if method == "get" else PRIORITY_COMMAND
+        )
+        return await self.__open(
+            url, method=method, headers=self.head, data=data, endpoint=endpoint
+        )
+
+    async def __coalesced_get(self, url: Text, data=None, endpoint: Text = None):
+        """Share one in-flight GET between callers.
+
+        Callers mutate the responses they cache, so when a GET was shared each
+        caller gets its own copy of the decoded response.
+        """
+        try:
+            params = orjson.dumps(  # pylint: disable=no-member
+                data, option=orjson.OPT_SORT_KEYS  # pylint: disable=no-member
+            )
+        except TypeError:
+            return await self.__governed_open(url, "get", data, endpoint)
+        key = (url, params)
+        future = self.__inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(
+                self.__governed_open(url, "get", data, endpoint)
+            )
+            self.__inflight[key] = future
+            self.__inflight_callers[future] = 1
+
+            def _done(done: asyncio.Future) -> None:
+                if self.__inflight.get(key) is done:
+                    del self.__inflight[key]
+                if not done.cancelled():
+                    # Mark exception as retrieved in case all callers were cancelled
+                    done.exception()
+
+            future.add_done_callback(_done)
+        else:
+            _LOGGER.debug("Joining in-flight request for %s", url)
+            self.__inflight_callers[future] += 1
+        try:
+            result = await asyncio.shield(future)
+        finally:
+            self.__inflight_callers[future] -= 1
+            waiting = self.__inflight_callers[future]
+            if not waiting:
+                del self.__inflight_callers[future]
+        if waiting:
+            # The last caller to resume keeps the original
+            return orjson.loads(orjson.dumps(result))  # pylint: disable=no-member
+        return result
+
+    def __start_token_refresh(self) -> asyncio.Future:
+        """Start an oauth refresh unless one is already in flight."""
+        if self.__token_refresh is None or self.__token_refresh.done():
+            self.__token_refresh = asyncio.ensure_future(self.__refresh_token())
+            self.__token_refresh.add_done_callback(_log_token_refresh_failure)
+            if self.instrumentation is not None:
+                started = time.perf_counter()
+                instrumentation = self.instrumentation
+
+                def _report(done: asyncio.Future) -> None:
+                    instrumentation.on_token_refresh(
+                        TokenRefreshEvent(
+                            time.perf_counter() - started,
+                            None if done.cancelled() else done.exception(),
+                        )
                     )
-                else:
-                    _LOGGER.debug("Using existing authorization code")
-                auth = await self.get_sso_auth_token(self.code)
-            elif self.sso_oauth.get("refresh_token") and now > self.sso_oauth.get(
-                "expires_in", 0
-            ):
-                _LOGGER.debug("Refreshing sso auth code")
-                auth = await self.refresh_access_token(
-                    refresh_token=self.sso_oauth.get("refresh_token")
-                )
-            elif self.refresh_token:
-                auth = await self.refresh_access_token(refresh_token=self.refresh_token)
-            if auth and all(
-                (
-                    auth.get(item)
-                    for item in ["access_token", "refresh_token", "expires_in"]
-                )
-            ):
-                self.sso_oauth = {
-                    "access_token": auth["access_token"],
-                    "refresh_token": auth["refresh_token"],
-                    "expires_in": auth["expires_in"] + now,
-                }
-                self.id_token = auth["id_token"]
-                self.refresh_token = auth["refresh_token"]
-                _LOGGER.debug("Saved new auth info %s", self.sso_oauth)
-            else:
-                _LOGGER.debug("Unable to refresh sso oauth token")
-                if auth:
-                    _LOGGER.debug("Auth returned %s", auth)
-                self.code = None
-                self.sso_oauth = {}
-                raise IncompleteCredentials("Need oauth credentials")
-            if auth.get("created_at"):
-                # use server time if available
-                self.__sethead(
-                    access_token=auth["access_token"],
-                    expiration=auth["expires_in"] + auth["created_at"],
+
+                self.__token_refresh.add_done_callback(_report)
+        return self.__token_refresh
+
+    async def __refresh_token(self) -> None:
+        """Refresh oauth and update the HTTP header."""
+        now = calendar.timegm(datetime.datetime.now().timetuple())
+        self.token_refreshed = False
+        auth = {}
+        _LOGGER.debug("Oauth expiration detected")
+        if (self.code or (self.email and self.password)) and (
+            not self.sso_oauth
+            or (
+                now > self.sso_oauth.get("expires_in", 0)
+                and not self.sso_oauth.get("refresh_token")
+            )
+        ):
+            if self.email and self.password:
+                _LOGGER.debug("Getting sso auth code using credentials")
+                self.code = await self.get_authorization_code(
+                    self.email, self.password, mfa_code=self.mfa_code
                 )
             else:
-                self.__sethead(
-                    access_token=auth["access_token"], expires_in=auth["expires_in"]
-                )
-            self.token_refreshed = True
-            _LOGGER.debug("Successfully refreshed oauth")
-        if not url:
-            url = f"{self.api}{command}"
-        return await self.__open(url, method=method, headers=self.head, data=data)
+                _LOGGER.debug("Using existing authorization code")
+            auth = await self.get_sso_auth_token(self.code)
+        elif self.sso_oauth.get("refresh_token") and now > self.sso_oauth.get(
+            "expires_in", 0
+        ):
+            _LOGGER.debug("Refreshing sso auth code")
+            auth = await self.refresh_access_token(
+                refresh_token=self.sso_oauth.get("refresh_token")
+            )
+        elif self.refresh_token:
+            auth = await self.refresh_access_token(refresh_token=self.refresh_token)
+        if auth and all(
+            (
+                auth.get(item)
+                for item in ["access_token", "refresh_token", "expires_in"]
+            )
+        ):
+            self.sso_oauth = {
+                "access_token": auth["access_token"],
+                "refresh_token": auth["refresh_token"],
+                "expires_in": auth["expires_in"] + now,
+            }
+            self.id_token = auth["id_token"]
+            self.refresh_token = auth["refresh_token"]
+            _LOGGER.debug("Saved new auth info %s", self.sso_oauth)
+        else:
+            _LOGGER.debug("Unable to refresh sso oauth token")
+            if auth:
+                _LOGGER.debug("Auth returned %s", auth)
+            self.code = None
+            self.sso_oauth = {}
+            raise IncompleteCredentials("Need oauth credentials")
+        if auth.get("created_at"):
+            # use server time if available
+            self.__sethead(
+                access_token=auth["access_token"],
+                expiration=auth["expires_in"] + auth["created_at"],
+            )
+        else:
+            self.__sethead(
+                access_token=auth["access_token"], expires_in=auth["expires_in"]
+            )
+        self.token_refreshed = True
+        _LOGGER.debug("Successfully refreshed oauth")
+
+    def set_tokens(
+        self,
+        access_token: Text,
+        refresh_token: Text = None,
+        expiration: int = 0,
+        id_token: Text = None,
+    ) -> None:
+        """Use tokens obtained earlier, e.g., restored from a snapshot."""
+        if refresh_token:
+            self.refresh_token = refresh_token
+        if id_token:
+            self.id_token = id_token
+        if access_token:
+            self.__sethead(access_token=access_token, expiration=expiration)
 
     def __sethead(self, access_token: Text, expires_in: int = 30, expiration: int = 0):
         """Set HTTP header."""
@@ -186,6 +317,7 @@ class Connection:
         cookies=None,
         data=None,
         baseurl: Text = "",
+        endpoint: Text = None,
     ) -> None:
         """Open url."""
         headers = headers or {}
@@ -196,6 +328,12 @@ class Connection:
         debug = _LOGGER.isEnabledFor(logging.DEBUG)
         if debug:
             _LOGGER.debug("%s: %s %s", method, url, data)
+        instrumentation = self.instrumentation
+        event = None
+        if instrumentation is not None:
+            event = RequestEvent(endpoint, method, str(url))
+            instrumentation.on_request_start(event)
+        started = time.perf_counter()
 
         try:
             if data:
@@ -211,8 +349,14 @@ class Connection:
                 resp: httpx.Response = await getattr(self.websession, method)(
                     str(url), headers=headers, cookies=cookies
                 )
+            if event is not None:
+                event.status = resp.status_code
+                event.bytes = len(resp.content)
             if debug:
-                _LOGGER.debug("%s: %s", resp.status_code, resp.text)
+                _LOGGER.debug(
+                    "%s %s: %s", resp.http_version, resp.status_code, resp.text
+                )
+            self.rate_limiter.update_from_response(resp.status_code, resp.headers)
             if resp.status_code > 299:
                 if resp.status_code == 401:
                     if data and data.get("error") == "invalid_token":
@@ -220,7 +364,12 @@ class Connection:
                 elif resp.status_code == 408:
                     raise TeslaException(resp.status_code, "vehicle_unavailable")
                 raise TeslaException(resp.status_code)
-            data = orjson.loads(resp.content)  # pylint: disable=no-member
+            if event is not None:
+                decode_started = time.perf_counter()
+                data = orjson.loads(resp.content)  # pylint: disable=no-member
+                event.decode_time = time.perf_counter() - decode_started
+            else:
+                data = orjson.loads(resp.content)  # pylint: disable=no-member
             if data.get("error"):
                 # known errors:
                 #     'vehicle unavailable: {:error=>"vehicle unavailable:"}',
@@ -237,10 +386,29 @@ class Connection:
             raise TeslaException(exception_.request.status_code) from exception_
         except JSONDecodeError as exception_:
             raise TeslaException("Error decoding response into json") from exception_
+        finally:
+            if event is not None:
+                event.wall_time = time.perf_counter() - started
+                # The exception being raised, if any
+                event.error = sys.exc_info()[1]
+                instrumentation.on_request_end(event)
         return data
 
+    async def refresh_streaming_token(self, force: bool = False) -> None:
+        """Refresh oauth before a streaming subscription.
+
+        Args:
+            force (bool): Refresh even if the token is not about to expire
+
+        """
+        now = calendar.timegm(datetime.datetime.now().timetuple())
+        if force or self.expiration - now < TOKEN_REFRESH_MARGIN:
+            await asyncio.shield(self.__start_token_refresh())
+
     async def websocket_connect(self, vin: int, vehicle_id: int, **kwargs):
-        """Connect to Tesla streaming websocket.
+        """Subscribe a vehicle to the Tesla streaming websocket.
+
+        Vehicles share the pooled websockets of self.streaming.
 
         Args:
             vin (int): vin of vehicle
@@ -251,153 +419,16 @@ class Connection:
                                    process a json delivered in data
 
         """
-
-        async def _process_messages() -> None:
-            """Start Async WebSocket Listener."""
-            nonlocal last_message_time
-            nonlocal disconnected
-            async for msg in self.websocket:
-                _LOGGER.debug("msg: %s", msg)
-                if msg.type == aiohttp.WSMsgType.BINARY:
-                    try:
-                        msg_json = orjson.loads(msg.data)  # pylint: disable=no-member
-                        if msg_json["msg_type"] == "control:hello":
-                            _LOGGER.debug(
-                                "%s:Succesfully connected to websocket %s",
-                                vin[-5:],
-                                self.websocket_url,
-                            )
-                        if msg_json["msg_type"] == "data:update":
-                            last_message_time = time.time()
-                        if (
-                            msg_json["msg_type"] == "data:error"
-                            and msg_json["value"] == "Can't validate token. "
-                        ):
-                            raise TeslaException(
-                                "Can't validate token for websocket connection."
-                            )
-                        if (
-                            msg_json["msg_type"] == "data:error"
-                            and msg_json["value"] == "disconnected"
-                        ):
-                            if kwargs.get("on_disconnect"):
-                                kwargs.get("on_disconnect")(msg_json)
-                            disconnected = True
-                        if kwargs.get("on_message"):
-                            kwargs.get("on_message")(msg_json)
-                    except JSONDecodeError:
-                        _LOGGER.debug("Received bad websocket message: %s", msg.data)
-                        break
-                elif msg.type == aiohttp.WSMsgType.ERROR:
-                    _LOGGER.debug("WSMsgType error")
-                    break
-
-        disconnected = False
-        last_message_time = time.time()
-        if not self.websocket or self.websocket.closed:
-            _LOGGER.debug("%s:Connecting to websocket %s", vin[-5:], self.websocket_url)
-            self.websocket = await self.websession.ws_connect(self.websocket_url)
-            loop = asyncio.get_event_loop()
-            loop.create_task(_process_messages())
-        while not (
-            disconnected
-            or time.time() > last_message_time + WEBSOCKET_TIMEOUT
-        ):
-            _LOGGER.debug("%s:Trying to subscribe to websocket", vin[-5:])
-            await self.websocket.send_json(
-                data={
-                    "msg_type": "data:subscribe_oauth",
-                    "token": self.access_token,
-                    "value": "shift_state,speed,power,est_lat,est_lng,est_heading,est_corrected_lat,est_corrected_lng,native_latitude,native_longitude,native_heading,native_type,native_location_supported",
-                    # "value": "speed,odometer,soc,elevation,est_heading,est_lat,est_lng,power,shift_state,range,est_range,heading",
-                    # old values
-                    "tag": f"{vehicle_id}",
-                    "created:timestamp": round(time.time() * 1000),
-                }
-            )
-            await asyncio.sleep(WEBSOCKET_TIMEOUT - 1)
-        _LOGGER.debug(
-            "%s:Exiting websocket_connect",
-            vin[-5:],
+        _LOGGER.debug("%s:Subscribing to websocket", vin[-5:])
+        await self.streaming.subscribe(
+            vehicle_id,
+            on_message=kwargs.get("on_message"),
+            on_disconnect=kwargs.get("on_disconnect"),
         )
 
-    # async def websocket_connect2(self, vin: int, vehicle_id: int, **kwargs):
-    #     """Connect to Tesla streaming websocket.
-
-    #     Args:
-    #         vin (int): vin of vehicle
-    #         vehicle_id (int): vehicle_id from Tesla api
-    #         on_message (function): function to call on a valid message. It must
-    #                                process a json delivered in data
-    #         on_disconnect (function): function to call on a disconnect message. It must
-    #                                process a json delivered in data
-
-    #     """
-
-    #     async def _process_messages() -> None:
-    #         """Start Async WebSocket Listener."""
-    #         async for msg in self.websocket[vin]["websocket"]:
-    #             _LOGGER.debug("%s:msg: %s", vin[-5:], msg)
-    #             if msg.type == aiohttp.WSMsgType.BINARY:
-    #                 msg_json = orjson.loads(msg.data)
-    #                 if msg_json["msg_type"] == "control:hello":
-    #                     _LOGGER.debug(
-    #                         "%s:Succesfully connected to websocket %s on %s",
-    #                         vin[-5:],
-    #                         self.websocket_url,
-    #                         task,
-    #                     )
-    #                 if (
-    #                     msg_json["msg_type"] == "data:error"
-    #                     and msg_json["value"] == "Can't validate token. "
-    #                 ):
-    #                     raise TeslaException(
-    #                         "Can't validate token for websocket connection."
-    #                     )
-    #                 if (
-    #                     msg_json["msg_type"] == "data:error"
-    #                     and msg_json["value"] == "disconnected"
-    #                 ):
-    #                     if self.websocket[vin].kwargs.get("on_disconnect"):
-    #                         self.websocket[vin].kwargs.get("on_disconnect")()
-    #                     self.websocket[vin].pop(None)
-    #                     _LOGGER.debug(
-    #                         "%s:Disconnecting from websocket on %s", vin[-5:], task
-    #                     )
-    #                 await self.websocket[vin]["websocket"].close()
-    #                 if kwargs.get("on_message"):
-    #                     kwargs.get("on_message")(msg_json)
-    #             elif msg.type == aiohttp.WSMsgType.ERROR:
-    #                 _LOGGER.debug("WSMsgType error")
-    #                 break
-
-    #     self.websocket.setdefault(vin, {"websocket": None, "kwargs": kwargs})
-    #     if (
-    #         not self.websocket[vin]["websocket"]
-    #         or self.websocket[vin]["websocket"].closed
-    #     ):
-    #         _LOGGER.debug("%s:Connecting to websocket %s", vin[-5:], self.websocket_url)
-    #         self.websocket[vin]["websocket"] = await self.websession.ws_connect(
-    #             self.websocket_url
-    #         )
-    #         loop = asyncio.get_event_loop()
-    #         task = loop.create_task(_process_messages())
-    #     _LOGGER.debug(
-    #         "%s:Trying to subscribe to websocket: %s", vin[-5:], self.access_token
-    #     )
-
-    #     await self.websocket[vin]["websocket"].send_json(
-    #         data={
-    #             "msg_type": "data:subscribe_oauth",
-    #             # "token": "self.access_token",
-    #             "token": self.access_token,
-    #             "value": "speed,odometer,soc,elevation,est_heading,est_lat,est_lng,power,shift_state,range,est_range,heading",
-    #             "tag": f"{vehicle_id}",
-    #         }
-    #     )
-
     async def close(self) -> None:
         """Close connection."""
+        await self.streaming.close()
         await self.websession.aclose()
         _LOGGER.debug("Connection closed.")
 
@@ -624,6 +655,12 @@ def get_inputs(soup: BeautifulSoup, searchfield=None) -> Dict[str, str]:
     return data
 
 
+def _log_token_refresh_failure(future: asyncio.Future) -> None:
+    """Log a failed oauth refresh nobody awaited."""
+    if not future.cancelled() and future.exception():
+        _LOGGER.debug("Oauth refresh failed: %s", future.exception())
+
+
 def _process_resp(resp) -> Text:
     if resp.history:
         for item in resp.history:
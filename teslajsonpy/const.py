@@ -12,8 +12,17 @@ DRIVING_INTERVAL = 60  # Default interval when driving detected
 UPDATE_INTERVAL = 300  # Default polling interval for vehicle
 WEBSOCKET_TIMEOUT = 11  # time for websocket to timeout
 WAKE_TIMEOUT = 60  # max time to wait for vehicle to wake
-WAKE_CHECK_INTERVAL = 2  # wait period between wake checks after a wake request
+WAKE_CHECK_INTERVAL = 1  # first wait between wake checks after a wake request
+WAKE_CHECK_MAX_INTERVAL = 8  # largest wait between wake checks
+WAKE_CHECK_BACKOFF = 1.5  # growth of the wait after each wake check
 MAX_API_RETRY_TIME = 15  # how long to retry api calls
+STARTUP_CONCURRENCY = 8  # products fetched at once while generating objects
+FLEET_MAX_CONCURRENCY = 10  # accounts of a FleetManager connecting or updating at once
+RATE_LIMIT_PAUSE = 60  # seconds to pause polling after a 429 without Retry-After
+TOKEN_REFRESH_MARGIN = 300  # seconds before oauth expiry to refresh in background
+HTTP_MAX_CONNECTIONS = 100  # max connections in the default http pool
+HTTP_MAX_KEEPALIVE_CONNECTIONS = 20  # max idle connections kept in the pool
+HTTP_KEEPALIVE_EXPIRY = 5  # seconds an idle pooled connection is kept open
 RELEASE_NOTES_URL = "https://teslascope.com/teslapedia/software/"
 AUTH_DOMAIN = "https://auth.tesla.com"
 API_URL = "https://owner-api.teslamotors.com"
@@ -21,6 +30,52 @@ CLIENT_ID = "ownerapi"
 API_URL_CN = "https://owner-api.vn.cloud.tesla.cn"
 DOMAIN_KEY = {".com": API_URL, ".cn": API_URL_CN}
 WS_URL = "wss://streaming.vn.teslamotors.com/streaming"
+STREAMING_VEHICLES_PER_SOCKET = 50  # vehicles multiplexed on a websocket
+STREAMING_MAX_SOCKETS = 4  # streaming websockets opened per account at most
+STREAMING_MAX_RECONNECTS = 10  # failed websocket connects in a row before giving up
+STREAMING_RESUBSCRIBES = 3  # resubscribes of a disconnected vehicle before giving up
+STREAMING_BACKOFF_BASE = 1  # seconds before the first websocket reconnect
+STREAMING_BACKOFF_MAX = 60  # largest seconds between websocket reconnects
+TELEMETRY_QUEUE_SIZE = 100  # frames queued per telemetry stream before overflow
+TELEMETRY_BACKLOG_SIZE = 1000  # frames held past the queue by the block policy
+VEHICLE_CONFIG_TTL = 3600  # seconds between polls of vehicle_config and gui_settings
+# VEHICLE_DATA sub-endpoints polled by vehicle activity with tiered_vehicle_data.
+# "wake" is polled first, after the vehicle wakes and once VEHICLE_CONFIG_TTL passes.
+VEHICLE_DATA_ENDPOINTS = {
+    "wake": (
+        "charge_state",
+        "climate_state",
+        "drive_state",
+        "gui_settings",
+        "vehicle_config",
+        "vehicle_state",
+        "location_data",
+    ),
+    "idle": (
+        "charge_state",
+        "climate_state",
+        "drive_state",
+        "vehicle_state",
+        "location_data",
+    ),
+    "driving": ("drive_state", "charge_state", "location_data"),
+}
+# Columns of a streaming data:update value after its leading timestamp
+STREAMING_COLUMNS = (
+    "shift_state",
+    "speed",
+    "power",
+    "est_lat",
+    "est_lng",
+    "est_heading",
+    "est_corrected_lat",
+    "est_corrected_lng",
+    "native_latitude",
+    "native_longitude",
+    "native_heading",
+    "native_type",
+    "native_location_supported",
+)
 
 TESLA_PRODUCT_TYPE_VEHICLES = "vehicles"
 
@@ -5,24 +5,41 @@ Python Package for controlling Tesla API.
 For more details about this api, please refer to the documentation at
 https://github.com/zabuldon/teslajsonpy
 """
+from array import array
 import asyncio
 import logging
-import pkgutil
 import time
 import ssl
-from json import JSONDecodeError
-from typing import Dict, List, Optional, Set, Text
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Text,
+)
 
 import httpx
-import orjson
 from tenacity import retry, stop_after_delay
 from yarl import URL
 
 from teslajsonpy.car import TeslaCar
+from teslajsonpy.changes import ChangeCallback, ChangeDispatcher, diff_update
+from teslajsonpy.compact import (
+    RawVehicleData,
+    compact_vehicle_data as split_vehicle_data,
+    expand_vehicle_data,
+)
 from teslajsonpy.connection import Connection
 from teslajsonpy.const import (
     AUTH_DOMAIN,
     DRIVING_INTERVAL,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
     IDLE_INTERVAL,
     MAX_API_RETRY_TIME,
     ONLINE_INTERVAL,
@@ -30,21 +47,63 @@ from teslajsonpy.const import (
     RESOURCE_TYPE_BATTERY,
     RESOURCE_TYPE_SOLAR,
     SLEEP_INTERVAL,
+    STARTUP_CONCURRENCY,
+    TELEMETRY_BACKLOG_SIZE,
+    TELEMETRY_QUEUE_SIZE,
     UPDATE_INTERVAL,
-    WAKE_CHECK_INTERVAL,
-    WAKE_TIMEOUT,
+    VEHICLE_CONFIG_TTL,
+    VEHICLE_DATA_ENDPOINTS,
     CLIENT_ID,
 )
-from teslajsonpy.energy import EnergySite, PowerwallSite, SolarPowerwallSite, SolarSite
+from teslajsonpy.endpoints import EndpointRegistry, get_endpoint_registry
+from teslajsonpy.energy import EnergySite, create_energysite
 from teslajsonpy.exceptions import (
     TeslaException,
     custom_retry,
     custom_retry_except_unavailable,
     custom_wait,
 )
+from teslajsonpy.frames import FrameDecoder
+from teslajsonpy.history import (
+    SITE_COLUMNS,
+    VEHICLE_COLUMNS,
+    RingBuffer,
+    record_frame,
+    record_site_data,
+    record_vehicle_data,
+)
+from teslajsonpy.instrumentation import Instrumentation, before_sleep_instrumented
+from teslajsonpy.ratelimit import RateLimiter
+from teslajsonpy.recording import RecordingTransport, TrafficRecorder
+from teslajsonpy.scheduler import PollingScheduler
+from teslajsonpy.snapshot import SNAPSHOT_VERSION, is_compatible
+from teslajsonpy.streaming import StreamHealth
+from teslajsonpy.telemetry import OVERFLOW_DROP_OLDEST, TelemetryHub, TelemetryStream
+from teslajsonpy.wake import WakeCoordinator, WakeStats
 
 _LOGGER = logging.getLogger(__name__)
 
+SCHEDULE_VEHICLE = "vehicle"
+SCHEDULE_ENERGYSITE = "energysite"
+SCHEDULE_PRODUCT_LIST = ("product_list", None)
+
+
+def _client(
+    recorder: Optional[TrafficRecorder],
+    ssl_context: ssl.SSLContext,
+    limits: httpx.Limits,
+    http2: bool,
+) -> httpx.AsyncClient:
+    """Return the default client, recording its traffic if recorder is set."""
+    if recorder is None:
+        return httpx.AsyncClient(
+            timeout=60, verify=ssl_context, limits=limits, http2=http2
+        )
+    transport = httpx.AsyncHTTPTransport(verify=ssl_context, limits=limits, http2=http2)
+    return httpx.AsyncClient(
+        timeout=60, transport=RecordingTransport(recorder, transport)
+    )
+
 
 def valid_result(result):
     """Check if TeslaAPI result successful.
@@ -109,7 +168,23 @@ class Controller:
         auth_domain: str = AUTH_DOMAIN,
         api_proxy_url: str = None,
         api_proxy_cert: str = None,
-        client_id: str = CLIENT_ID
+        client_id: str = CLIENT_ID,
+        max_concurrency: int = 1,
+        startup_concurrency: int = STARTUP_CONCURRENCY,
+        http2: bool = False,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        coalesce_requests: bool = True,
+        rate_limit: float = None,
+        rate_limit_burst: int = None,
+        rate_limiter: RateLimiter = None,
+        instrumentation: Instrumentation = None,
+        compact_vehicle_data: bool = False,
+        history_size: int = 0,
+        recorder: TrafficRecorder = None,
+        tiered_vehicle_data: bool = False,
+        vehicle_config_ttl: int = VEHICLE_CONFIG_TTL,
     ) -> None:
         """Initialize controller.
 
@@ -134,13 +209,63 @@ class Controller:
             api_proxy_url (str, optional): HTTPS Proxy for Fleet API commands
             api_proxy_cert (str, optional): Custom SSL certificate to use with proxy
             client_id (str, optional): Required for modern vehicles using Fleet API
+            max_concurrency (int, optional): Maximum number of API requests an update will
+            have in flight at once. Defaults to 1, which updates products in sequence.
+            startup_concurrency (int, optional): Maximum number of products fetched at once by
+            generate_car_objects and generate_energysite_objects. Defaults to STARTUP_CONCURRENCY.
+            http2 (bool, optional): Multiplex requests over HTTP/2 when the controller creates its
+            own client. Requires httpx[http2]. Defaults to False.
+            max_connections (int, optional): Max connections in the pool of a created client.
+            max_keepalive_connections (int, optional): Max idle connections kept in the pool of a
+            created client. Raised to max_concurrency or startup_concurrency if lower.
+            keepalive_expiry (float, optional): Seconds an idle connection of a created client is
+            kept open.
+            coalesce_requests (bool, optional): Share one request and response between identical
+            concurrent GET calls. Commands are never coalesced. Defaults to True.
+            rate_limit (float, optional): Requests per second allowed for polling. Defaults to None,
+            which only backs off when the API reports a rate limit. Commands are never held back.
+            rate_limit_burst (int, optional): Polling requests allowed in a burst. Defaults to one
+            minute of rate_limit.
+            rate_limiter (RateLimiter, optional): Rate limiter to use instead of one made from
+            rate_limit and rate_limit_burst, e.g., one drawing on a FleetRateLimiter.
+            instrumentation (Instrumentation, optional): Receives request, retry and token
+            refresh events, e.g., a HistogramCollector. Defaults to None.
+            compact_vehicle_data (bool, optional): Only keep the vehicle data fields the library
+            reads and store the other fields as JSON bytes, see get_raw_vehicle_data.
+            Reduces memory for large fleets. Defaults to False.
+            history_size (int, optional): Samples of speed, power, location and battery per
+            vehicle and of power flows per energy site kept in a ring buffer, see get_history.
+            Defaults to 0, which keeps no history.
+            recorder (TrafficRecorder, optional): Records the streaming messages and, when the
+            controller creates its client, the REST traffic with tokens redacted. To record
+            with your own websession, give it a RecordingTransport. Defaults to None.
+            tiered_vehicle_data (bool, optional): Poll only the VEHICLE_DATA sections the
+            vehicle activity needs, see const.VEHICLE_DATA_ENDPOINTS, and merge them into the
+            cached data. Defaults to False, which polls every section.
+            vehicle_config_ttl (int, optional): Seconds between polls of vehicle_config and
+            gui_settings with tiered_vehicle_data. Defaults to VEHICLE_CONFIG_TTL.
 
         """
         if not websession or not isinstance(websession, httpx.AsyncClient):
             # create_default_context() does blocking I/O. It is recommended
             # to always pass an httpx.AsyncClient instance to the Controller
             ssl_context = ssl.create_default_context()
-            websession = httpx.AsyncClient(timeout=60, verify=ssl_context)
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max(
+                    max_keepalive_connections or 0,
+                    max_concurrency or 1,
+                    startup_concurrency or 1,
+                ),
+                keepalive_expiry=keepalive_expiry,
+            )
+            try:
+                websession = _client(recorder, ssl_context, limits, http2)
+            except ImportError:
+                _LOGGER.warning(
+                    "HTTP/2 requested but h2 is not installed; falling back to HTTP/1.1"
+                )
+                websession = _client(recorder, ssl_context, limits, False)
 
             if api_proxy_cert:
                 # Loading custom SSL certificate for proxy does blocking I/O.
@@ -161,7 +286,12 @@ class Controller:
             auth_domain=auth_domain,
             client_id=client_id,
             api_proxy_url=api_proxy_url,
+            coalesce_requests=coalesce_requests,
+            rate_limiter=rate_limiter
+            or RateLimiter(rate=rate_limit, burst=rate_limit_burst),
+            instrumentation=instrumentation,
         )
+        self.__connection.streaming.recorder = recorder
         self._update_interval: int = update_interval
         self._driving_interval: int = driving_interval
         self._update_interval_vin = {}
@@ -173,17 +303,23 @@ class Controller:
         self._last_attempted_update_time = 0  # all attempts by controller
         self.__lock = {}
         self.__update_lock = None  # controls access to update function
-        self.__wakeup_lock = {}
+        self.__request_semaphore = None  # limits concurrent product updates
+        self._max_concurrency: int = max(1, max_concurrency or 1)
+        self._startup_concurrency: int = max(1, startup_concurrency or 1)
+        self._wake_coordinator = WakeCoordinator()
         self.car_online = {}
         self.__id_vin_map = {}
         self.__vin_id_map = {}
         self.__vin_vehicle_id_map = {}
         self.__vehicle_id_vin_map = {}
         self.__websocket_listeners = []
+        self._frame_decoder = FrameDecoder()
+        self._telemetry = TelemetryHub()
+        self.__change_dispatcher = ChangeDispatcher()
         self.__last_parked_timestamp = {}
         self.__update_state = {}
         self.enable_websocket = enable_websocket
-        self.endpoints = {}
+        self.endpoints: EndpointRegistry = None
         self.polling_policy = polling_policy
 
         self._include_vehicles: bool = True
@@ -191,6 +327,14 @@ class Controller:
         self._product_list: List[dict] = []
         self._vehicle_list: List[dict] = []
         self._vehicle_data: Dict[str, dict] = {}
+        self._compact_vehicle_data: bool = compact_vehicle_data
+        self._raw_vehicle_data: Dict[str, RawVehicleData] = {}
+        self._tiered_vehicle_data: bool = tiered_vehicle_data
+        self._vehicle_config_ttl: int = vehicle_config_ttl
+        self._full_vehicle_data_time: Dict[str, int] = {}
+        self._history_size: int = max(0, history_size)
+        self._vehicle_history: Dict[str, RingBuffer] = {}
+        self._site_history: Dict[int, RingBuffer] = {}
         self._energysite_list: List[dict] = []
         self._site_config: Dict[int, dict] = {}
         self._site_data: Dict[int, dict] = {}
@@ -198,6 +342,9 @@ class Controller:
         self._grid_status_unknown: Dict[int, bool] = {}
         self.cars: Dict[str, TeslaCar] = {}
         self.energysites: Dict[int, EnergySite] = {}
+        self._scheduler = PollingScheduler()
+        self.__scheduler_task: Optional[asyncio.Task] = None
+        self.__scheduler_wakeup: Optional[asyncio.Event] = None
 
     async def connect(
         self,
@@ -224,6 +371,7 @@ class Controller:
 
         self._last_attempted_update_time = round(time.time())
         self.__update_lock = asyncio.Lock()
+        self.__request_semaphore = asyncio.Semaphore(self._max_concurrency)
 
         if not test_login:
             self._product_list = await self.get_product_list()
@@ -251,6 +399,8 @@ class Controller:
     async def disconnect(self) -> None:
         """Disconnect from Tesla api."""
         _LOGGER.debug("Disconnecting controller.")
+        await self.stop_scheduler()
+        self._telemetry.close()
         await self.__connection.close()
 
     def is_token_refreshed(self) -> bool:
@@ -288,6 +438,149 @@ class Controller:
         """
         return self.__connection.expiration
 
+    def get_snapshot(self) -> Dict[Text, Any]:
+        """Return the state needed to restart without fetching every product.
+
+        The snapshot holds the tokens, the product list, the last vehicle and
+        site data and the polling timers and intervals. It is plain JSON data,
+        see teslajsonpy.snapshot.save_snapshot, and holds secrets.
+
+        Returns
+            Dict[Text, Any]: Snapshot for restore_snapshot
+
+        """
+        vehicles = {}
+        for vin in self.cars:
+            vehicles[vin] = {
+                "data": self.get_raw_vehicle_data(vin),
+                "online": self.car_online.get(vin),
+                "updates": self.__update.get(vin, True),
+                "update_state": self.__update_state.get(vin, "normal"),
+                "last_update_time": self._last_update_time.get(vin, 0),
+                "last_wake_up_time": self._last_wake_up_time.get(vin, 0),
+                "last_park_time": self.__last_parked_timestamp.get(vin, 0),
+                "full_data_time": self._full_vehicle_data_time.get(vin),
+                "update_interval": self._update_interval_vin.get(vin),
+                "driving_interval": self._driving_interval_vin.get(vin),
+            }
+        energysites = [
+            {
+                "id": energysite_id,
+                "config": self._site_config.get(energysite_id, {}),
+                "data": self._site_data.get(energysite_id, {}),
+                "summary": self._site_summary.get(energysite_id),
+                "grid_status_unknown": self._grid_status_unknown.get(
+                    energysite_id, True
+                ),
+            }
+            for energysite_id in self.energysites
+        ]
+        return {
+            "version": SNAPSHOT_VERSION,
+            "time": round(time.time()),
+            "tokens": {
+                "refresh_token": self.__connection.refresh_token,
+                "access_token": self.__connection.access_token,
+                "expiration": self.__connection.expiration,
+                "id_token": self.__connection.id_token,
+            },
+            "update_interval": self._update_interval,
+            "driving_interval": self._driving_interval,
+            "product_list": self._product_list,
+            "vehicle_list": [
+                car for car in self._vehicle_list if car["vin"] in vehicles
+            ],
+            "energysite_list": [
+                site
+                for site in self._energysite_list
+                if site["energy_site_id"] in self.energysites
+            ],
+            "vehicles": vehicles,
+            "energysites": energysites,
+        }
+
+    def restore_snapshot(self, snapshot: Dict[Text, Any]) -> bool:
+        """Restore a snapshot of get_snapshot instead of connect and generate_*.
+
+        Cars and energy sites are rebuilt from the saved data without any API
+        call and the next update() polls them by their saved timers, so
+        sleeping cars are not woken and keep their data.
+
+        Args
+            snapshot (Dict[Text, Any]): Result of get_snapshot
+
+        Returns
+            bool: False if the snapshot is of another SNAPSHOT_VERSION and the
+            controller should connect instead
+
+        """
+        if not is_compatible(snapshot):
+            _LOGGER.debug("Ignoring incompatible snapshot")
+            return False
+        self.__connection.set_tokens(**snapshot["tokens"])
+        self._last_attempted_update_time = round(time.time())
+        self.__update_lock = asyncio.Lock()
+        self.__request_semaphore = asyncio.Semaphore(self._max_concurrency)
+        self._update_interval = snapshot["update_interval"]
+        self._driving_interval = snapshot["driving_interval"]
+        self._product_list = snapshot["product_list"]
+        self._vehicle_list = snapshot["vehicle_list"]
+        self._energysite_list = snapshot["energysite_list"]
+
+        for car in self._vehicle_list:
+            vin = car["vin"]
+            saved = snapshot["vehicles"][vin]
+            self._register_car(car)
+            data = saved["data"]
+            if self._compact_vehicle_data:
+                data, raw = split_vehicle_data(data)
+                if raw is not None:
+                    self._raw_vehicle_data[vin] = raw
+            self._vehicle_data[vin] = data
+            self.car_online[vin] = saved["online"]
+            self.__update[vin] = saved["updates"]
+            self.__update_state[vin] = saved["update_state"]
+            self._last_update_time[vin] = saved["last_update_time"]
+            self._last_wake_up_time[vin] = saved["last_wake_up_time"]
+            self.__last_parked_timestamp[vin] = saved["last_park_time"]
+            if saved["full_data_time"] is not None:
+                self._full_vehicle_data_time[vin] = saved["full_data_time"]
+            if saved["update_interval"] is not None:
+                self._update_interval_vin[vin] = saved["update_interval"]
+            if saved["driving_interval"] is not None:
+                self._driving_interval_vin[vin] = saved["driving_interval"]
+            self.cars[vin] = TeslaCar(car, self, self._vehicle_data[vin])
+            self._reschedule_vehicle(vin)
+
+        for saved in snapshot["energysites"]:
+            energysite_id = saved["id"]
+            self._site_config[energysite_id] = saved["config"]
+            self._site_data[energysite_id] = saved["data"]
+            if saved["summary"] is not None:
+                self._site_summary[energysite_id] = saved["summary"]
+            self._grid_status_unknown[energysite_id] = saved["grid_status_unknown"]
+        for energysite in self._energysite_list:
+            self._create_energysite(energysite)
+        return True
+
+    def get_rate_limit(self) -> Dict[Text, Any]:
+        """Return the current rate limit budget of the account.
+
+        Returns
+            Dict[Text, Any]: See :attr:`teslajsonpy.ratelimit.RateLimiter.budget`
+
+        """
+        return self.__connection.rate_limiter.budget
+
+    def get_stream_health(self) -> StreamHealth:
+        """Return the health of the streaming websockets.
+
+        Returns
+            StreamHealth: Connected sockets, last frame age and reconnect count
+
+        """
+        return self.__connection.streaming.health()
+
     def get_oauth_url(self) -> URL:
         """Return oauth url."""
         return self.__connection.get_authorization_code_link(new=True)
@@ -318,6 +611,89 @@ class Controller:
         self.__websocket_listeners.append(callback)
         return len(self.__websocket_listeners) - 1
 
+    def stream(
+        self,
+        vin: Text,
+        fields: Optional[Iterable[Text]] = None,
+        maxsize: int = TELEMETRY_QUEUE_SIZE,
+        overflow: Text = OVERFLOW_DROP_OLDEST,
+        max_backlog: int = TELEMETRY_BACKLOG_SIZE,
+    ) -> TelemetryStream:
+        """Return an async iterator over the streaming frames of a vehicle.
+
+        Iterating subscribes the vehicle to streaming. While the stream is
+        open, polls that find the vehicle in gear resubscribe it, as with
+        enable_websocket. Frames are queued off the websocket reader, so a
+        slow consumer never delays other vehicles or streams.
+
+        Args
+            vin (Text): vin of the vehicle
+            fields (Iterable[Text], optional): Streaming columns, e.g., speed or
+                est_lat. timestamp is always included. Defaults to all.
+            maxsize (int, optional): Frames queued before overflow applies.
+            overflow (Text, optional): drop_oldest drops the oldest frame,
+                conflate replaces the newest queued frame and block holds frames
+                in a backlog, dropping new frames once it is full. Defaults to
+                drop_oldest.
+            max_backlog (int, optional): Frames held past maxsize by block.
+
+        Returns
+            TelemetryStream: Yields dicts of the fields by name
+
+        Raises
+            ValueError: Unknown vin, field or overflow policy
+
+        """
+        if vin not in self.cars:
+            raise ValueError(f"Unknown vin: {vin}")
+
+        async def _start() -> None:
+            vehicle_id = self.vin_to_vehicle_id(vin)
+            if not self.__connection.streaming.is_subscribed(vehicle_id):
+                await self.__connection.websocket_connect(
+                    vin[-5:],
+                    vehicle_id,
+                    on_message=self._process_websocket_message,
+                    on_disconnect=self._process_websocket_disconnect,
+                )
+
+        stream = TelemetryStream(
+            vin,
+            self._frame_decoder,
+            fields=fields,
+            maxsize=maxsize,
+            overflow=overflow,
+            max_backlog=max_backlog,
+            on_start=_start,
+            on_close=self._telemetry.remove,
+        )
+        self._telemetry.add(stream)
+        return stream
+
+    def subscribe_changes(
+        self,
+        callback: ChangeCallback,
+        paths: Optional[List[Text]] = None,
+        vin: Optional[Text] = None,
+    ) -> Callable[[], None]:
+        """Register callback for changed vehicle data fields.
+
+        Polls and websocket frames are diffed against the cached vehicle data
+        and callback is only called when a subscribed field changed.
+
+        Args
+            callback (function): function to call with the vin and a dict of
+            (old, new) values by dotted path, e.g., charge_state.battery_level
+            paths (List[Text], optional): Fields or sections like charge_state to
+            subscribe to. Defaults to None, which subscribes to all fields.
+            vin (Text, optional): Only call for this vin. Defaults to None.
+
+        Returns
+            Callable[[], None]: Function that removes the subscription
+
+        """
+        return self.__change_dispatcher.subscribe(callback, paths=paths, vin=vin)
+
     async def get_product_list(self) -> list:
         """Get product list from Tesla."""
         return (await self.api("PRODUCT_LIST"))["response"]
@@ -328,14 +704,30 @@ class Controller:
             "response"
         ]
 
-    async def get_vehicle_data(self, vin: str, wake_if_asleep: bool = False) -> dict:
-        """Get vehicle data json from TeslaAPI for a given vin."""
+    async def get_vehicle_data(
+        self,
+        vin: str,
+        wake_if_asleep: bool = False,
+        endpoints: Optional[Iterable[str]] = None,
+    ) -> dict:
+        """Get vehicle data json from TeslaAPI for a given vin.
+
+        endpoints selects the sections returned, e.g., ("drive_state",
+        "charge_state"); None returns every section. A partial response only
+        holds the top level fields and the selected sections.
+
+        With compact_vehicle_data only the fields the library reads are returned
+        and the other fields, merged with earlier sections, are kept for
+        get_raw_vehicle_data.
+        """
+        params = {"endpoints": ";".join(endpoints)} if endpoints else {}
         try:
             response = (
                 await self.api(
                     "VEHICLE_DATA",
                     path_vars={"vehicle_id": self._vin_to_id(vin)},
                     wake_if_asleep=wake_if_asleep,
+                    **params,
                 )
             )["response"]
 
@@ -345,8 +737,66 @@ class Controller:
                 return {}
             raise ex
 
+        if self._compact_vehicle_data:
+            response, raw = split_vehicle_data(response)
+            if raw is not None:
+                if endpoints and vin in self._raw_vehicle_data:
+                    self._raw_vehicle_data[vin].update(raw)
+                else:
+                    self._raw_vehicle_data[vin] = raw
         return response
 
+    def get_raw_vehicle_data(self, vin: str) -> dict:
+        """Return the last full vehicle data response for a vin.
+
+        With compact_vehicle_data this rebuilds it from the compact data and the
+        stored JSON bytes on every call, so read the fields needed and drop the
+        result.
+        """
+        if self._compact_vehicle_data:
+            return expand_vehicle_data(
+                self._vehicle_data.get(vin, {}), self._raw_vehicle_data.get(vin)
+            )
+        return self._vehicle_data.get(vin, {})
+
+    def get_raw_site_data(self, energysite_id: int) -> dict:
+        """Return the last SITE_DATA response for an energy site."""
+        return self._site_data.get(energysite_id, {})
+
+    def get_history(
+        self,
+        vin: str,
+        seconds: Optional[float] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, array]:
+        """Return the recorded history of a vehicle without calling the API.
+
+        Args
+            vin (str): vin of the vehicle
+            seconds (float, optional): Only the trailing window of this many seconds.
+            columns (List[str], optional): Columns of history.VEHICLE_COLUMNS. Defaults to all.
+
+        Returns
+            Dict[str, array]: timestamp in seconds and each column as aligned arrays of
+            floats, NaN where a sample has no value. Empty if history is disabled.
+
+        """
+        history = self._vehicle_history.get(vin)
+        return history.window(seconds, columns) if history is not None else {}
+
+    def get_site_history(
+        self,
+        energysite_id: int,
+        seconds: Optional[float] = None,
+        columns: Optional[List[str]] = None,
+    ) -> Dict[str, array]:
+        """Return the recorded history of an energy site without calling the API.
+
+        See get_history; columns are history.SITE_COLUMNS.
+        """
+        history = self._site_history.get(energysite_id)
+        return history.window(seconds, columns) if history is not None else {}
+
     async def get_vehicle_summary(self, vin: str) -> dict:
         """Get vehicle summary json from TeslaAPI for a given vin."""
         return (
@@ -381,107 +831,115 @@ class Controller:
             filtered_vins (list, optional): If not empty, filters the cars by the provided VINs.
 
         """
+        cars = []
         for car in self._vehicle_list:
             vin = car["vin"]
             if filtered_vins and vin not in filtered_vins:
                 _LOGGER.debug("Skipping car with VIN: %s", vin)
                 continue
+            self._register_car(car)
+            cars.append(car)
 
-            self.set_id_vin(car_id=car["id"], vin=vin)
-            self.set_vehicle_id_vin(vehicle_id=car["vehicle_id"], vin=vin)
-            self.__lock[vin] = asyncio.Lock()
-            self.__wakeup_lock[vin] = asyncio.Lock()
-            self._last_update_time[vin] = 0
-            self._last_wake_up_time[vin] = 0
-            self.__update[vin] = True
-            self.__update_state[vin] = "normal"
-            self.set_car_online(vin=vin, online_status=car["state"] == "online")
-            self.set_last_park_time(vin=vin, timestamp=self._last_attempted_update_time)
-            self.__driving[vin] = {}
-            self._vehicle_data[vin] = {}
-
-            try:
-                self._vehicle_data[vin] = await self.get_vehicle_data(
-                    vin, wake_if_asleep=wake_if_asleep
-                )
-            except TeslaException as ex:
-                _LOGGER.warning(
-                    "Unable to get vehicle data during setup, car will still be added. %s: %s",
-                    ex.code,
-                    ex.message,
-                )
+        await self._run_tasks(
+            [self._get_setup_vehicle_data(car["vin"], wake_if_asleep) for car in cars],
+            limit=self._startup_concurrency,
+        )
+        # Cars are added in product list order whichever data arrived first
+        for car in cars:
+            vin = car["vin"]
             self.cars[vin] = TeslaCar(car, self, self._vehicle_data[vin])
 
         return self.cars
 
+    def _register_car(self, car: dict) -> None:
+        """Set up the maps, locks and timers of a car from the product list."""
+        vin = car["vin"]
+        self.set_id_vin(car_id=car["id"], vin=vin)
+        self.set_vehicle_id_vin(vehicle_id=car["vehicle_id"], vin=vin)
+        self.__lock[vin] = asyncio.Lock()
+        self._last_update_time[vin] = 0
+        self._last_wake_up_time[vin] = 0
+        self.__update[vin] = True
+        self.__update_state[vin] = "normal"
+        self.set_car_online(vin=vin, online_status=car["state"] == "online")
+        self.set_last_park_time(vin=vin, timestamp=self._last_attempted_update_time)
+        self.__driving[vin] = {}
+        self._vehicle_data[vin] = {}
+
+    async def _get_setup_vehicle_data(self, vin: Text, wake_if_asleep: bool) -> None:
+        """Fetch the initial VEHICLE_DATA of a car; a car without data is still added."""
+        try:
+            self._vehicle_data[vin] = await self.get_vehicle_data(
+                vin, wake_if_asleep=wake_if_asleep
+            )
+            if self._vehicle_data[vin]:
+                self._full_vehicle_data_time[vin] = round(time.time())
+        except TeslaException as ex:
+            _LOGGER.warning(
+                "Unable to get vehicle data during setup, car will still be added. %s: %s",
+                ex.code,
+                ex.message,
+            )
+
     async def generate_energysite_objects(self) -> Dict[int, EnergySite]:
         """Generate energy site objects."""
+        await self._run_tasks(
+            [
+                self._get_setup_site_data(energysite)
+                for energysite in self._energysite_list
+            ],
+            limit=self._startup_concurrency,
+        )
         for energysite in self._energysite_list:
-            energysite_id = energysite["energy_site_id"]
-
-            self._site_config[energysite_id] = await self.get_site_config(energysite_id)
-            # For dealing with sites that always report "Unknown"
-            # Default to True and check during updates
-            self._grid_status_unknown = {energysite_id: True}
-            # Solar only systems (no Powerwalls) are listed as "solar"
-            try:
-                self._site_data[energysite_id] = await self.get_site_data(
-                    energysite_id
-                )
-            except TeslaException as ex:
-                _LOGGER.warning(
-                    "Unable to get site data during setup, site will still be added. %s: %s",
-                    ex.code,
-                    ex.message,
-                )
-                self._site_data[energysite_id] = {}
-
-            if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_SOLAR:
-
-                self.energysites[energysite_id] = SolarSite(
-                    self.api,
-                    energysite,
-                    self._site_config[energysite_id],
-                    self._site_data[energysite_id],
-                )
-            # Powerwall systems listed as "battery"
-            if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_BATTERY:
-
-                self._site_summary[energysite_id] = await self.get_site_summary(
-                    energysite_id
-                )
-
-                if energysite["components"]["solar"]:
-                    self.energysites[energysite_id] = SolarPowerwallSite(
-                        self.api,
-                        energysite,
-                        self._site_config[energysite_id],
-                        self._site_data[energysite_id],
-                        self._site_summary[energysite_id],
-                    )
-                else:
-                    self.energysites[energysite_id] = PowerwallSite(
-                        self.api,
-                        energysite,
-                        self._site_config[energysite_id],
-                        self._site_data[energysite_id],
-                        self._site_summary[energysite_id],
-                    )
+            self._create_energysite(energysite)
 
         return self.energysites
 
+    def _create_energysite(self, energysite: dict) -> None:
+        """Create the EnergySite of a product from the cached site responses."""
+        energysite_id = energysite["energy_site_id"]
+        site = create_energysite(
+            self.api,
+            energysite,
+            self._site_config[energysite_id],
+            self._site_data[energysite_id],
+            self._site_summary.get(energysite_id),
+        )
+        if site is not None:
+            self.energysites[energysite_id] = site
+
+    async def _get_setup_site_data(self, energysite: dict) -> None:
+        """Fetch the initial config, data and summary of an energy site."""
+        energysite_id = energysite["energy_site_id"]
+        self._site_config[energysite_id] = await self.get_site_config(energysite_id)
+        # For dealing with sites that always report "Unknown"
+        # Default to True and check during updates
+        self._grid_status_unknown[energysite_id] = True
+        # Solar only systems (no Powerwalls) are listed as "solar"
+        try:
+            self._site_data[energysite_id] = await self.get_site_data(energysite_id)
+        except TeslaException as ex:
+            _LOGGER.warning(
+                "Unable to get site data during setup, site will still be added. %s: %s",
+                ex.code,
+                ex.message,
+            )
+            self._site_data[energysite_id] = {}
+        # Powerwall systems listed as "battery"
+        if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_BATTERY:
+            self._site_summary[energysite_id] = await self.get_site_summary(
+                energysite_id
+            )
+
     async def wake_up(self, car_id) -> bool:
-        """Attempt to wake the car, returns True if successfully awakened."""
+        """Attempt to wake the car, returns True if successfully awakened.
+
+        Callers waking the same car at once share one wake; see WakeCoordinator.
+        """
         car_vin = self._id_to_vin(car_id)
         car_id = self._update_id(car_id)
-        async with self.__wakeup_lock[car_vin]:
-            wake_start_time = time.time()
-            wake_deadline = wake_start_time + WAKE_TIMEOUT
-            _LOGGER.debug(
-                "%s: Sending wake request with deadline of: %d",
-                car_vin[-5:],
-                wake_deadline,
-            )
+
+        async def _send() -> None:
             result = await self.api(
                 "WAKE_UP", path_vars={"vehicle_id": car_id}, wake_if_asleep=False
             )
@@ -491,27 +949,28 @@ class Controller:
                 car_id=car_id,
                 online_status=state == "online",
             )
-            while not self.is_car_online(vin=car_vin) and time.time() < wake_deadline:
-                await asyncio.sleep(WAKE_CHECK_INTERVAL)
-                response = await self.get_vehicle_summary(vin=car_vin)
-                state = response.get("state")
-                self.set_car_online(
-                    vin=car_vin,
-                    car_id=car_id,
-                    online_status=state == "online",
-                )
 
-            _LOGGER.debug(
-                "%s: Wakeup took %d seconds, state: %s",
-                car_vin[-5:],
-                time.time() - wake_start_time,
-                state,
-            )
-            return self.is_car_online(
+        async def _probe() -> None:
+            response = await self.get_vehicle_summary(vin=car_vin)
+            self.set_car_online(
                 vin=car_vin,
                 car_id=car_id,
+                online_status=response.get("state") == "online",
             )
 
+        return await self._wake_coordinator.wake(
+            car_vin, _send, _probe, lambda: self.is_car_online(vin=car_vin)
+        )
+
+    def get_wake_stats(self) -> Dict[Text, WakeStats]:
+        """Return the wake statistics of the cars woken so far.
+
+        Returns
+            Dict[Text, WakeStats]: Wake counts and durations by VIN
+
+        """
+        return self._wake_coordinator.stats()
+
     def _calculate_next_interval(self, vin: Text) -> int:
         cur_time = round(time.time())
         _LOGGER.debug(
@@ -610,6 +1069,181 @@ class Controller:
 
         return self.get_update_interval_vin(vin=vin)
 
+    async def _update_product_list(self, cur_time: int) -> None:
+        """Refresh the online state of all cars using get_product_list()."""
+        self._product_list = await self.get_product_list()
+        self._vehicle_list = [
+            cars for cars in self._product_list if "vehicle_id" in cars
+        ]
+        for car in self._vehicle_list:
+            if car["vin"] not in self.cars:
+                # Filtered out by generate_car_objects(filtered_vins=...)
+                continue
+            self.set_id_vin(car_id=car["id"], vin=car["vin"])
+            self.set_vehicle_id_vin(vehicle_id=car["vehicle_id"], vin=car["vin"])
+            self.set_car_online(vin=car["vin"], online_status=car["state"] == "online")
+            self.cars[car["vin"]].update_car_info(car)
+        self._last_attempted_update_time = cur_time
+
+    async def _get_and_process_car_data(
+        self, vin: str, wake_if_asleep: bool = False
+    ) -> None:
+        """Fetch VEHICLE_DATA for a vin and merge it into the cache."""
+        async with self.__lock[vin]:
+            tier = self._vehicle_data_tier(vin)
+            _LOGGER.debug("%s: Updating VEHICLE_DATA %s", vin[-5:], tier or "")
+            try:
+                if tier is None:
+                    response = await self.get_vehicle_data(
+                        vin, wake_if_asleep=wake_if_asleep
+                    )
+                else:
+                    response = await self.get_vehicle_data(
+                        vin,
+                        wake_if_asleep=wake_if_asleep,
+                        endpoints=VEHICLE_DATA_ENDPOINTS[tier],
+                    )
+            except TeslaException as ex:
+                # VEHICLE_UNAVAILABLE is handled in get_vehicle_data as debug and ignore
+                # Anything else would be caught here and logged as a warning
+                _LOGGER.warning(
+                    "Unable to get vehicle data during poll. %s: %s",
+                    ex.code,
+                    ex.message,
+                )
+                response = None
+
+            if response:
+                if (
+                    self.cars[vin].is_climate_on
+                    and self.cars[vin].is_climate_on
+                    != response["drive_state"]["shift_state"]
+                    and (
+                        response["drive_state"]["shift_state"] is None
+                        or response["drive_state"]["shift_state"] == "P"
+                    )
+                ):
+                    self.set_last_park_time(
+                        vin=vin,
+                        timestamp=response["drive_state"]["timestamp"] / 1000,
+                        shift_state=response["drive_state"]["shift_state"],
+                    )
+                self._last_update_time[vin] = round(time.time())
+                if tier in (None, "wake"):
+                    self._full_vehicle_data_time[vin] = round(time.time())
+
+                if (
+                    (self.enable_websocket or vin in self._telemetry)
+                    and self.cars[vin].is_in_gear
+                    and not self.__connection.streaming.is_subscribed(
+                        self.vin_to_vehicle_id(vin=vin)
+                    )
+                ):
+                    asyncio.create_task(
+                        self.__connection.websocket_connect(
+                            vin[-5:],
+                            self.vin_to_vehicle_id(vin=vin),
+                            on_message=self._process_websocket_message,
+                            on_disconnect=self._process_websocket_disconnect,
+                        )
+                    )
+
+                changes = (
+                    diff_update(self._vehicle_data[vin], response)
+                    if self.__change_dispatcher
+                    else None
+                )
+                self._vehicle_data[vin].update(response)
+                self.cars[vin].refresh_state()
+                if self._history_size:
+                    record_vehicle_data(self._vehicle_ring(vin), response)
+                if changes:
+                    self.__change_dispatcher.dispatch(vin, changes)
+
+            self._reschedule_vehicle(vin, from_now=True)
+
+    def _vehicle_data_tier(self, vin: str) -> Optional[str]:
+        """Return the VEHICLE_DATA_ENDPOINTS tier to poll for a vin.
+
+        None if tiered_vehicle_data is off. Every section is polled on the
+        first poll, after the vehicle woke and once vehicle_config_ttl passed.
+        """
+        if not self._tiered_vehicle_data:
+            return None
+        full = self._full_vehicle_data_time.get(vin)
+        if (
+            full is None
+            or full < self.get_last_wake_up_time(vin=vin)
+            or time.time() - full >= self._vehicle_config_ttl
+        ):
+            return "wake"
+        if self.cars[vin].is_in_gear:
+            return "driving"
+        return "idle"
+
+    async def _get_and_process_site_data(self, energysite_id: int) -> None:
+        """Fetch SITE_DATA for an energy site and merge it into the cache."""
+        _LOGGER.debug("Updating SITE_DATA for energysite: %s", energysite_id)
+        try:
+            response = await self.get_site_data(energysite_id)
+        except TeslaException:
+            response = None
+
+        if response:
+            # Some setups always report grid_status of "Unknown" regardless
+            # of the actual grid status. Others only report grid_status "Unknown"
+            # when the actual grid status is unknown. These setups also sometimes
+            # report an incorrect solar_power value of 0.
+            if (
+                "grid_status" not in response
+                or response.get("grid_status") != "Unknown"
+            ):
+                self._grid_status_unknown[energysite_id] = False
+
+            if (
+                energysite_id in self._grid_status_unknown
+                and not self._grid_status_unknown[energysite_id]
+                and (
+                    response.get("grid_status") == "Unknown"
+                    and response.get("solar_power") == 0
+                )
+            ):
+                _LOGGER.debug(
+                    "Ignoring possible spurious energy site solar power read."
+                )
+                response.pop("solar_power", None)
+
+            self._site_data[energysite_id].update(response)
+            if self._history_size:
+                history = self._site_history.get(energysite_id)
+                if history is None:
+                    history = self._site_history[energysite_id] = RingBuffer(
+                        SITE_COLUMNS, self._history_size
+                    )
+                record_site_data(history, response)
+
+    async def _get_and_process_site_summary(self, energysite_id: int) -> None:
+        """Fetch SITE_SUMMARY for an energy site and merge it into the cache."""
+        _LOGGER.debug("Updating SITE_SUMMARY for energysite: %s", energysite_id)
+        try:
+            response = await self.get_site_summary(energysite_id)
+        except TeslaException:
+            response = None
+
+        if response:
+            self._site_summary[energysite_id].update(response)
+
+    async def _get_and_process_site_config(self, energysite_id: int) -> None:
+        """Fetch SITE_CONFIG for an energy site and merge it into the cache."""
+        _LOGGER.debug("Updating SITE_CONFIG for energysite: %s", energysite_id)
+        try:
+            response = await self.get_site_config(energysite_id)
+        except TeslaException:
+            response = None
+
+        if response:
+            self._site_config[energysite_id].update(response)
+
     async def update(
         self,
         car_id: Optional[Text] = None,
@@ -642,105 +1276,6 @@ class Controller:
         """
         tasks = []
 
-        async def _get_and_process_car_data(vin: str) -> None:
-            async with self.__lock[vin]:
-                _LOGGER.debug("%s: Updating VEHICLE_DATA", vin[-5:])
-                try:
-                    response = await self.get_vehicle_data(
-                        vin, wake_if_asleep=wake_if_asleep
-                    )
-                except TeslaException as ex:
-                    # VEHICLE_UNAVAILABLE is handled in get_vehicle_data as debug and ignore
-                    # Anything else would be caught here and logged as a warning
-                    _LOGGER.warning(
-                        "Unable to get vehicle data during poll. %s: %s",
-                        ex.code,
-                        ex.message,
-                    )
-                    response = None
-
-                if response:
-                    if (
-                        self.cars[vin].is_climate_on
-                        and self.cars[vin].is_climate_on
-                        != response["drive_state"]["shift_state"]
-                        and (
-                            response["drive_state"]["shift_state"] is None
-                            or response["drive_state"]["shift_state"] == "P"
-                        )
-                    ):
-                        self.set_last_park_time(
-                            vin=vin,
-                            timestamp=response["drive_state"]["timestamp"] / 1000,
-                            shift_state=response["drive_state"]["shift_state"],
-                        )
-                    self._last_update_time[vin] = round(time.time())
-
-                    if self.enable_websocket and self.cars[vin].is_in_gear:
-                        asyncio.create_task(
-                            self.__connection.websocket_connect(
-                                vin[-5:],
-                                self.vin_to_vehicle_id(vin=vin),
-                                on_message=self._process_websocket_message,
-                                on_disconnect=self._process_websocket_disconnect,
-                            )
-                        )
-
-                    self._vehicle_data[vin].update(response)
-
-        async def _get_and_process_site_data(energysite_id: int) -> None:
-            _LOGGER.debug("Updating SITE_DATA for energysite: %s", energysite_id)
-            try:
-                response = await self.get_site_data(energysite_id)
-            except TeslaException:
-                response = None
-
-            if response:
-                # Some setups always report grid_status of "Unknown" regardless
-                # of the actual grid status. Others only report grid_status "Unknown"
-                # when the actual grid status is unknown. These setups also sometimes
-                # report an incorrect solar_power value of 0.
-                if (
-                    "grid_status" not in response
-                    or response.get("grid_status") != "Unknown"
-                ):
-                    self._grid_status_unknown[energysite_id] = False
-
-                if (
-                    energysite_id in self._grid_status_unknown
-                    and not self._grid_status_unknown[energysite_id]
-                    and (
-                        response.get("grid_status") == "Unknown"
-                        and response.get("solar_power") == 0
-                    )
-                ):
-                    _LOGGER.debug(
-                        "Ignoring possible spurious energy site solar power read."
-                    )
-                    del response["solar_power"]
-
-                self._site_data[energysite_id].update(response)
-
-        async def _get_and_process_site_summary(energysite_id: int) -> None:
-            _LOGGER.debug("Updating SITE_SUMMARY for energysite: %s", energysite_id)
-            try:
-                response = await self.get_site_summary(energysite_id)
-            except TeslaException:
-                response = None
-
-            if response:
-                self._site_summary[energysite_id].update(response)
-
-        async def _get_and_process_site_config(energysite_id: int) -> None:
-            _LOGGER.debug("Updating SITE_CONFIG for energysite: %s", energysite_id)
-            try:
-                response = await self.get_site_config(energysite_id)
-            except TeslaException:
-                response = None
-
-            if response:
-                self._site_config[energysite_id].update(response)
-
         async with self.__update_lock:
             if self._vehicle_list:
                 cur_time = round(time.time())
@@ -757,20 +1292,7 @@ class Controller:
                     or cur_time - last_update >= ONLINE_INTERVAL
                     and update_vehicles
                 ):
-                    self._product_list = await self.get_product_list()
-                    self._vehicle_list = [
-                        cars for cars in self._product_list if "vehicle_id" in cars
-                    ]
-                    for car in self._vehicle_list:
-                        self.set_id_vin(car_id=car["id"], vin=car["vin"])
-                        self.set_vehicle_id_vin(
-                            vehicle_id=car["vehicle_id"], vin=car["vin"]
-                        )
-                        self.set_car_online(
-                            vin=car["vin"], online_status=car["state"] == "online"
-                        )
-                        self.cars[car["vin"]].update_car_info(car)
-                    self._last_attempted_update_time = cur_time
+                    await self._update_product_list(cur_time)
 
                 # Only update online vehicles that haven't been updated recently
                 # The throttling is per car's last succesful update
@@ -812,7 +1334,9 @@ class Controller:
                                 )
                             )
                         ):
-                            tasks.append(_get_and_process_car_data(vin))
+                            tasks.append(
+                                self._get_and_process_car_data(vin, wake_if_asleep)
+                            )
                         else:
                             _LOGGER.debug(
                                 (
@@ -837,20 +1361,169 @@ class Controller:
                     ):
                         continue
 
-                    tasks.append(_get_and_process_site_data(energysite_id))
-                    tasks.append(_get_and_process_site_config(energysite_id))
+                    tasks.append(self._get_and_process_site_data(energysite_id))
+                    tasks.append(self._get_and_process_site_config(energysite_id))
 
                     if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_BATTERY:
-                        tasks.append(_get_and_process_site_summary(energysite_id))
+                        tasks.append(self._get_and_process_site_summary(energysite_id))
 
             result = False
+            for task_result in await self._run_tasks(tasks):
+                result |= bool(task_result)
+
+            return result
+
+    async def _run_tasks(
+        self, tasks: List[Awaitable], limit: Optional[int] = None
+    ) -> list:
+        """Await tasks with at most max_concurrency of them in flight.
+
+        Args
+            tasks (List[Awaitable]): Coroutines to run.
+            limit (int, optional): Tasks in flight at most instead of max_concurrency.
+
+        Returns
+            list: Results of the tasks in the order they were provided.
+
+        """
+        if limit is None:
+            limit, semaphore = self._max_concurrency, self.__request_semaphore
+        else:
+            semaphore = asyncio.Semaphore(limit)
+        if limit <= 1 or len(tasks) <= 1:
+            results = []
             for task in tasks:
                 # Update in sequence since establishing a new connection
                 # is more expensive because of TLS than the actual update
                 # so we want to maximize the chance of reusing the connection
-                result |= bool(await task)
+                results.append(await task)
+            return results
 
-            return result
+        async def _limited(task: Awaitable):
+            async with semaphore:
+                return await task
+
+        results = await asyncio.gather(
+            *(_limited(task) for task in tasks), return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        return results
+
+    async def start_scheduler(self) -> None:
+        """Start polling vehicles and energy sites in the background.
+
+        Instead of walking every car on each call to :meth:`update`, the
+        scheduler keeps a min-heap of when each vehicle, energy site and the
+        product list is next due. A vehicle's due time is only recomputed after
+        it is polled or its state changes (wake, park, shift, websocket data or
+        an interval change). Call after generating car and energy site objects.
+        """
+        if self.scheduler_running:
+            return
+        self.__scheduler_wakeup = asyncio.Event()
+        now = time.time()
+        if self._vehicle_list:
+            self._scheduler.schedule(
+                SCHEDULE_PRODUCT_LIST, self._last_attempted_update_time + ONLINE_INTERVAL
+            )
+        for vin in self.cars:
+            self._reschedule_vehicle(vin)
+        for energysite_id in self.energysites:
+            self._scheduler.schedule(
+                (SCHEDULE_ENERGYSITE, energysite_id), now + self.update_interval
+            )
+        self.__scheduler_task = asyncio.ensure_future(self._run_scheduler())
+
+    async def stop_scheduler(self) -> None:
+        """Stop background polling started by :meth:`start_scheduler`."""
+        task = self.__scheduler_task
+        self.__scheduler_task = None
+        self.__scheduler_wakeup = None
+        self._scheduler = PollingScheduler()
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    @property
+    def scheduler_running(self) -> bool:
+        """Return whether the background polling scheduler is running."""
+        return self.__scheduler_task is not None and not self.__scheduler_task.done()
+
+    def _reschedule_vehicle(self, vin: Text, from_now: bool = False) -> None:
+        """Recompute when the scheduler should next poll a vehicle.
+
+        Args
+            vin (Text): VIN of the vehicle
+            from_now (bool, optional): Count the interval from now instead of
+            from the last successful update. Used after a poll attempt.
+
+        """
+        if self.__scheduler_wakeup is None or vin not in self.cars:
+            return
+        key = (SCHEDULE_VEHICLE, vin)
+        if not (self.car_online.get(vin) and self.__update.get(vin)):
+            # Rescheduled by set_car_online or set_updates
+            self._scheduler.cancel(key)
+            return
+        interval = self._calculate_next_interval(vin)
+        last_update = time.time() if from_now else self._last_update_time.get(vin, 0)
+        if self._scheduler.schedule(key, last_update + interval):
+            self.__scheduler_wakeup.set()
+
+    async def _run_scheduler(self) -> None:
+        """Poll products from the scheduler as they become due."""
+        wakeup = self.__scheduler_wakeup
+        while True:
+            wakeup.clear()
+            next_due = self._scheduler.next_due()
+            delay = None if next_due is None else next_due - time.time()
+            if delay is None or delay > 0:
+                try:
+                    await asyncio.wait_for(wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            due = self._scheduler.pop_due(time.time())
+            async with self.__update_lock:
+                await self._run_tasks([self._poll_due(key) for key, _ in due])
+
+    async def _poll_due(self, key: tuple) -> None:
+        """Poll a due product, logging its errors so the others still run."""
+        try:
+            await self._poll_scheduled(key)
+        except (TeslaException, httpx.HTTPError) as ex:
+            _LOGGER.warning("Scheduled %s update failed: %s", key[0], ex)
+        except Exception:  # pylint: disable=broad-except
+            _LOGGER.exception("Unexpected error in scheduled %s update", key[0])
+
+    async def _poll_scheduled(self, key: tuple) -> None:
+        """Poll a due product and schedule its next poll."""
+        kind, product_id = key
+        try:
+            if kind == SCHEDULE_VEHICLE:
+                if not self.cars[product_id].in_service:
+                    await self._get_and_process_car_data(product_id)
+            elif kind == SCHEDULE_ENERGYSITE:
+                await self._get_and_process_site_data(product_id)
+                await self._get_and_process_site_config(product_id)
+                if self.energysites[product_id].resource_type == RESOURCE_TYPE_BATTERY:
+                    await self._get_and_process_site_summary(product_id)
+            else:
+                await self._update_product_list(round(time.time()))
+        finally:
+            # Not if stopped meanwhile or already rescheduled, e.g., on wake
+            if self.__scheduler_wakeup is not None and key not in self._scheduler:
+                if kind == SCHEDULE_VEHICLE:
+                    self._reschedule_vehicle(product_id, from_now=True)
+                elif kind == SCHEDULE_ENERGYSITE:
+                    self._scheduler.schedule(key, time.time() + self.update_interval)
+                else:
+                    self._scheduler.schedule(key, time.time() + ONLINE_INTERVAL)
 
     def get_updates(self, car_id: Text = None, vin: Text = None):
         """Get updates dictionary.
@@ -913,6 +1586,7 @@ class Controller:
                     "%s: Set Updates enabled; forcing update on next poll by resetting last_update_time",
                     vin[-5:],
                 )
+            self._reschedule_vehicle(vin)
 
     def get_last_update_time(self, car_id: Text = None, vin: Text = None):
         """Get last_update time dictionary.
@@ -1063,6 +1737,8 @@ class Controller:
             self.car_online[vin] = online_status
             if online_status:
                 self.set_last_wake_up_time(vin=vin, timestamp=round(time.time()))
+                self._wake_coordinator.signal(vin)
+            self._reschedule_vehicle(vin)
 
     def get_car_online(self, car_id: Text = None, vin: Text = None):
         """Get online status for car_id or all cars.
@@ -1127,6 +1803,28 @@ class Controller:
         if value and value:
             _LOGGER.debug("Update interval set to %s.", value)
             self._update_interval = int(value)
+            for vin in self.cars:
+                self._reschedule_vehicle(vin)
+
+    @property
+    def max_concurrency(self) -> int:
+        """Return max_concurrency.
+
+        Returns
+            int: The number of API requests an update may have in flight at once
+
+        """
+        return self._max_concurrency
+
+    @property
+    def instrumentation(self) -> Optional[Instrumentation]:
+        """Return the instrumentation receiving API events."""
+        return self.__connection.instrumentation
+
+    @instrumentation.setter
+    def instrumentation(self, value: Optional[Instrumentation]) -> None:
+        """Set the instrumentation receiving API events."""
+        self.__connection.instrumentation = value
 
     def set_update_interval_vin(
         self, car_id: Text = None, vin: Text = None, value: int = None
@@ -1143,6 +1841,7 @@ class Controller:
         else:
             _LOGGER.debug("%s: Update interval set to %s.", vin[-5:], value)
             self._update_interval_vin.update({vin: value})
+        self._reschedule_vehicle(vin)
 
     def get_update_interval_vin(self, car_id: Text = None, vin: Text = None) -> int:
         """Get update interval for specific vin or default if no vin specific."""
@@ -1172,6 +1871,8 @@ class Controller:
         if value and value:
             _LOGGER.debug("Driving interval set to %s.", value)
             self._driving_interval = int(value)
+            for vin in self.cars:
+                self._reschedule_vehicle(vin)
 
     def set_driving_interval_vin(
             self, car_id: Text = None, vin: Text = None, value: int = None
@@ -1188,6 +1889,7 @@ class Controller:
         else:
             _LOGGER.debug("%s: Driving interval set to %s.", vin[-5:], value)
             self._driving_interval_vin.update({vin: value})
+        self._reschedule_vehicle(vin)
 
     def get_driving_interval_vin(self, car_id: Text = None, vin: Text = None) -> int:
         """Get driving interval for specific vin or default if no vin specific."""
@@ -1227,76 +1929,73 @@ class Controller:
 
     def _process_websocket_message(self, data):
         if data["msg_type"] == "data:update":
-            update_json = {}
-            vehicle_id = int(data["tag"])
-            vin = self.__vehicle_id_vin_map[vehicle_id]
-            # shift_state,speed,power,est_lat,est_lng,est_heading,est_corrected_lat,est_corrected_lng,
-            # native_latitude,native_longitude,native_heading,native_type,native_location_supported
-            keys = [
-                ("timestamp", int),
-                ("shift_state", str),
-                ("speed", int),
-                ("power", int),
-                ("est_lat", float),
-                ("est_lng", float),
-                ("est_heading", int),
-                ("est_corrected_lat", float),
-                ("est_corrected_lng", float),
-                ("native_latitude", float),
-                ("native_longitude", float),
-                ("native_heading", float),
-                ("native_type", str),
-                ("native_location_supported", int),
-                # ("soc", int),
-                # ("elevation", int),
-                # ("range", int),
-                # ("est_range", int),
-                # ("heading", int),
-            ]
-            values = data["value"].split(",")
-            try:
-                for num, value in enumerate(values):
-                    update_json[keys[num][0]] = keys[num][1](value) if value else None
-                _LOGGER.debug("Updating %s with websocket: %s", vin[-5:], update_json)
-                self.__driving[vin]["timestamp"] = update_json["timestamp"]
-                if (
-                    self.cars[vin].shift_state
-                    and self.cars[vin].shift_state != update_json["shift_state"]
-                    and (
-                        update_json["shift_state"] is None
-                        or update_json["shift_state"] == "P"
+            vin = self._vehicle_id_to_vin(str(data["tag"]))
+            if vin is None or vin not in self.cars:
+                _LOGGER.debug("Websocket update for unknown vehicle %s", data["tag"])
+            else:
+                try:
+                    self._apply_websocket_frame(
+                        vin, self._frame_decoder.decode(data["value"])
                     )
-                ):
-                    self.set_last_park_time(
-                        vin=vin,
-                        timestamp=update_json["timestamp"] / 1000,
-                        shift_state=update_json["shift_state"],
+                except ValueError as ex:
+                    _LOGGER.debug(
+                        "Websocket for %s malformed: %s\n%s", vin[-5:], data["value"], ex
                     )
-                self.cars[vin].shift_state = update_json["shift_state"]
-                self.cars[vin].speed = update_json["speed"]
-                self.cars[vin].power = update_json["power"]
-                self.cars[vin].latitude = update_json["est_corrected_lat"]
-                self.cars[vin].longitude = update_json["est_corrected_lng"]
-                self.cars[vin].heading = update_json["est_heading"]
-                self.cars[vin].native_latitude = update_json["native_latitude"]
-                self.cars[vin].native_longitude = update_json["native_longitude"]
-                self.cars[vin].native_heading = update_json["native_heading"]
-                self.cars[vin].native_type = update_json["native_type"]
-                self.cars[vin].native_location_supported = update_json[
-                    "native_location_supported"
-                ]
-
-            except ValueError as ex:
-                _LOGGER.debug(
-                    "Websocket for %s malformed: %s\n%s", vin[-5:], values, ex
-                )
         for func in self.__websocket_listeners:
             func(data)
 
+    def _apply_websocket_frame(self, vin: Text, row: tuple) -> None:
+        """Merge a decoded streaming frame into the drive state of a car."""
+        decoder = self._frame_decoder
+        if _LOGGER.isEnabledFor(logging.DEBUG):
+            _LOGGER.debug(
+                "Updating %s with websocket: %s", vin[-5:], decoder.as_dict(row)
+            )
+        index = decoder.index
+        timestamp = row[index["timestamp"]]
+        shift_state = row[index["shift_state"]]
+        self.__driving[vin]["timestamp"] = timestamp
+        if not self.car_online.get(vin):
+            # Only awake cars stream
+            self.set_car_online(vin=vin)
+        car = self.cars[vin]
+        shift_changed = car.shift_state != shift_state
+        if shift_changed and car.shift_state and shift_state in (None, "P"):
+            self.set_last_park_time(
+                vin=vin, timestamp=timestamp / 1000, shift_state=shift_state
+            )
+        # TeslaCar properties are read only views of the vehicle data
+        drive_state = self._vehicle_data[vin].setdefault("drive_state", {})
+        if self.__change_dispatcher:
+            frame = decoder.drive_state_update(row)
+            changes = diff_update(drive_state, frame, prefix="drive_state.")
+            drive_state.update(frame)
+        else:
+            changes = None
+            for key, column in decoder.drive_state:
+                drive_state[key] = row[column]
+        car.refresh_state("drive_state", decoder.drive_state_keys)
+        if self._history_size:
+            record_frame(self._vehicle_ring(vin), decoder, row)
+        if self._telemetry:
+            self._telemetry.publish(vin, row)
+        if shift_changed:
+            self._reschedule_vehicle(vin)
+        if changes:
+            self.__change_dispatcher.dispatch(vin, changes)
+
+    def _vehicle_ring(self, vin: Text) -> RingBuffer:
+        """Return the history of a vin, creating it if needed."""
+        history = self._vehicle_history.get(vin)
+        if history is None:
+            history = self._vehicle_history[vin] = RingBuffer(
+                VEHICLE_COLUMNS, self._history_size
+            )
+        return history
+
     def _process_websocket_disconnect(self, data):
-        vehicle_id = int(data["tag"])
-        vin = self.__vehicle_id_vin_map[vehicle_id]
-        _LOGGER.debug("Disconnected %s from websocket", vin[-5:])
+        vin = self._vehicle_id_to_vin(str(data["tag"]))
+        _LOGGER.debug("Disconnected %s from websocket", (vin or data["tag"])[-5:])
 
     def _get_vehicle_ids_for_api(self, path_vars):
         vehicle_id = path_vars.get("vehicle_id")
@@ -1364,30 +2063,10 @@ class Controller:
             else:
                 _LOGGER.warning("WARNING: could not set vehicle_id to car_vin, will attempt to send without overriding but this might cause issues!")
 
-        # Load API endpoints once
+        # Endpoints are parsed once per process and shared by all controllers
         if not self.endpoints:
-            try:
-                data = pkgutil.get_data(__name__, "endpoints.json")
-                self.endpoints = orjson.loads(  # pylint: disable=no-member
-                    data.decode()
-                )
-                _LOGGER.debug("%d endpoints loaded", len(self.endpoints))
-            except (IOError, ValueError, JSONDecodeError):
-                _LOGGER.error("No endpoints loaded")
-        # Lookup endpoint name
-        try:
-            endpoint = self.endpoints[name]
-        except KeyError as ex:
-            raise ValueError("Unknown endpoint name " + name) from ex
-        # Only JSON is supported
-        if endpoint.get("CONTENT", "JSON") != "JSON" or name == "STATUS":
-            raise NotImplementedError(f"Endpoint {name} not implemented")
-        # Substitute path variables in URI
-        try:
-            uri = endpoint["URI"].format(**path_vars)
-        except KeyError as ex:
-            raise ValueError(f"{name} requires path variable {ex}") from ex
-        method = endpoint["TYPE"].lower()
+            self.endpoints = get_endpoint_registry()
+        method, uri = self.endpoints.build_url(name, path_vars)
 
         # Old @wake_up decorator condensed here
         if wake_if_asleep:
@@ -1400,13 +2079,13 @@ class Controller:
             if not self.is_car_online(car_id=car_id, vin=car_vin):
                 await self.wake_up(car_id=car_id)
                 return await self.__post_with_retries(
-                    "", method=method, data=kwargs, url=uri
+                    "", method=method, data=kwargs, url=uri, endpoint=name
                 )
 
             # We think the car is awake, lets try the api call:
             try:
                 response = await self.__post_with_retries(
-                    "", method=method, data=kwargs, url=uri
+                    "", method=method, data=kwargs, url=uri, endpoint=name
                 )
             except TeslaException as ex:
                 # Don't bother to wake and retry if it's not retryable
@@ -1418,7 +2097,7 @@ class Controller:
                 # Assumed it failed because it was asleep and we didn't know it
                 await self.wake_up(car_id=car_id)
                 response = await self.__post_with_retries(
-                    "", method=method, data=kwargs, url=uri
+                    "", method=method, data=kwargs, url=uri, endpoint=name
                 )
             return response
 
@@ -1426,30 +2105,36 @@ class Controller:
         # wake_if_asleep is False so we do not retry if the car is asleep
         # or if the car is unavailable
         return await self.__post_with_retries_except_unavailable(
-            "", method=method, data=kwargs, url=uri
+            "", method=method, data=kwargs, url=uri, endpoint=name
         )
 
     @retry(
         wait=custom_wait,
         retry=custom_retry,
         stop=stop_after_delay(MAX_API_RETRY_TIME),
+        before_sleep=before_sleep_instrumented,
         reraise=True,
     )
-    async def __post_with_retries(self, command, method="post", data=None, url=""):
+    async def __post_with_retries(
+        self, command, method="post", data=None, url="", endpoint=None
+    ):
         """Call connection.post with retries for common exceptions.
 
         Retries if the car is unavailable.
         """
-        return await self.__connection.post(command, method=method, data=data, url=url)
+        return await self.__connection.post(
+            command, method=method, data=data, url=url, endpoint=endpoint
+        )
 
     @retry(
         wait=custom_wait,
         retry=custom_retry_except_unavailable,
         stop=stop_after_delay(MAX_API_RETRY_TIME),
+        before_sleep=before_sleep_instrumented,
         reraise=True,
     )
     async def __post_with_retries_except_unavailable(
-        self, command, method="post", data=None, url=""
+        self, command, method="post", data=None, url="", endpoint=None
     ):
         """Call connection.post with retries for common exceptions.
 
@@ -1457,4 +2142,6 @@ class Controller:
         used when wake_if_asleep is False since its unlikely the
         car will suddenly become available if its offline/sleep.
         """
-        return await self.__connection.post(command, method=method, data=data, url=url)
+        return await self.__connection.post(
+            command, method=method, data=data, url=url, endpoint=endpoint
+        )
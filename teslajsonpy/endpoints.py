@@ -0,0 +1,162 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from json import JSONDecodeError
+import logging
+import pkgutil
+from string import Formatter
+import sys
+from typing import Dict, Iterator, Mapping, Optional, Tuple
+
+import orjson
+
+_LOGGER = logging.getLogger(__name__)
+
+_REGISTRY: Optional["EndpointRegistry"] = None
+
+
+class Endpoint:
+    """Represents a precompiled entry of endpoints.json."""
+
+    __slots__ = (
+        "name",
+        "method",
+        "uri",
+        "content",
+        "auth",
+        "supported",
+        "path_vars",
+        "_literals",
+    )
+
+    def __init__(self, name: str, spec: dict) -> None:
+        """Initialize Endpoint.
+
+        Args
+            name: Endpoint name, e.g., VEHICLE_DATA
+            spec: Endpoint definition from endpoints.json
+
+        """
+        self.name: str = sys.intern(name)
+        self.method: str = sys.intern(spec["TYPE"].lower())
+        self.uri: str = spec["URI"]
+        self.content: str = spec.get("CONTENT", "JSON")
+        self.auth: bool = spec.get("AUTH", False)
+        # Only JSON is supported
+        self.supported: bool = self.content == "JSON" and self.name != "STATUS"
+        # Pre-split the URI into the literal text around each path variable
+        literals = [""]
+        path_vars = []
+        for literal, field, _, _ in Formatter().parse(self.uri):
+            literals[-1] += literal
+            if field is not None:
+                path_vars.append(sys.intern(field))
+                literals.append("")
+        self.path_vars: Tuple[str, ...] = tuple(path_vars)
+        self._literals: Tuple[str, ...] = tuple(literals)
+
+    def __repr__(self) -> str:
+        """Return representation of the endpoint."""
+        return f"Endpoint({self.name!r}, {self.method.upper()} {self.uri!r})"
+
+    def build_uri(self, path_vars: Optional[Dict[str, str]] = None) -> str:
+        """Substitute path variables in the URI.
+
+        Args
+            path_vars: Values for the path variables of the URI
+
+        Raises
+            ValueError: If a path variable is missing
+
+        Returns
+            str: The URI with path variables substituted
+
+        """
+        literals = self._literals
+        try:
+            if len(literals) == 1:
+                return literals[0]
+            if len(literals) == 2:
+                return f"{literals[0]}{path_vars[self.path_vars[0]]}{literals[1]}"
+            uri = [literals[0]]
+            for var, literal in zip(self.path_vars, literals[1:]):
+                uri.append(f"{path_vars[var]}")
+                uri.append(literal)
+            return "".join(uri)
+        except (KeyError, TypeError) as ex:
+            missing = next(
+                (var for var in self.path_vars if var not in (path_vars or {})), ex
+            )
+            raise ValueError(f"{self.name} requires path variable '{missing}'") from ex
+
+
+class EndpointRegistry(Mapping):
+    """Immutable mapping of endpoint names to precompiled endpoints.
+
+    Use :func:`get_endpoint_registry` to share a single registry per process.
+    """
+
+    __slots__ = ("_endpoints",)
+
+    def __init__(self, specs: Dict[str, dict]) -> None:
+        """Initialize EndpointRegistry from endpoints.json data."""
+        self._endpoints: Dict[str, Endpoint] = {
+            name: Endpoint(name, spec) for name, spec in specs.items()
+        }
+
+    def __getitem__(self, name: str) -> Endpoint:
+        """Return endpoint by name."""
+        return self._endpoints[name]
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterate over endpoint names."""
+        return iter(self._endpoints)
+
+    def __len__(self) -> int:
+        """Return number of endpoints."""
+        return len(self._endpoints)
+
+    def build_url(
+        self, name: str, path_vars: Optional[Dict[str, str]] = None
+    ) -> Tuple[str, str]:
+        """Return the method and URI for an endpoint.
+
+        Args
+            name: Endpoint name, e.g., VEHICLE_DATA
+            path_vars: Values for the path variables of the URI
+
+        Raises
+            ValueError: If endpoint name is not found or a path variable is missing
+            NotImplementedError: If the endpoint is not supported
+
+        Returns
+            Tuple[str, str]: The lower case HTTP method and the URI
+
+        """
+        endpoint = self._endpoints.get(name)
+        if endpoint is None:
+            raise ValueError("Unknown endpoint name " + name)
+        if not endpoint.supported:
+            raise NotImplementedError(f"Endpoint {name} not implemented")
+        return endpoint.method, endpoint.build_uri(path_vars)
+
+
+def get_endpoint_registry() -> EndpointRegistry:
+    """Return the process wide endpoint registry, loading it once."""
+    global _REGISTRY  # pylint: disable=global-statement
+    if _REGISTRY is None:
+        try:
+            data = pkgutil.get_data(__name__, "endpoints.json")
+            registry = EndpointRegistry(
+                orjson.loads(data)  # pylint: disable=no-member
+            )
+        except (IOError, ValueError, JSONDecodeError):
+            _LOGGER.error("No endpoints loaded")
+            return EndpointRegistry({})
+        _LOGGER.debug("%d endpoints loaded", len(registry))
+        _REGISTRY = registry
+    return _REGISTRY
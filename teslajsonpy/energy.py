@@ -6,9 +6,14 @@ For more details about this api, please refer to the documentation at
 https://github.com/zabuldon/teslajsonpy
 """
 import logging
-from typing import Callable
+from typing import Callable, Optional
 
-from teslajsonpy.const import DEFAULT_ENERGYSITE_NAME, RESOURCE_TYPE
+from teslajsonpy.const import (
+    DEFAULT_ENERGYSITE_NAME,
+    RESOURCE_TYPE,
+    RESOURCE_TYPE_BATTERY,
+    RESOURCE_TYPE_SOLAR,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -284,3 +289,26 @@ class SolarPowerwallSite(PowerwallSite):
         self._site_config["components"].update(
             {"customer_preferred_export_rule": setting}
         )
+
+
+def create_energysite(
+    api: Callable,
+    energysite: dict,
+    site_config: dict,
+    site_data: dict,
+    site_summary: Optional[dict] = None,
+) -> Optional[EnergySite]:
+    """Return the EnergySite of a product list entry.
+
+    Solar only systems (no Powerwalls) are listed as "solar" and Powerwall
+    systems as "battery", which need site_summary. None for other types.
+    """
+    if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_SOLAR:
+        return SolarSite(api, energysite, site_config, site_data)
+    if energysite[RESOURCE_TYPE] == RESOURCE_TYPE_BATTERY:
+        if energysite["components"]["solar"]:
+            return SolarPowerwallSite(
+                api, energysite, site_config, site_data, site_summary
+            )
+        return PowerwallSite(api, energysite, site_config, site_data, site_summary)
+    return None
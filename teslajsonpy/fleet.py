@@ -0,0 +1,360 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+import logging
+import ssl
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+import httpx
+
+from teslajsonpy.const import (
+    FLEET_MAX_CONCURRENCY,
+    HTTP_KEEPALIVE_EXPIRY,
+    HTTP_MAX_CONNECTIONS,
+    HTTP_MAX_KEEPALIVE_CONNECTIONS,
+)
+from teslajsonpy.controller import Controller
+from teslajsonpy.endpoints import get_endpoint_registry
+from teslajsonpy.ratelimit import FleetRateLimiter, RateLimiter
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class _SharedTransport(httpx.AsyncBaseTransport):
+    """Transport of an account client sending through the fleet pool.
+
+    Closing the client of an account leaves the pool open for the others;
+    the FleetManager closes it.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport) -> None:
+        """Initialize _SharedTransport."""
+        self.transport = transport
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send request through the shared pool."""
+        return await self.transport.handle_async_request(request)
+
+    async def aclose(self) -> None:
+        """Leave the shared pool open."""
+
+
+class AccountHealth:
+    """Health of an account of a FleetManager."""
+
+    __slots__ = (
+        "account",
+        "connected",
+        "cars",
+        "energysites",
+        "last_update",
+        "failures",
+        "last_error",
+        "rate_limit",
+    )
+
+    def __init__(
+        self,
+        account: Hashable,
+        connected: bool,
+        cars: int,
+        energysites: int,
+        last_update: Optional[float],
+        failures: int,
+        last_error: Optional[BaseException],
+        rate_limit: Dict[str, Any],
+    ) -> None:
+        """Initialize AccountHealth.
+
+        Args
+            account: Key of the account
+            connected: Whether the account connected and generated its products
+            cars: Cars of the account
+            energysites: Energy sites of the account
+            last_update: Time of the last successful update, None if none yet
+            failures: Failed connects or updates in a row
+            last_error: Last connect or update error
+            rate_limit: Budget of the account, see Controller.get_rate_limit
+
+        """
+        self.account = account
+        self.connected = connected
+        self.cars = cars
+        self.energysites = energysites
+        self.last_update = last_update
+        self.failures = failures
+        self.last_error = last_error
+        self.rate_limit = rate_limit
+
+    @property
+    def healthy(self) -> bool:
+        """Return whether the account is connected, not failing and not paused."""
+        return (
+            self.connected and not self.failures and not self.rate_limit["paused_for"]
+        )
+
+    def as_dict(self) -> dict:
+        """Return the health as a dict."""
+        return {
+            "account": self.account,
+            "healthy": self.healthy,
+            "connected": self.connected,
+            "cars": self.cars,
+            "energysites": self.energysites,
+            "last_update": self.last_update,
+            "failures": self.failures,
+            "last_error": repr(self.last_error) if self.last_error else None,
+            "rate_limit": self.rate_limit,
+        }
+
+
+class _Account:
+    """A controller of a FleetManager and its connect and update outcomes."""
+
+    __slots__ = ("controller", "connected", "last_update", "failures", "last_error")
+
+    def __init__(self, controller: Controller) -> None:
+        self.controller = controller
+        self.connected: bool = False
+        self.last_update: Optional[float] = None
+        self.failures: int = 0
+        self.last_error: Optional[BaseException] = None
+
+    async def run(self, action: Callable[[Controller], Awaitable[Any]]) -> Any:
+        """Run action on the controller, recording its outcome."""
+        try:
+            result = await action(self.controller)
+        except Exception as ex:  # pylint: disable=broad-except
+            self.failures += 1
+            self.last_error = ex
+            return ex
+        self.failures = 0
+        return result
+
+
+class FleetManager:
+    """Host of the controllers of many accounts on one event loop.
+
+    The accounts send through one pooled transport, so sockets and TLS
+    sessions are shared, use the process wide endpoint registry and draw
+    their polling requests from one FleetRateLimiter that serves waiting
+    accounts in turn. Each account keeps its own client for tokens and
+    cookies and its own RateLimiter for the limits the API reports to it.
+    """
+
+    def __init__(
+        self,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        max_concurrency: int = FLEET_MAX_CONCURRENCY,
+        http2: bool = False,
+        max_connections: int = HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections: int = HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: float = HTTP_KEEPALIVE_EXPIRY,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Initialize FleetManager.
+
+        Args
+            rate_limit: Polling requests per second for all accounts together.
+                Defaults to None, which only applies the limits of each account.
+            rate_limit_burst: Polling requests allowed in a burst. Defaults to one
+                minute of rate_limit.
+            max_concurrency: Accounts connecting or updating at once
+            http2: Multiplex requests over HTTP/2. Requires httpx[http2].
+            max_connections: Max connections in the shared pool
+            max_keepalive_connections: Max idle connections kept in the shared pool
+            keepalive_expiry: Seconds an idle pooled connection is kept open
+            transport: Transport to share instead of a new pool, e.g., a
+                RecordingTransport or ReplayTransport
+
+        """
+        if transport is None:
+            # create_default_context() does blocking I/O, as in Controller
+            ssl_context = ssl.create_default_context()
+            limits = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            )
+            try:
+                transport = httpx.AsyncHTTPTransport(
+                    verify=ssl_context, limits=limits, http2=http2
+                )
+            except ImportError:
+                _LOGGER.warning(
+                    "HTTP/2 requested but h2 is not installed; falling back to HTTP/1.1"
+                )
+                transport = httpx.AsyncHTTPTransport(verify=ssl_context, limits=limits)
+        self.transport: httpx.AsyncBaseTransport = transport
+        self.rate_limiter: Optional[FleetRateLimiter] = (
+            FleetRateLimiter(rate_limit, rate_limit_burst) if rate_limit else None
+        )
+        self.max_concurrency: int = max(1, max_concurrency or 1)
+        self._accounts: Dict[Hashable, _Account] = {}
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def controllers(self) -> Dict[Hashable, Controller]:
+        """Return the controllers by account."""
+        return {key: account.controller for key, account in self._accounts.items()}
+
+    def __len__(self) -> int:
+        """Return number of accounts."""
+        return len(self._accounts)
+
+    def __contains__(self, account: Hashable) -> bool:
+        """Return whether an account was added."""
+        return account in self._accounts
+
+    def add_account(
+        self,
+        account: Hashable,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        **kwargs,
+    ) -> Controller:
+        """Create the controller of an account.
+
+        Args
+            account: Key of the account, e.g., the email address
+            rate_limit: Polling requests per second of this account
+            rate_limit_burst: Polling requests of this account allowed in a burst
+            **kwargs: Controller arguments, e.g., access_token and refresh_token
+
+        Raises
+            ValueError: If the account was already added
+
+        Returns
+            Controller: The controller of the account
+
+        """
+        if account in self._accounts:
+            raise ValueError(f"Account {account} already added")
+        controller = Controller(
+            httpx.AsyncClient(timeout=60, transport=_SharedTransport(self.transport)),
+            rate_limiter=RateLimiter(
+                rate=rate_limit,
+                burst=rate_limit_burst,
+                fleet=self.rate_limiter,
+                account=account,
+            ),
+            **kwargs,
+        )
+        controller.endpoints = get_endpoint_registry()
+        self._accounts[account] = _Account(controller)
+        return controller
+
+    async def remove_account(self, account: Hashable) -> None:
+        """Disconnect and forget an account."""
+        removed = self._accounts.pop(account, None)
+        if removed is not None:
+            await removed.controller.disconnect()
+
+    async def _run(
+        self,
+        action: Callable[[Controller], Awaitable[Any]],
+        accounts: Optional[Iterable[Hashable]],
+    ) -> Dict[Hashable, Any]:
+        """Run action on accounts with at most max_concurrency in flight.
+
+        Returns
+            Dict[Hashable, Any]: Result, or the exception raised, by account
+
+        """
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        keys = list(self._accounts if accounts is None else accounts)
+
+        async def _limited(key: Hashable) -> Any:
+            async with self._semaphore:
+                return await self._accounts[key].run(action)
+
+        results = await asyncio.gather(*(_limited(key) for key in keys))
+        return dict(zip(keys, results))
+
+    async def connect(
+        self, accounts: Optional[Iterable[Hashable]] = None, **kwargs
+    ) -> Dict[Hashable, Any]:
+        """Connect accounts and generate their cars and energy sites.
+
+        A failing account does not stop the others; see health.
+
+        Args
+            accounts: Accounts to connect. Defaults to all.
+            **kwargs: Arguments of Controller.generate_car_objects
+
+        Returns
+            Dict[Hashable, Any]: Tokens of Controller.connect, or the exception
+            raised, by account
+
+        """
+
+        async def _connect(controller: Controller) -> Dict[str, str]:
+            tokens = await controller.connect()
+            await controller.generate_car_objects(**kwargs)
+            await controller.generate_energysite_objects()
+            return tokens
+
+        results = await self._run(_connect, accounts)
+        for key, result in results.items():
+            if not isinstance(result, Exception):
+                self._accounts[key].connected = True
+        return results
+
+    async def update(
+        self, accounts: Optional[Iterable[Hashable]] = None, **kwargs
+    ) -> Dict[Hashable, Any]:
+        """Update connected accounts.
+
+        Args
+            accounts: Accounts to update. Defaults to all connected.
+            **kwargs: Arguments of Controller.update
+
+        Returns
+            Dict[Hashable, Any]: Result of Controller.update, or the exception
+            raised, by account
+
+        """
+        if accounts is None:
+            accounts = [
+                key for key, account in self._accounts.items() if account.connected
+            ]
+        results = await self._run(
+            lambda controller: controller.update(**kwargs), accounts
+        )
+        now = time.time()
+        for key, result in results.items():
+            if not isinstance(result, Exception):
+                self._accounts[key].last_update = now
+        return results
+
+    def health(self) -> Dict[Hashable, AccountHealth]:
+        """Return the health of every account."""
+        return {
+            key: AccountHealth(
+                key,
+                account.connected,
+                len(account.controller.cars),
+                len(account.controller.energysites),
+                account.last_update,
+                account.failures,
+                account.last_error,
+                account.controller.get_rate_limit(),
+            )
+            for key, account in self._accounts.items()
+        }
+
+    async def close(self) -> None:
+        """Disconnect every account and close the shared pool."""
+        await asyncio.gather(
+            *(account.controller.disconnect() for account in self._accounts.values())
+        )
+        self._accounts.clear()
+        await self.transport.aclose()
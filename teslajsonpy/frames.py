@@ -0,0 +1,202 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Text, Tuple
+
+from teslajsonpy.const import STREAMING_COLUMNS
+
+# Types of the columns of a streaming data:update value
+COLUMN_TYPES: Dict[Text, type] = {
+    "timestamp": int,
+    "shift_state": str,
+    "speed": int,
+    "power": int,
+    "est_lat": float,
+    "est_lng": float,
+    "est_heading": int,
+    "est_corrected_lat": float,
+    "est_corrected_lng": float,
+    "native_latitude": float,
+    "native_longitude": float,
+    "native_heading": float,
+    "native_type": str,
+    "native_location_supported": int,
+    "soc": int,
+    "elevation": int,
+    "range": int,
+    "est_range": int,
+    "heading": int,
+    "odometer": float,
+}
+
+# drive_state keys set from the columns of a frame
+DRIVE_STATE_COLUMNS: Tuple[Tuple[Text, Text], ...] = (
+    ("shift_state", "shift_state"),
+    ("speed", "speed"),
+    ("power", "power"),
+    ("latitude", "est_corrected_lat"),
+    ("longitude", "est_corrected_lng"),
+    ("heading", "est_heading"),
+    ("native_latitude", "native_latitude"),
+    ("native_longitude", "native_longitude"),
+    ("native_heading", "native_heading"),
+    ("native_type", "native_type"),
+    ("native_location_supported", "native_location_supported"),
+)
+
+Row = Tuple[Any, ...]
+
+
+class FrameBatch:
+    """Frames of many vehicles decoded into column arrays."""
+
+    __slots__ = ("tags", "columns", "errors")
+
+    def __init__(
+        self, tags: List[Text], columns: Dict[Text, List[Any]], errors: List[Text]
+    ) -> None:
+        """Initialize FrameBatch.
+
+        Args
+            tags: Vehicle tag of each decoded frame
+            columns: Values of each column, aligned with tags
+            errors: Tags of the frames that failed to decode
+
+        """
+        self.tags = tags
+        self.columns = columns
+        self.errors = errors
+
+    def __len__(self) -> int:
+        """Return number of decoded frames."""
+        return len(self.tags)
+
+    def rows(self) -> Iterable[Tuple[Text, Row]]:
+        """Return (tag, row) pairs in frame order."""
+        return zip(self.tags, zip(*self.columns.values()))
+
+
+class FrameDecoder:
+    """Decoder of the comma separated value of streaming data:update frames.
+
+    The column order is fixed by the subscription, so the decoder builds one
+    function converting every column to its type, with empty values as None.
+    A frame decodes to a tuple indexed by :attr:`index` without building a
+    dict.
+    """
+
+    def __init__(self, columns: Sequence[Text] = ("timestamp", *STREAMING_COLUMNS)):
+        """Initialize FrameDecoder.
+
+        Args
+            columns: Columns of the value, starting with timestamp
+
+        Raises
+            ValueError: A column has no known type
+
+        """
+        unknown = [column for column in columns if column not in COLUMN_TYPES]
+        if unknown:
+            raise ValueError(f"Unknown streaming columns: {', '.join(unknown)}")
+        self.columns: Tuple[Text, ...] = tuple(columns)
+        self.index: Dict[Text, int] = {
+            column: i for i, column in enumerate(self.columns)
+        }
+        self.decode: Callable[[Text], Row] = self._compile()
+        self.drive_state: Tuple[Tuple[Text, int], ...] = tuple(
+            (key, self.index[column])
+            for key, column in DRIVE_STATE_COLUMNS
+            if column in self.index
+        )
+        self.drive_state_keys: Tuple[Text, ...] = tuple(
+            key for key, _ in self.drive_state
+        )
+
+    def _compile(self) -> Callable[[Text], Row]:
+        """Return a function decoding a value to a row."""
+        # str leaves a string column as is, so every column converts alike
+        converters = tuple(COLUMN_TYPES[column] for column in self.columns)
+        count = len(converters)
+        padding = [""] * count
+
+        def decode(value: Text) -> Row:
+            """Decode a data:update value to a row of typed columns."""
+            parts = value.split(",")
+            if len(parts) < count:
+                parts += padding[len(parts) :]
+            return tuple(
+                [
+                    convert(part) if part else None
+                    for convert, part in zip(converters, parts)
+                ]
+            )
+
+        return decode
+
+    def as_dict(self, row: Row) -> Dict[Text, Any]:
+        """Return a row as a dict by column."""
+        return dict(zip(self.columns, row))
+
+    def drive_state_update(self, row: Row) -> Dict[Text, Any]:
+        """Return the drive_state values of a row."""
+        return {key: row[index] for key, index in self.drive_state}
+
+    def decode_rows(
+        self, messages: Iterable[dict]
+    ) -> Tuple[List[Text], List[Row], List[Text]]:
+        """Decode the data:update messages of a burst to rows.
+
+        Args
+            messages: Decoded websocket messages; other message types are skipped
+
+        Returns
+            Tuple[List[Text], List[Row], List[Text]]: The tag and row of each
+            frame and the tags of malformed frames
+
+        """
+        decode = self.decode
+        tags: List[Text] = []
+        rows: List[Row] = []
+        errors: List[Text] = []
+        for message in messages:
+            if message.get("msg_type") != "data:update":
+                continue
+            try:
+                rows.append(decode(message["value"]))
+            except (ValueError, TypeError, KeyError):
+                errors.append(str(message.get("tag")))
+                continue
+            tags.append(str(message["tag"]))
+        return tags, rows, errors
+
+    def decode_batch(self, messages: Iterable[dict]) -> FrameBatch:
+        """Decode the data:update messages of a burst into column arrays.
+
+        Args
+            messages: Decoded websocket messages; other message types are skipped
+
+        Returns
+            FrameBatch: The frames as columns and the tags of malformed frames
+
+        """
+        tags, rows, errors = self.decode_rows(messages)
+        values = list(zip(*rows)) if rows else [()] * len(self.columns)
+        columns = {
+            column: list(column_values)
+            for column, column_values in zip(self.columns, values)
+        }
+        return FrameBatch(tags, columns, errors)
+
+    def latest(self, batch: FrameBatch) -> Dict[Text, Row]:
+        """Return the newest row of each tag in a batch by timestamp."""
+        timestamps = batch.columns[self.columns[0]]
+        latest: Dict[Text, Tuple[Optional[int], Row]] = {}
+        for (tag, row), timestamp in zip(batch.rows(), timestamps):
+            current = latest.get(tag)
+            if current is None or (timestamp or 0) >= (current[0] or 0):
+                latest[tag] = (timestamp, row)
+        return {tag: row for tag, (_, row) in latest.items()}
@@ -0,0 +1,221 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from array import array
+import math
+import time
+from typing import Any, Dict, Mapping, Optional, Sequence, Text, Tuple
+
+from teslajsonpy.frames import FrameDecoder, Row
+
+NAN = float("nan")
+
+# History column: (section, key) in VEHICLE_DATA
+VEHICLE_COLUMNS: Dict[Text, Tuple[Text, Text]] = {
+    "speed": ("drive_state", "speed"),
+    "power": ("drive_state", "power"),
+    "latitude": ("drive_state", "latitude"),
+    "longitude": ("drive_state", "longitude"),
+    "battery_level": ("charge_state", "battery_level"),
+    "battery_range": ("charge_state", "battery_range"),
+}
+# History column: streaming column
+FRAME_COLUMNS: Dict[Text, Text] = {
+    "speed": "speed",
+    "power": "power",
+    "latitude": "est_corrected_lat",
+    "longitude": "est_corrected_lng",
+}
+# History columns: keys in SITE_DATA
+SITE_COLUMNS: Tuple[Text, ...] = (
+    "solar_power",
+    "battery_power",
+    "grid_power",
+    "load_power",
+    "percentage_charged",
+)
+
+
+def _float(value: Any) -> float:
+    """Return value as a float column entry; NaN if missing or not numeric."""
+    if value is None or isinstance(value, str):
+        return NAN
+    return float(value)
+
+
+class RingBuffer:
+    """Bounded columnar history of timestamped samples.
+
+    Each column is an ``array('d')`` of ``capacity`` floats written in a ring,
+    so a vehicle costs 8 bytes per column and sample regardless of how long it
+    is tracked. Missing values are stored as NaN. Samples must arrive in
+    timestamp order; older ones are counted in :attr:`stale` and skipped, which
+    keeps windowed queries a binary search.
+    """
+
+    def __init__(self, columns: Sequence[Text], capacity: int) -> None:
+        """Initialize RingBuffer.
+
+        Args
+            columns: Names of the value columns
+            capacity: Samples kept; the oldest are overwritten
+
+        """
+        self.columns: Tuple[Text, ...] = tuple(columns)
+        self.capacity: int = max(1, capacity)
+        self.stale: int = 0
+        self._times = array("d", bytes(8 * self.capacity))
+        self._values: Dict[Text, array] = {
+            column: array("d", [NAN]) * self.capacity for column in self.columns
+        }
+        self._start: int = 0
+        self._size: int = 0
+
+    def __len__(self) -> int:
+        """Return number of samples held."""
+        return self._size
+
+    @property
+    def newest(self) -> Optional[float]:
+        """Return the timestamp of the newest sample, None if empty."""
+        if not self._size:
+            return None
+        return self._times[(self._start + self._size - 1) % self.capacity]
+
+    def append(self, timestamp: float, values: Mapping[Text, Any]) -> bool:
+        """Add a sample.
+
+        Args
+            timestamp: Seconds since the epoch
+            values: Values by column; missing columns are NaN
+
+        Returns
+            bool: False if the sample is older than the newest and was skipped
+
+        """
+        newest = self.newest
+        if newest is not None and timestamp < newest:
+            self.stale += 1
+            return False
+        if self._size < self.capacity:
+            slot = (self._start + self._size) % self.capacity
+            self._size += 1
+        else:
+            slot = self._start
+            self._start = (self._start + 1) % self.capacity
+        self._times[slot] = timestamp
+        for column, column_values in self._values.items():
+            column_values[slot] = _float(values.get(column))
+        return True
+
+    def _first_at_or_after(self, timestamp: float) -> int:
+        """Return the logical index of the first sample at or after timestamp."""
+        times, start, capacity = self._times, self._start, self.capacity
+        low, high = 0, self._size
+        while low < high:
+            middle = (low + high) // 2
+            if times[(start + middle) % capacity] < timestamp:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+    def _slice(self, column: array, first: int) -> array:
+        """Return the samples of a column from a logical index on."""
+        start = (self._start + first) % self.capacity
+        end = start + self._size - first
+        if end <= self.capacity:
+            return column[start:end]
+        return column[start:] + column[: end - self.capacity]
+
+    def window(
+        self,
+        seconds: Optional[float] = None,
+        columns: Optional[Sequence[Text]] = None,
+        now: Optional[float] = None,
+    ) -> Dict[Text, array]:
+        """Return the samples of a trailing time window.
+
+        Args
+            seconds: Length of the window. None for every sample.
+            columns: Columns to return. None for all.
+            now: End of the window in seconds since the epoch. Defaults to now.
+
+        Returns
+            Dict[Text, array]: timestamp and each column as aligned arrays
+
+        """
+        first = 0
+        if seconds is not None:
+            end = time.time() if now is None else now
+            first = self._first_at_or_after(end - seconds)
+        result = {"timestamp": self._slice(self._times, first)}
+        for column in self.columns if columns is None else columns:
+            result[column] = self._slice(self._values[column], first)
+        return result
+
+    def series(
+        self, column: Text, seconds: Optional[float] = None, now: Optional[float] = None
+    ) -> Tuple[array, array]:
+        """Return the timestamps and values of a column without missing values.
+
+        Args
+            column: Column name, e.g., power
+            seconds: Length of the trailing window. None for every sample.
+            now: End of the window in seconds since the epoch. Defaults to now.
+
+        Returns
+            Tuple[array, array]: Timestamps and values where the column is set
+
+        """
+        window = self.window(seconds, (column,), now)
+        timestamps, values = array("d"), array("d")
+        for timestamp, value in zip(window["timestamp"], window[column]):
+            if not math.isnan(value):
+                timestamps.append(timestamp)
+                values.append(value)
+        return timestamps, values
+
+    def clear(self) -> None:
+        """Discard every sample."""
+        self._start = self._size = 0
+
+
+def record_vehicle_data(history: RingBuffer, data: Mapping) -> bool:
+    """Add a VEHICLE_DATA response to a vehicle history.
+
+    The sample is timestamped by drive_state, else by charge_state, else now.
+    """
+    drive_state = data.get("drive_state") or {}
+    charge_state = data.get("charge_state") or {}
+    timestamp = drive_state.get("timestamp") or charge_state.get("timestamp")
+    values = {
+        column: (data.get(section) or {}).get(key)
+        for column, (section, key) in VEHICLE_COLUMNS.items()
+    }
+    return history.append(
+        timestamp / 1000 if timestamp else time.time(), values
+    )
+
+
+def record_frame(history: RingBuffer, decoder: FrameDecoder, row: Row) -> bool:
+    """Add a decoded streaming frame to a vehicle history."""
+    index = decoder.index
+    values = {
+        column: row[index[frame_column]]
+        for column, frame_column in FRAME_COLUMNS.items()
+        if frame_column in index
+    }
+    timestamp = row[index["timestamp"]]
+    return history.append(
+        timestamp / 1000 if timestamp else time.time(), values
+    )
+
+
+def record_site_data(history: RingBuffer, data: Mapping) -> bool:
+    """Add a SITE_DATA response to an energy site history, timestamped now."""
+    return history.append(time.time(), data)
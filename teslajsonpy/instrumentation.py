@@ -0,0 +1,324 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from bisect import bisect_left
+import logging
+from typing import Any, Dict, Optional, Sequence, Text, Tuple
+
+from tenacity import RetryCallState
+
+_LOGGER = logging.getLogger(__name__)
+
+# Upper bounds in seconds of the latency buckets, matching the Prometheus client
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+UNKNOWN_ENDPOINT = "UNKNOWN"
+
+
+class RequestEvent:
+    """An API request reported to :class:`Instrumentation`.
+
+    Fields are filled in as the request progresses; on_request_start sees only
+    endpoint, method and url.
+    """
+
+    __slots__ = (
+        "endpoint",
+        "method",
+        "url",
+        "status",
+        "bytes",
+        "decode_time",
+        "wall_time",
+        "error",
+    )
+
+    def __init__(self, endpoint: Optional[Text], method: Text, url: Text) -> None:
+        """Initialize RequestEvent.
+
+        Args
+            endpoint: Name of the endpoint, e.g., VEHICLE_DATA
+            method: Lower case HTTP method
+            url: Requested url
+
+        """
+        self.endpoint: Text = endpoint or UNKNOWN_ENDPOINT
+        self.method: Text = method
+        self.url: Text = url
+        self.status: Optional[int] = None
+        self.bytes: int = 0
+        self.decode_time: float = 0.0
+        self.wall_time: float = 0.0
+        self.error: Optional[BaseException] = None
+
+    def __repr__(self) -> str:
+        """Return representation of the event."""
+        return (
+            f"RequestEvent({self.endpoint} {self.status} {self.bytes}B "
+            f"{self.wall_time * 1000:.1f}ms)"
+        )
+
+
+class RetryEvent:
+    """A retry of an API request reported to :class:`Instrumentation`."""
+
+    __slots__ = ("endpoint", "attempt", "wait", "error")
+
+    def __init__(
+        self,
+        endpoint: Optional[Text],
+        attempt: int,
+        wait: float,
+        error: Optional[BaseException],
+    ) -> None:
+        """Initialize RetryEvent.
+
+        Args
+            endpoint: Name of the endpoint, e.g., VEHICLE_DATA
+            attempt: Number of the attempt that failed
+            wait: Seconds until the next attempt
+            error: Exception raised by the failed attempt
+
+        """
+        self.endpoint: Text = endpoint or UNKNOWN_ENDPOINT
+        self.attempt: int = attempt
+        self.wait: float = wait
+        self.error: Optional[BaseException] = error
+
+
+class TokenRefreshEvent:
+    """An oauth refresh reported to :class:`Instrumentation`."""
+
+    __slots__ = ("wall_time", "error")
+
+    def __init__(self, wall_time: float, error: Optional[BaseException]) -> None:
+        """Initialize TokenRefreshEvent.
+
+        Args
+            wall_time: Seconds the refresh took
+            error: Exception raised by the refresh, None if successful
+
+        """
+        self.wall_time: float = wall_time
+        self.error: Optional[BaseException] = error
+
+
+class Instrumentation:
+    """Base class for receiving API events.
+
+    Subclass and override the hooks of interest, then pass an instance to the
+    Controller as ``instrumentation``. Hooks run inline on the event loop so
+    they must be fast and must not raise.
+    """
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """Handle the start of a request."""
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        """Handle the end of a request, successful or not."""
+
+    def on_retry(self, event: RetryEvent) -> None:
+        """Handle a failed attempt that is about to be retried."""
+
+    def on_token_refresh(self, event: TokenRefreshEvent) -> None:
+        """Handle the end of an oauth refresh."""
+
+
+class Histogram:
+    """Cumulative histogram with fixed bucket bounds.
+
+    Recording is a binary search and an increment, so it is cheap enough to
+    run on every request.
+    """
+
+    __slots__ = ("bounds", "counts", "count", "sum")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Initialize Histogram.
+
+        Args
+            bounds: Sorted upper bounds of the buckets; an overflow bucket is added
+
+        """
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a value."""
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, quantile: float) -> Optional[float]:
+        """Estimate a quantile by interpolating within its bucket.
+
+        Args
+            quantile: Quantile between 0 and 1, e.g., 0.99
+
+        Returns
+            Optional[float]: The estimate or None if nothing was recorded. Values in
+            the overflow bucket are reported as the largest bound.
+
+        """
+        if not self.count:
+            return None
+        rank = quantile * self.count
+        cumulative = 0
+        for index, count in enumerate(self.counts):
+            if count and cumulative + count >= rank:
+                if index == len(self.bounds):
+                    return self.bounds[-1]
+                lower = self.bounds[index - 1] if index else 0.0
+                upper = self.bounds[index]
+                return lower + (upper - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.bounds[-1]
+
+    def snapshot(self) -> Dict[Text, Any]:
+        """Return the histogram in Prometheus form.
+
+        Returns
+            Dict[Text, Any]: buckets as (upper bound, cumulative count) pairs ending
+            with +Inf, count, sum, p50 and p99
+
+        """
+        buckets = []
+        cumulative = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            cumulative += count
+            buckets.append((bound, cumulative))
+        return {
+            "buckets": buckets,
+            "count": self.count,
+            "sum": self.sum,
+            "p50": self.quantile(0.5),
+            "p99": self.quantile(0.99),
+        }
+
+
+class EndpointStats:
+    """Aggregated events of an endpoint."""
+
+    __slots__ = ("wall_time", "decode_time", "statuses", "errors", "bytes", "retries")
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Initialize EndpointStats."""
+        self.wall_time = Histogram(bounds)
+        self.decode_time = Histogram(bounds)
+        self.statuses: Dict[int, int] = {}
+        self.errors: Dict[Text, int] = {}
+        self.bytes: int = 0
+        self.retries: int = 0
+
+    def snapshot(self) -> Dict[Text, Any]:
+        """Return the aggregated events as a dict."""
+        return {
+            "wall_time": self.wall_time.snapshot(),
+            "decode_time": self.decode_time.snapshot(),
+            "statuses": dict(self.statuses),
+            "errors": dict(self.errors),
+            "bytes": self.bytes,
+            "retries": self.retries,
+        }
+
+
+class HistogramCollector(Instrumentation):
+    """In-memory aggregation of request latency per endpoint.
+
+    Use :meth:`snapshot` to export, e.g., p99 wall time per endpoint to
+    Prometheus without parsing logs.
+    """
+
+    def __init__(self, bounds: Sequence[float] = LATENCY_BUCKETS) -> None:
+        """Initialize HistogramCollector.
+
+        Args
+            bounds: Sorted upper bounds in seconds of the latency buckets
+
+        """
+        self.bounds: Tuple[float, ...] = tuple(bounds)
+        self.endpoints: Dict[Text, EndpointStats] = {}
+        self.in_flight: int = 0
+        self.token_refresh = Histogram(self.bounds)
+        self.token_refresh_errors: int = 0
+
+    def _stats(self, endpoint: Text) -> EndpointStats:
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats(self.bounds)
+        return stats
+
+    def on_request_start(self, event: RequestEvent) -> None:
+        """Count the request as in flight."""
+        self.in_flight += 1
+
+    def on_request_end(self, event: RequestEvent) -> None:
+        """Record the request."""
+        self.in_flight -= 1
+        stats = self._stats(event.endpoint)
+        stats.wall_time.observe(event.wall_time)
+        if event.decode_time:
+            stats.decode_time.observe(event.decode_time)
+        stats.bytes += event.bytes
+        if event.status is not None:
+            stats.statuses[event.status] = stats.statuses.get(event.status, 0) + 1
+        if event.error is not None:
+            name = type(event.error).__name__
+            stats.errors[name] = stats.errors.get(name, 0) + 1
+
+    def on_retry(self, event: RetryEvent) -> None:
+        """Count the retry."""
+        self._stats(event.endpoint).retries += 1
+
+    def on_token_refresh(self, event: TokenRefreshEvent) -> None:
+        """Record the refresh."""
+        self.token_refresh.observe(event.wall_time)
+        if event.error is not None:
+            self.token_refresh_errors += 1
+
+    def quantile(self, endpoint: Text, quantile: float) -> Optional[float]:
+        """Return the estimated wall time quantile of an endpoint."""
+        stats = self.endpoints.get(endpoint)
+        return stats.wall_time.quantile(quantile) if stats else None
+
+    def snapshot(self) -> Dict[Text, Any]:
+        """Return all aggregated events as a dict."""
+        return {
+            "endpoints": {
+                name: stats.snapshot() for name, stats in self.endpoints.items()
+            },
+            "in_flight": self.in_flight,
+            "token_refresh": self.token_refresh.snapshot(),
+            "token_refresh_errors": self.token_refresh_errors,
+        }
+
+    def reset(self) -> None:
+        """Discard all aggregated events."""
+        self.endpoints = {}
+        self.token_refresh = Histogram(self.bounds)
+        self.token_refresh_errors = 0
+
+
+def before_sleep_instrumented(retry_state: RetryCallState) -> None:
+    """Report a tenacity retry to the instrumentation of the retried object.
+
+    Use as the ``before_sleep`` of a retry decorated method whose object has an
+    ``instrumentation`` attribute and that takes an ``endpoint`` keyword.
+    """
+    owner = retry_state.args[0] if retry_state.args else None
+    instrumentation = getattr(owner, "instrumentation", None)
+    if instrumentation is None:
+        return
+    instrumentation.on_retry(
+        RetryEvent(
+            retry_state.kwargs.get("endpoint"),
+            retry_state.attempt_number,
+            retry_state.next_action.sleep if retry_state.next_action else 0.0,
+            retry_state.outcome.exception() if retry_state.outcome else None,
+        )
+    )
@@ -0,0 +1,289 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+from collections import OrderedDict, deque
+from email.utils import parsedate_to_datetime
+import logging
+import time
+from typing import Any, Deque, Dict, Hashable, Mapping, Optional
+
+from teslajsonpy.const import RATE_LIMIT_PAUSE
+from teslajsonpy.exceptions import TeslaException
+
+_LOGGER = logging.getLogger(__name__)
+
+PRIORITY_POLL = 0  # background polling; paused or shed when rate limited
+PRIORITY_COMMAND = 1  # user initiated commands; never held back
+
+
+class RateLimiter:
+    """Token bucket governing the API requests of an account.
+
+    Polling requests wait for a token when the bucket is empty and are shed
+    with a 429 :class:`TeslaException` while the API has asked us to back off
+    through a 429 response, Retry-After or rate limit headers. Commands only
+    consume tokens so the budget stays accurate.
+    """
+
+    def __init__(
+        self,
+        rate: Optional[float] = None,
+        burst: Optional[int] = None,
+        fleet: Optional["FleetRateLimiter"] = None,
+        account: Optional[Hashable] = None,
+    ):
+        """Initialize RateLimiter.
+
+        Args
+            rate (float, optional): Tokens added per second. None only applies
+            limits reported by the API.
+            burst (int, optional): Bucket capacity. Defaults to one minute of rate.
+            fleet (FleetRateLimiter, optional): Budget shared with other accounts
+            that polling requests also wait for.
+            account (Hashable, optional): Key of the account in fleet.
+
+        """
+        self.fleet: Optional[FleetRateLimiter] = fleet
+        self.account: Hashable = account if account is not None else id(self)
+        self.rate: Optional[float] = rate if rate and rate > 0 else None
+        self.capacity: float = float(
+            burst or (max(1, round(self.rate * 60)) if self.rate else 1)
+        )
+        self.tokens: float = self.capacity
+        self.paused_until: float = 0
+        self.limit: Optional[int] = None
+        self.remaining: Optional[int] = None
+        self.shed: int = 0
+        self.throttled: int = 0
+        self._updated: float = time.monotonic()
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        if self.rate:
+            self.tokens = min(
+                self.capacity, self.tokens + (now - self._updated) * self.rate
+            )
+        self._updated = now
+
+    @property
+    def paused(self) -> bool:
+        """Return whether polling is paused by the API."""
+        return time.time() < self.paused_until
+
+    async def acquire(self, priority: int = PRIORITY_POLL) -> None:
+        """Take a token for a request, waiting if needed.
+
+        Args
+            priority (int): PRIORITY_POLL or PRIORITY_COMMAND
+
+        Raises
+            TeslaException: 429 if a polling request is shed while paused
+
+        """
+        if priority >= PRIORITY_COMMAND:
+            self._refill(time.monotonic())
+            self.tokens = max(0.0, self.tokens - 1)
+            if self.fleet is not None:
+                self.fleet.consume()
+            return
+        if self.paused:
+            self.shed += 1
+            _LOGGER.debug(
+                "Rate limited; shedding request for %.0f seconds",
+                self.paused_until - time.time(),
+            )
+            raise TeslaException(429)
+        if not self.rate:
+            if self.fleet is not None:
+                await self.fleet.acquire(self.account)
+            return
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Waiters queue on the lock so tokens are handed out in order
+        async with self._lock:
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                self.throttled += 1
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                self._refill(time.monotonic())
+            self.tokens -= 1
+        if self.fleet is not None:
+            await self.fleet.acquire(self.account)
+
+    def update_from_response(self, status_code: int, headers: Mapping) -> None:
+        """Update the budget from the status and headers of a response.
+
+        Args
+            status_code (int): HTTP status of the response
+            headers (Mapping): HTTP headers of the response
+
+        """
+        now = time.time()
+        retry_after = _parse_retry_after(headers.get("Retry-After"), now)
+        limit = _header_int(headers, "RateLimit-Limit")
+        if limit is not None:
+            self.limit = limit
+        remaining = _header_int(headers, "RateLimit-Remaining")
+        if remaining is not None:
+            self.remaining = remaining
+            self._refill(time.monotonic())
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and retry_after is None:
+                retry_after = _header_int(headers, "RateLimit-Reset")
+                if retry_after and retry_after > now / 2:
+                    # Reset given as an epoch timestamp
+                    retry_after = max(0.0, retry_after - now)
+        if status_code == 429 and retry_after is None:
+            retry_after = RATE_LIMIT_PAUSE
+        if retry_after is not None and (
+            status_code == 429 or (remaining is not None and remaining <= 0)
+        ):
+            self.paused_until = max(self.paused_until, now + retry_after)
+            _LOGGER.debug("Rate limited; pausing polling for %s seconds", retry_after)
+
+    @property
+    def budget(self) -> Dict[str, Any]:
+        """Return the current budget.
+
+        Returns
+            Dict[str, Any]: tokens, capacity, rate, limit and remaining reported
+            by the API, seconds polling is paused for, and counts of shed and
+            throttled requests
+
+        """
+        self._refill(time.monotonic())
+        return {
+            "tokens": self.tokens if self.rate else None,
+            "capacity": self.capacity if self.rate else None,
+            "rate": self.rate,
+            "limit": self.limit,
+            "remaining": self.remaining,
+            "paused_for": max(0.0, self.paused_until - time.time()),
+            "shed": self.shed,
+            "throttled": self.throttled,
+        }
+
+
+class FleetRateLimiter:
+    """Token bucket shared by the accounts of a fleet.
+
+    Polling requests that find the bucket empty queue per account and the
+    tokens earned are handed out round-robin across the waiting accounts, so
+    an account polling many vehicles cannot starve one polling a few.
+    Commands only consume tokens.
+    """
+
+    def __init__(self, rate: float, burst: Optional[int] = None):
+        """Initialize FleetRateLimiter.
+
+        Args
+            rate (float): Tokens added per second for all accounts together
+            burst (int, optional): Bucket capacity. Defaults to one minute of rate.
+
+        """
+        self.rate: float = rate
+        self.capacity: float = float(burst or max(1, round(rate * 60)))
+        self.tokens: float = self.capacity
+        self.granted: Dict[Hashable, int] = {}
+        self._updated: float = time.monotonic()
+        self._waiters: "OrderedDict[Hashable, Deque[asyncio.Future]]" = OrderedDict()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens earned since the last refill."""
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def waiting(self) -> Dict[Hashable, int]:
+        """Return the number of queued requests by account."""
+        return {account: len(queue) for account, queue in self._waiters.items()}
+
+    def consume(self) -> None:
+        """Take a token for a command without waiting."""
+        self._refill(time.monotonic())
+        self.tokens = max(0.0, self.tokens - 1)
+
+    async def acquire(self, account: Hashable) -> None:
+        """Take a token for a polling request of account, waiting for its turn."""
+        self._refill(time.monotonic())
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted[account] = self.granted.get(account, 0) + 1
+            return
+        future = asyncio.get_event_loop().create_future()
+        self._waiters.setdefault(account, deque()).append(future)
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+        await future
+
+    async def _dispatch(self) -> None:
+        """Hand out tokens to the queued accounts in turn."""
+        while self._waiters:
+            self._refill(time.monotonic())
+            if self.tokens < 1:
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+                continue
+            account, queue = next(iter(self._waiters.items()))
+            future = queue.popleft()
+            if queue:
+                self._waiters.move_to_end(account)
+            else:
+                del self._waiters[account]
+            if future.done():
+                # Cancelled while waiting
+                continue
+            self.tokens -= 1
+            self.granted[account] = self.granted.get(account, 0) + 1
+            future.set_result(None)
+
+    @property
+    def budget(self) -> Dict[str, Any]:
+        """Return the current budget.
+
+        Returns
+            Dict[str, Any]: tokens, capacity, rate, requests waiting by account
+            and requests granted by account
+
+        """
+        self._refill(time.monotonic())
+        return {
+            "tokens": self.tokens,
+            "capacity": self.capacity,
+            "rate": self.rate,
+            "waiting": self.waiting,
+            "granted": dict(self.granted),
+        }
+
+
+def _header_int(headers: Mapping, name: str) -> Optional[int]:
+    """Return an integer rate limit header with or without the X- prefix."""
+    value = headers.get(name)
+    if value is None:
+        value = headers.get(f"X-{name}")
+    try:
+        return int(float(value)) if value is not None else None
+    except ValueError:
+        return None
+
+
+def _parse_retry_after(value: Optional[str], now: float) -> Optional[float]:
+    """Return seconds to wait from a Retry-After header value."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now)
+    except (TypeError, ValueError):
+        return None
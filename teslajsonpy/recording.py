@@ -0,0 +1,323 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+from collections import deque
+import gzip
+from json import JSONDecodeError
+import logging
+import time
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Text,
+    Tuple,
+)
+from urllib.parse import parse_qsl, urlencode
+
+import httpx
+import orjson
+
+_LOGGER = logging.getLogger(__name__)
+
+REDACTED = "REDACTED"
+# Keys whose values are replaced in bodies, queries and messages
+REDACTED_KEYS = frozenset(
+    {
+        "access_token",
+        "refresh_token",
+        "id_token",
+        "token",
+        "password",
+        "code",
+        "code_verifier",
+        "code_challenge",
+        "passcode",
+        "transaction_id",
+        "identity",
+        "credential",
+    }
+)
+# Response headers kept in recordings; the rest, e.g., cookies, are dropped
+RECORDED_HEADERS = frozenset(
+    {"content-type", "retry-after", "ratelimit-limit", "ratelimit-remaining"}
+)
+
+
+def redact(value: Any) -> Any:
+    """Return value with the values of REDACTED_KEYS replaced, recursively."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in REDACTED_KEYS and item else redact(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item) for item in value]
+    return value
+
+
+def _redact_query(query: Text) -> Text:
+    if not query:
+        return ""
+    return urlencode(
+        [
+            (key, REDACTED if key in REDACTED_KEYS else value)
+            for key, value in parse_qsl(query, keep_blank_values=True)
+        ]
+    )
+
+
+def _key(method: Text, url: httpx.URL) -> Text:
+    """Return the replay key of a request: method, path and redacted query."""
+    query = _redact_query(url.query.decode())
+    return f"{method.upper()} {url.path}{'?' + query if query else ''}"
+
+
+def _redact_body(content: bytes) -> Any:
+    """Return a request or response body decoded and redacted.
+
+    JSON bodies are stored as values and form bodies as dicts. Other bodies,
+    e.g., login pages, are dropped as they may hold credentials.
+    """
+    if not content:
+        return None
+    try:
+        return redact(orjson.loads(content))  # pylint: disable=no-member
+    except JSONDecodeError:
+        pass
+    try:
+        form = parse_qsl(content.decode(), keep_blank_values=True, strict_parsing=True)
+    except (UnicodeDecodeError, ValueError):
+        return None
+    return redact(dict(form))
+
+
+class TrafficRecorder:
+    """Writer of API traffic to a gzip file of JSON lines.
+
+    Each line is a REST exchange or a received streaming message with its
+    offset from the start of the recording. Authorization headers, cookies
+    and the values of REDACTED_KEYS are never written.
+    """
+
+    def __init__(self, path: Text) -> None:
+        """Initialize TrafficRecorder.
+
+        Args
+            path: File to write, conventionally ending in .jsonl.gz
+
+        """
+        self.path: Text = path
+        self.entries: int = 0
+        self._file: Optional[IO[bytes]] = gzip.open(path, "wb")
+        self._started: float = time.monotonic()
+
+    def offset(self) -> float:
+        """Return seconds since the recording started."""
+        return time.monotonic() - self._started
+
+    def _write(self, entry: Dict[Text, Any]) -> None:
+        if self._file is None:
+            return
+        self._file.write(orjson.dumps(entry))  # pylint: disable=no-member
+        self._file.write(b"\n")
+        self.entries += 1
+
+    def record_http(
+        self,
+        request: httpx.Request,
+        response: httpx.Response,
+        started: float,
+        duration: float,
+    ) -> None:
+        """Write a REST exchange.
+
+        Args
+            request: The sent request
+            response: The read response
+            started: Offset of the request, see offset
+            duration: Seconds until the response was read
+
+        """
+        self._write(
+            {
+                "type": "http",
+                "t": round(started, 6),
+                "duration": round(duration, 6),
+                "key": _key(request.method, request.url),
+                "request": _redact_body(request.content),
+                "status": response.status_code,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.lower() in RECORDED_HEADERS
+                    or name.lower().startswith("x-ratelimit")
+                },
+                "body": _redact_body(response.content),
+            }
+        )
+
+    def record_message(self, data: dict) -> None:
+        """Write a received streaming message."""
+        self._write({"type": "ws", "t": round(self.offset(), 6), "data": redact(data)})
+
+    def close(self) -> None:
+        """Flush and close the file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "TrafficRecorder":
+        """Return the recorder."""
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        """Close the recorder."""
+        self.close()
+
+
+def read_recording(path: Text) -> Iterator[Dict[Text, Any]]:
+    """Yield the entries of a recording in order."""
+    with gzip.open(path, "rb") as file:
+        for line in file:
+            if line.strip():
+                yield orjson.loads(line)  # pylint: disable=no-member
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    """httpx transport writing every exchange to a TrafficRecorder.
+
+    Use as ``httpx.AsyncClient(transport=RecordingTransport(recorder))`` and
+    pass the client to the Controller as websession.
+    """
+
+    def __init__(
+        self,
+        recorder: TrafficRecorder,
+        transport: Optional[httpx.AsyncBaseTransport] = None,
+    ) -> None:
+        """Initialize RecordingTransport.
+
+        Args
+            recorder: Destination of the exchanges
+            transport: Transport sending the requests. Defaults to AsyncHTTPTransport.
+
+        """
+        self.recorder = recorder
+        self.transport = transport or httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Send request and record the exchange."""
+        started = self.recorder.offset()
+        response = await self.transport.handle_async_request(request)
+        content = await response.aread()
+        await response.aclose()
+        # content is decoded, so drop the headers describing the encoded body
+        headers = [
+            (name, value)
+            for name, value in response.headers.multi_items()
+            if name.lower() not in ("content-encoding", "content-length")
+        ]
+        response = httpx.Response(
+            response.status_code,
+            headers=headers,
+            content=content,
+            request=request,
+            extensions=response.extensions,
+        )
+        self.recorder.record_http(
+            request, response, started, self.recorder.offset() - started
+        )
+        return response
+
+    async def aclose(self) -> None:
+        """Close the wrapped transport."""
+        await self.transport.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """httpx transport answering requests from a recording.
+
+    Requests are matched by method, path and query, independent of host, and
+    get the recorded responses for that key in order; once they run out the
+    last one is repeated, so a short recording can drive many update rounds.
+    Unrecorded requests get a 404.
+    """
+
+    def __init__(self, path: Text, speed: float = 0.0) -> None:
+        """Initialize ReplayTransport.
+
+        Args
+            path: Recording written by TrafficRecorder
+            speed: Recorded latency is divided by speed, e.g., 1 for recorded
+                timing or 10 for ten times faster. 0 answers without delay.
+
+        """
+        self.speed: float = speed
+        self.responses: Dict[Text, Deque[Dict[Text, Any]]] = {}
+        self.messages: List[Dict[Text, Any]] = []
+        self.unmatched: int = 0
+        for entry in read_recording(path):
+            if entry["type"] == "http":
+                self.responses.setdefault(entry["key"], deque()).append(entry)
+            elif entry["type"] == "ws":
+                self.messages.append(entry)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Return the recorded response of request."""
+        recorded = self.responses.get(_key(request.method, request.url))
+        if not recorded:
+            self.unmatched += 1
+            _LOGGER.debug("No recorded response for %s", request.url)
+            return httpx.Response(
+                404,
+                content=orjson.dumps(  # pylint: disable=no-member
+                    {"response": None, "error": "not_recorded"}
+                ),
+                request=request,
+            )
+        entry = recorded.popleft() if len(recorded) > 1 else recorded[0]
+        if self.speed:
+            await asyncio.sleep(entry["duration"] / self.speed)
+        body = entry["body"]
+        # pylint: disable=no-member
+        content = b"" if body is None else orjson.dumps(body)
+        return httpx.Response(
+            entry["status"], headers=entry["headers"], content=content, request=request
+        )
+
+    async def replay_messages(
+        self, callback: Callable[[dict], None], speed: Optional[float] = None
+    ) -> int:
+        """Feed the recorded streaming messages to callback.
+
+        Args
+            callback: Called with each message, e.g., a controller's websocket handler
+            speed: Overrides the transport speed for the messages
+
+        Returns
+            int: Number of messages fed
+
+        """
+        speed = self.speed if speed is None else speed
+        previous: Optional[float] = None
+        for entry in self.messages:
+            if speed and previous is not None and entry["t"] > previous:
+                await asyncio.sleep((entry["t"] - previous) / speed)
+            previous = entry["t"]
+            callback(entry["data"])
+        return len(self.messages)
+
+    def summary(self) -> List[Tuple[Text, int]]:
+        """Return the recorded keys and their response counts."""
+        return [(key, len(entries)) for key, entries in self.responses.items()]
@@ -0,0 +1,95 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import heapq
+import itertools
+from typing import Dict, Hashable, List, Optional, Tuple
+
+
+class PollingScheduler:
+    """Min-heap of the next due time for each polled product.
+
+    Rescheduling a key leaves its old heap entry in place; stale entries are
+    skipped when they reach the top of the heap and the heap is compacted when
+    they outnumber the live ones. Scheduling and popping a key are O(log n).
+    """
+
+    def __init__(self) -> None:
+        """Initialize PollingScheduler."""
+        self._heap: List[list] = []
+        self._entries: Dict[Hashable, list] = {}
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        """Return number of scheduled keys."""
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        """Return if key is scheduled."""
+        return key in self._entries
+
+    def schedule(self, key: Hashable, due: float) -> bool:
+        """Set the due time for key, replacing any existing one.
+
+        Args
+            key: Identifier of the product to poll
+            due: Timestamp when the key is due
+
+        Returns
+            bool: Whether key is now the earliest due key
+
+        """
+        entry = [due, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+        if len(self._heap) > 2 * len(self._entries) + 16:
+            self._compact()
+        return self._heap[0] is entry
+
+    def cancel(self, key: Hashable) -> None:
+        """Remove key from the schedule."""
+        self._entries.pop(key, None)
+
+    def get_due(self, key: Hashable) -> Optional[float]:
+        """Return the due time for key or None if not scheduled."""
+        entry = self._entries.get(key)
+        return entry[0] if entry else None
+
+    def next_due(self) -> Optional[float]:
+        """Return the earliest due time or None if nothing is scheduled."""
+        self._discard_stale()
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, now: float) -> List[Tuple[Hashable, float]]:
+        """Remove and return all keys due at or before now.
+
+        Args
+            now: Current timestamp
+
+        Returns
+            List[Tuple[Hashable, float]]: The due keys and due times, earliest first
+
+        """
+        due = []
+        self._discard_stale()
+        while self._heap and self._heap[0][0] <= now:
+            due_time, _, key = heapq.heappop(self._heap)
+            del self._entries[key]
+            due.append((key, due_time))
+            self._discard_stale()
+        return due
+
+    def _discard_stale(self) -> None:
+        """Pop cancelled or rescheduled entries off the top of the heap."""
+        heap = self._heap
+        while heap and self._entries.get(heap[0][2]) is not heap[0]:
+            heapq.heappop(heap)
+
+    def _compact(self) -> None:
+        """Rebuild the heap from the live entries."""
+        self._heap = list(self._entries.values())
+        heapq.heapify(self._heap)
@@ -0,0 +1,565 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from collections.abc import Mapping
+from operator import attrgetter
+from typing import Any, Dict, Iterable, Optional, Sequence, Text, Tuple
+
+
+class Field:
+    """Declaration of a vehicle data field exposed as a TeslaCar property."""
+
+    __slots__ = ("name", "section", "type", "doc", "key", "default")
+
+    def __init__(
+        self,
+        name: Text,
+        section: Optional[Text],
+        type_: type,
+        doc: Text,
+        key: Optional[Text] = None,
+        default: Any = None,
+    ) -> None:
+        """Initialize Field.
+
+        Args
+            name: Property name on TeslaCar
+            section: Section of vehicle data, e.g., charge_state. None for top level.
+            type_: Type of the value when present
+            doc: Docstring of the property
+            key: Key within the section. Defaults to name.
+            default: Value when the key is missing
+
+        """
+        self.name: Text = name
+        self.section: Optional[Text] = section
+        self.type: type = type_
+        self.doc: Text = doc
+        self.key: Text = key or name
+        self.default: Any = default
+
+    def __repr__(self) -> str:
+        """Return representation of the field."""
+        return f"Field({self.name!r}, {self.section}.{self.key})"
+
+
+VEHICLE_FIELDS: Tuple[Field, ...] = (
+    Field(
+        "battery_level",
+        "charge_state",
+        float,
+        "Return car battery level (SOC). This is not affected by temperature.",
+    ),
+    Field(
+        "usable_battery_level",
+        "charge_state",
+        float,
+        "Return car usable battery level (uSOE). This is the value used in the app and car.",
+    ),
+    Field("battery_range", "charge_state", float, "Return car battery range."),
+    Field(
+        "cabin_overheat_protection",
+        "climate_state",
+        str,
+        "Return cabin overheat protection.",
+    ),
+    Field(
+        "car_version",
+        "vehicle_state",
+        str,
+        "Return installed car software version.",
+    ),
+    Field(
+        "charger_actual_current",
+        "charge_state",
+        int,
+        "Return charger actual current.",
+    ),
+    Field(
+        "charge_current_request",
+        "charge_state",
+        int,
+        "Return charge current request.",
+    ),
+    Field(
+        "charge_current_request_max",
+        "charge_state",
+        int,
+        "Return charge current request max.",
+    ),
+    Field(
+        "charge_port_latch",
+        "charge_state",
+        str,
+        "Return charger port latch state, e.g., Engaged.",
+    ),
+    Field("charge_energy_added", "charge_state", float, "Return charge energy added."),
+    Field("charge_limit_soc", "charge_state", int, "Return charge limit soc."),
+    Field("charge_limit_soc_max", "charge_state", int, "Return charge limit soc max."),
+    Field("charge_limit_soc_min", "charge_state", int, "Return charge limit soc min."),
+    Field(
+        "charge_miles_added_ideal",
+        "charge_state",
+        float,
+        "Return charge ideal miles added.",
+    ),
+    Field(
+        "charge_miles_added_rated",
+        "charge_state",
+        float,
+        "Return charge rated miles added.",
+    ),
+    Field("charger_phases", "charge_state", int, "Return charger phase."),
+    Field("charger_power", "charge_state", int, "Return charger power."),
+    Field("charge_rate", "charge_state", str, "Return charge rate."),
+    Field(
+        "charging_state",
+        "charge_state",
+        str,
+        "Return charging state: Charging, Stopped, Complete, Disconnected, NoPower or None when asleep.",
+    ),
+    Field("charger_voltage", "charge_state", int, "Return charger voltage."),
+    Field("bioweapon_mode", "climate_state", bool, "Return bioweapon defense mode."),
+    Field(
+        "climate_keeper_mode",
+        "climate_state",
+        str,
+        "Return climate keeper mode: dog, camp, on or off. Not supported on all models.",
+    ),
+    Field("conn_charge_cable", "charge_state", str, "Return charge cable connection."),
+    Field(
+        "defrost_mode",
+        "climate_state",
+        int,
+        "Return defrost mode: 2 (on) or 0 (off).",
+        default=0,
+    ),
+    Field(
+        "driver_temp_setting",
+        "climate_state",
+        float,
+        "Return driver temperature setting.",
+    ),
+    Field("fan_status", "climate_state", int, "Return fan status setting."),
+    Field("fast_charger_present", "charge_state", bool, "Return fast charger present."),
+    Field("fast_charger_brand", "charge_state", str, "Return fast charger brand."),
+    Field("fast_charger_type", "charge_state", str, "Return fast charger type."),
+    Field(
+        "door_df",
+        "vehicle_state",
+        int,
+        "Return driver front door status.",
+        key="df",
+    ),
+    Field("door_dr", "vehicle_state", int, "Return driver rear door status.", key="dr"),
+    Field(
+        "door_pf",
+        "vehicle_state",
+        int,
+        "Return passenger front door status.",
+        key="pf",
+    ),
+    Field(
+        "door_pr",
+        "vehicle_state",
+        int,
+        "Return passenger rear door status.",
+        key="pr",
+    ),
+    Field("gui_distance_units", "gui_settings", str, "Return gui distance units."),
+    Field("gui_range_display", "gui_settings", str, "Return range display."),
+    Field("heading", "drive_state", int, "Return heading."),
+    Field(
+        "homelink_device_count",
+        "vehicle_state",
+        int,
+        "Return Homelink device count.",
+    ),
+    Field("homelink_nearby", "vehicle_state", bool, "Return Homelink nearby."),
+    Field(
+        "ideal_battery_range",
+        "charge_state",
+        float,
+        "Return car ideal battery range.",
+    ),
+    Field("inside_temp", "climate_state", float, "Return inside temperature."),
+    Field(
+        "is_charge_port_door_open",
+        "charge_state",
+        bool,
+        "Return charger port door open.",
+        key="charge_port_door_open",
+    ),
+    Field("is_climate_on", "climate_state", bool, "Return climate is on."),
+    Field("is_locked", "vehicle_state", bool, "Return car is locked.", key="locked"),
+    Field(
+        "is_steering_wheel_heater_on",
+        "climate_state",
+        bool,
+        "Return steering wheel heater.",
+        key="steering_wheel_heater",
+    ),
+    Field("longitude", "drive_state", float, "Return longitude."),
+    Field("latitude", "drive_state", float, "Return latitude."),
+    Field(
+        "max_avail_temp",
+        "climate_state",
+        float,
+        "Return max available temperature.",
+    ),
+    Field(
+        "min_avail_temp",
+        "climate_state",
+        float,
+        "Return min available temperature.",
+    ),
+    Field("native_heading", "drive_state", int, "Return native heading."),
+    Field(
+        "native_location_supported",
+        "drive_state",
+        int,
+        "Return native location supported.",
+    ),
+    Field("native_longitude", "drive_state", float, "Return native longitude."),
+    Field("native_latitude", "drive_state", float, "Return native latitude."),
+    Field("native_type", "drive_state", str, "Return native type."),
+    Field("odometer", "vehicle_state", float, "Return odometer."),
+    Field("outside_temp", "climate_state", float, "Return outside temperature."),
+    Field(
+        "passenger_temp_setting",
+        "climate_state",
+        float,
+        "Return passenger temperature setting.",
+    ),
+    Field("power", "drive_state", int, "Return power."),
+    Field(
+        "powered_lift_gate",
+        "vehicle_config",
+        bool,
+        "Return True if car has power lift gate.",
+        key="plg",
+    ),
+    Field(
+        "rear_seat_heaters",
+        "vehicle_config",
+        int,
+        "Return if car has rear (second row) heated seats; 0 if none.",
+    ),
+    Field(
+        "has_seat_cooling",
+        "vehicle_config",
+        bool,
+        "Return if car has cooled seats.",
+    ),
+    Field("sentry_mode", "vehicle_state", bool, "Return sentry mode."),
+    Field(
+        "sentry_mode_available",
+        "vehicle_state",
+        bool,
+        "Return sentry mode available.",
+    ),
+    Field("shift_state", "drive_state", str, "Return shift state."),
+    Field("speed", "drive_state", float, "Return speed."),
+    Field(
+        "software_update",
+        "vehicle_state",
+        dict,
+        "Return software update version information.",
+    ),
+    Field(
+        "tpms_pressure_fl",
+        "vehicle_state",
+        float,
+        "Return tire pressure sensor for front left tire.",
+    ),
+    Field(
+        "tpms_pressure_fr",
+        "vehicle_state",
+        float,
+        "Return tire pressure sensor for front right tire.",
+    ),
+    Field(
+        "tpms_pressure_rl",
+        "vehicle_state",
+        float,
+        "Return tire pressure sensor for rear left tire.",
+    ),
+    Field(
+        "tpms_pressure_rr",
+        "vehicle_state",
+        float,
+        "Return tire pressure sensor for rear right tire.",
+    ),
+    Field("third_row_seats", "vehicle_config", str, "Return third row seats option."),
+    Field("time_to_full_charge", "charge_state", float, "Return time to full charge."),
+    Field(
+        "window_fd",
+        "vehicle_state",
+        int,
+        "Return front driver window status.",
+        key="fd_window",
+    ),
+    Field(
+        "window_fp",
+        "vehicle_state",
+        int,
+        "Return front passenger window status.",
+        key="fp_window",
+    ),
+    Field(
+        "window_rd",
+        "vehicle_state",
+        int,
+        "Return rear driver window status.",
+        key="rd_window",
+    ),
+    Field(
+        "window_rp",
+        "vehicle_state",
+        int,
+        "Return rear passenger window status.",
+        key="rp_window",
+    ),
+    Field(
+        "is_remote_start",
+        "vehicle_state",
+        bool,
+        "Return if remote start active.",
+        key="remote_start",
+    ),
+    Field(
+        "is_valet_mode",
+        "vehicle_state",
+        bool,
+        "Return state of valet mode.",
+        key="valet_mode",
+    ),
+    Field(
+        "is_auto_seat_climate_left",
+        "climate_state",
+        bool,
+        "Return state of auto seat climate left.",
+        key="auto_seat_climate_left",
+    ),
+    Field(
+        "is_auto_seat_climate_right",
+        "climate_state",
+        bool,
+        "Return state of auto seat climate right.",
+        key="auto_seat_climate_right",
+    ),
+    Field(
+        "is_auto_steering_wheel_heat",
+        "climate_state",
+        bool,
+        "Return the state of auto steering wheel heat.",
+        key="auto_steering_wheel_heat",
+    ),
+    Field(
+        "scheduled_departure_time",
+        "charge_state",
+        int,
+        "Return the scheduled departure time.",
+    ),
+    Field(
+        "scheduled_departure_time_minutes",
+        "charge_state",
+        int,
+        "Return the scheduled departure time in minutes after midnight.",
+    ),
+    Field(
+        "is_off_peak_charging_enabled",
+        "charge_state",
+        bool,
+        "Return if peak charging is enabled for scheduled departure.",
+        key="off_peak_charging_enabled",
+    ),
+    Field(
+        "off_peak_hours_end_time",
+        "charge_state",
+        int,
+        "Return end of off peak hours in minutes after midnight for scheduled departure.",
+    ),
+    Field(
+        "is_preconditioning_enabled",
+        "charge_state",
+        bool,
+        "Return if preconditioning is enabled for scheduled departure.",
+        key="preconditioning_enabled",
+    ),
+    Field(
+        "scheduled_charging_mode",
+        "charge_state",
+        str,
+        "Return 'Off', 'DepartBy', or 'StartAt' for schedule disabled, scheduled departure, and scheduled charging respectively.",
+    ),
+    Field(
+        "is_scheduled_charging_pending",
+        "charge_state",
+        bool,
+        "Return if scheduled charging is pending.",
+        key="scheduled_charging_pending",
+    ),
+    Field(
+        "scheduled_charging_start_time_app",
+        "charge_state",
+        int,
+        "Return the scheduled charging start time.",
+    ),
+    Field(
+        "active_route_destination",
+        "drive_state",
+        str,
+        "Return active route destination.",
+    ),
+    Field(
+        "active_route_energy_at_arrival",
+        "drive_state",
+        int,
+        "Return active route energy at arrival.",
+    ),
+    Field(
+        "active_route_latitude",
+        "drive_state",
+        float,
+        "Return active route latitude.",
+    ),
+    Field(
+        "active_route_longitude",
+        "drive_state",
+        float,
+        "Return active route longitude.",
+    ),
+    Field(
+        "active_route_miles_to_arrival",
+        "drive_state",
+        float,
+        "Return active route miles to arrival.",
+    ),
+    Field(
+        "active_route_minutes_to_arrival",
+        "drive_state",
+        float,
+        "Return active route minutes to arrival.",
+    ),
+)
+
+
+class FieldState:
+    """Base class of compact per car state objects.
+
+    Subclasses are created by :func:`make_state_class` with a slot per field, so
+    reading a field is a single attribute load.
+    """
+
+    __slots__ = ()
+    _sections: Dict[Optional[Text], Tuple[Tuple[Text, Text, Any], ...]] = {}
+    # Entries of the keys passed to load_keys, cached per subclass
+    _key_entries: Dict[Tuple[Optional[Text], Tuple[Text, ...]], tuple] = {}
+
+    def __init__(self, data: Optional[dict] = None) -> None:
+        """Initialize the state with defaults, then load data if given."""
+        for entries in self._sections.values():
+            for name, _, default in entries:
+                setattr(self, name, default)
+        if data:
+            self.load(data)
+
+    def load(self, data: dict) -> None:
+        """Set every field from vehicle data."""
+        for section in self._sections:
+            self.load_section(section, data if section is None else data.get(section))
+
+    def load_section(self, section: Optional[Text], values: Optional[dict]) -> None:
+        """Set the fields of a section from its values.
+
+        Args
+            section: Section of vehicle data, e.g., charge_state. None for top level.
+            values: The section mapping; fields are reset to defaults if None
+
+        """
+        entries = self._sections.get(section)
+        if not entries:
+            return
+        if not isinstance(values, Mapping):
+            values = {}
+        for name, key, default in entries:
+            setattr(self, name, values.get(key, default))
+
+    def load_keys(
+        self, section: Optional[Text], values: Mapping, keys: Tuple[Text, ...]
+    ) -> None:
+        """Set the fields of only some keys of a section from its values.
+
+        Args
+            section: Section of vehicle data, e.g., drive_state. None for top level.
+            values: The section mapping
+            keys: Keys of the section that changed; keys without a field are skipped
+
+        """
+        entries = self._key_entries.get((section, keys))
+        if entries is None:
+            wanted = set(keys)
+            entries = self._key_entries[(section, keys)] = tuple(
+                entry
+                for entry in self._sections.get(section, ())
+                if entry[1] in wanted
+            )
+        for name, key, default in entries:
+            setattr(self, name, values.get(key, default))
+
+    def as_dict(self) -> Dict[Text, Any]:
+        """Return the fields as a dict by name."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def __repr__(self) -> str:
+        """Return representation of the state."""
+        return f"{type(self).__name__}({self.as_dict()})"
+
+
+def make_state_class(name: Text, fields: Sequence[Field]) -> type:
+    """Return a FieldState subclass with a slot per field."""
+    sections: Dict[Optional[Text], list] = {}
+    for field in fields:
+        sections.setdefault(field.section, []).append(
+            (field.name, field.key, field.default)
+        )
+    return type(
+        name,
+        (FieldState,),
+        {
+            "__slots__": tuple(field.name for field in fields),
+            "__doc__": f"Compact state of {len(fields)} fields.",
+            "_sections": {
+                section: tuple(entries) for section, entries in sections.items()
+            },
+            "_key_entries": {},
+        },
+    )
+
+
+def field_properties(fields: Iterable[Field], state_attr: Text = "_state"):
+    """Return a class decorator adding a read only property per field.
+
+    Each property reads the field from the FieldState stored in state_attr.
+    Properties defined in the class body take precedence.
+    """
+
+    def _decorate(cls: type) -> type:
+        for field in fields:
+            if field.name not in cls.__dict__:
+                setattr(
+                    cls,
+                    field.name,
+                    property(attrgetter(f"{state_attr}.{field.name}"), doc=field.doc),
+                )
+        return cls
+
+    return _decorate
+
+
+VehicleState = make_state_class("VehicleState", VEHICLE_FIELDS)
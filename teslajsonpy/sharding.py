@@ -0,0 +1,509 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+import copy
+import itertools
+import logging
+import multiprocessing
+from multiprocessing.connection import Connection as Pipe
+import os
+import threading
+import time
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    List,
+    Optional,
+    Sequence,
+    Text,
+    Tuple,
+)
+
+from teslajsonpy.car import TeslaCar
+from teslajsonpy.changes import diff_update
+from teslajsonpy.const import UPDATE_INTERVAL
+from teslajsonpy.controller import Controller
+from teslajsonpy.energy import EnergySite, create_energysite
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.fleet import FleetManager
+
+_LOGGER = logging.getLogger(__name__)
+
+# Messages between the runner and its workers: (kind, *payload)
+MSG_READY = "ready"  # worker: snapshots and errors by account
+MSG_ROUND = "round"  # worker: deltas of an update round
+MSG_CALL = "call"  # runner: call a controller method of an account
+MSG_RESULT = "result"  # worker: result of a call
+MSG_STOP = "stop"  # runner: disconnect and exit
+
+# Delta: {dotted path: new value}, e.g., {"charge_state.battery_level": 80}
+Delta = Dict[Text, Any]
+
+
+def assign_shards(keys: Sequence[Hashable], workers: int) -> List[List[Hashable]]:
+    """Split keys round-robin into at most workers non-empty shards."""
+    shards: List[List[Hashable]] = [[] for _ in range(max(1, min(workers, len(keys))))]
+    for index, key in enumerate(keys):
+        shards[index % len(shards)].append(key)
+    return shards
+
+
+def to_delta(changes: Dict[Text, Tuple[Any, Any]]) -> Delta:
+    """Return the new values of a ChangeDispatcher changes dict."""
+    return {path: new for path, (_, new) in changes.items()}
+
+
+def apply_delta(data: dict, delta: Delta) -> None:
+    """Set the dotted paths of a delta in nested data."""
+    for path, value in delta.items():
+        target = data
+        *parents, key = path.split(".")
+        for parent in parents:
+            child = target.get(parent)
+            if not isinstance(child, dict):
+                child = target[parent] = {}
+            target = child
+        target[key] = value
+
+
+def _read_pipe(pipe: Pipe, loop: asyncio.AbstractEventLoop, handle: Callable) -> None:
+    """Hand the messages of pipe to handle on loop until it closes."""
+    while True:
+        try:
+            message = pipe.recv()
+        except (EOFError, OSError):
+            message = None
+        try:
+            loop.call_soon_threadsafe(handle, message)
+        except RuntimeError:
+            # Loop closed
+            return
+        if message is None:
+            return
+
+
+def _start_reader(pipe: Pipe, handle: Callable) -> None:
+    """Read pipe in a daemon thread, which never holds up interpreter exit."""
+    threading.Thread(
+        target=_read_pipe,
+        args=(pipe, asyncio.get_event_loop(), handle),
+        daemon=True,
+    ).start()
+
+
+def _error(ex: BaseException) -> Tuple[Any, Text]:
+    """Return an exception as picklable (code, message)."""
+    if isinstance(ex, TeslaException):
+        return ex.code, ex.message
+    return None, repr(ex)
+
+
+class _Worker:
+    """Event loop of a worker process running the controllers of a shard."""
+
+    def __init__(
+        self,
+        pipe: Pipe,
+        accounts: List[Tuple[Hashable, dict, Optional[List[Text]]]],
+        interval: float,
+        update_kwargs: dict,
+        rate_limit: Optional[float],
+        rate_limit_burst: Optional[int],
+    ) -> None:
+        self.pipe = pipe
+        self.accounts = accounts
+        self.interval = interval
+        self.update_kwargs = update_kwargs
+        self.fleet = FleetManager(
+            rate_limit=rate_limit, rate_limit_burst=rate_limit_burst
+        )
+        self.deltas: Dict[Hashable, List[Tuple[Text, Delta]]] = {}
+        self.sites: Dict[Hashable, Dict[int, dict]] = {}
+        self.stopping: Optional[asyncio.Event] = None
+
+    def _handle(self, message: Optional[tuple]) -> None:
+        if message is None or message[0] == MSG_STOP:
+            self.stopping.set()
+        elif message[0] == MSG_CALL:
+            asyncio.ensure_future(self._call(*message[1:]))
+
+    async def _call(
+        self, call_id: int, account: Hashable, method: Text, args: tuple, kwargs: dict
+    ) -> None:
+        try:
+            controller = self.fleet.controllers[account]
+            result = await getattr(controller, method)(*args, **kwargs)
+        except Exception as ex:  # pylint: disable=broad-except
+            self.pipe.send((MSG_RESULT, call_id, False, _error(ex)))
+            return
+        self.pipe.send((MSG_RESULT, call_id, True, result))
+
+    def _site_deltas(self, account: Hashable, controller: Controller) -> list:
+        """Return the site data changed since last sent."""
+        deltas = []
+        sent = self.sites.setdefault(account, {})
+        for energysite_id in controller.energysites:
+            data = controller.get_raw_site_data(energysite_id)
+            changes = diff_update(sent.get(energysite_id, {}), data)
+            if changes:
+                deltas.append((energysite_id, to_delta(changes)))
+                sent[energysite_id] = copy.deepcopy(data)
+        return deltas
+
+    async def run(self) -> None:
+        """Connect the accounts, then update them until stopped."""
+        self.stopping = asyncio.Event()
+        _start_reader(self.pipe, self._handle)
+        for account, kwargs, _ in self.accounts:
+            self.fleet.add_account(account, **kwargs)
+        await asyncio.gather(
+            *(
+                self.fleet.connect([account], filtered_vins=vins)
+                for account, _, vins in self.accounts
+            )
+        )
+        ready = {}
+        for account, health in self.fleet.health().items():
+            controller = self.fleet.controllers[account]
+            if health.connected:
+                ready[account] = (controller.get_snapshot(), None)
+                self._site_deltas(account, controller)
+                controller.subscribe_changes(
+                    lambda vin, changes, key=account: self.deltas.setdefault(
+                        key, []
+                    ).append((vin, to_delta(changes)))
+                )
+            else:
+                ready[account] = (None, _error(health.last_error))
+        self.pipe.send((MSG_READY, ready))
+
+        rounds = 0
+        while not self.stopping.is_set():
+            started = time.monotonic()
+            results = await self.fleet.update(**self.update_kwargs)
+            payload = {}
+            for account, result in results.items():
+                controller = self.fleet.controllers[account]
+                payload[account] = {
+                    "online": dict(controller.car_online),
+                    "vehicles": self.deltas.pop(account, []),
+                    "sites": self._site_deltas(account, controller),
+                    "error": _error(result) if isinstance(result, Exception) else None,
+                }
+            rounds += 1
+            elapsed = time.monotonic() - started
+            self.pipe.send((MSG_ROUND, rounds, elapsed, payload))
+            try:
+                await asyncio.wait_for(
+                    self.stopping.wait(), max(0.0, self.interval - elapsed)
+                )
+            except asyncio.TimeoutError:
+                pass
+        await self.fleet.close()
+        self.pipe.close()
+
+
+def _run_worker(pipe: Pipe, accounts: list, options: dict) -> None:
+    """Entry point of a worker process."""
+    asyncio.run(_Worker(pipe, accounts, **options).run())
+
+
+class _RemoteController:
+    """Stand-in for the controller of the cars and sites of a worker account.
+
+    TeslaCar and EnergySite only call api, wake_up and is_car_online on their
+    controller; the calls are sent to the worker hosting the account.
+    """
+
+    def __init__(self, runner: "ShardedRunner", shard: "_Shard", account: Hashable):
+        self.runner = runner
+        self.shard = shard
+        self.account = account
+        self.car_online: Dict[Text, bool] = {}
+        self.vin_map: Dict[Text, Text] = {}
+
+    def is_car_online(self, car_id: Text = None, vin: Text = None) -> bool:
+        """Return online status of a car as of the last round."""
+        vin = vin or self.vin_map.get(str(car_id))
+        return bool(self.car_online.get(vin))
+
+    async def api(self, name: Text, path_vars=None, wake_if_asleep=False, **kwargs):
+        """Perform api request in the worker, see Controller.api."""
+        kwargs.update(path_vars=path_vars, wake_if_asleep=wake_if_asleep)
+        return await self.runner.call(self.shard, self.account, "api", name, **kwargs)
+
+    async def wake_up(self, car_id) -> bool:
+        """Wake a car in the worker, see Controller.wake_up."""
+        return await self.runner.call(self.shard, self.account, "wake_up", car_id)
+
+
+class _Shard:
+    """Worker process of a ShardedRunner and what it last reported."""
+
+    __slots__ = (
+        "accounts",
+        "process",
+        "pipe",
+        "ready",
+        "rounds",
+        "round_seconds",
+        "errors",
+    )
+
+    def __init__(self, accounts: List[Hashable]) -> None:
+        self.accounts = accounts
+        self.process: Optional[multiprocessing.process.BaseProcess] = None
+        self.pipe: Optional[Pipe] = None
+        self.ready: Optional[asyncio.Future] = None
+        self.rounds: int = 0
+        self.round_seconds: Optional[float] = None
+        self.errors: Dict[Hashable, Tuple[Any, Text]] = {}
+
+
+class ShardedRunner:
+    """Runner of large fleets across worker processes.
+
+    Accounts are split across workers, each running a FleetManager for its
+    share in its own process and event loop, so JSON decoding, diffing and
+    property reads of thousands of vehicles use every core. A large account
+    can be split by VIN by adding it several times with filtered_vins.
+
+    Workers send their snapshots once connected and then, after every update
+    round, only the changed fields over a pipe. The runner applies them to
+    local TeslaCar and EnergySite objects in :attr:`cars` and
+    :attr:`energysites`, whose commands are sent back to the worker. Site
+    config and summary are as of the start.
+    """
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        interval: float = UPDATE_INTERVAL,
+        update_kwargs: Optional[dict] = None,
+        rate_limit: Optional[float] = None,
+        rate_limit_burst: Optional[int] = None,
+        start_method: Text = "spawn",
+    ) -> None:
+        """Initialize ShardedRunner.
+
+        Args
+            workers: Worker processes. Defaults to the number of CPUs.
+            interval: Seconds between the update rounds of a worker
+            update_kwargs: Arguments of Controller.update, e.g., {"force": True}
+            rate_limit: Polling requests per second for all accounts together,
+                split evenly across the workers
+            rate_limit_burst: Polling requests allowed in a burst, split as well
+            start_method: multiprocessing start method of the workers
+
+        """
+        self.workers: int = max(1, workers or os.cpu_count() or 1)
+        self.interval: float = interval
+        self.update_kwargs: dict = update_kwargs or {}
+        self.rate_limit: Optional[float] = rate_limit
+        self.rate_limit_burst: Optional[int] = rate_limit_burst
+        self.cars: Dict[Text, TeslaCar] = {}
+        self.energysites: Dict[int, EnergySite] = {}
+        self._context = multiprocessing.get_context(start_method)
+        self._accounts: Dict[Hashable, Tuple[dict, Optional[List[Text]]]] = {}
+        self._controllers: Dict[Hashable, _RemoteController] = {}
+        self._vehicle_data: Dict[Text, dict] = {}
+        self._site_data: Dict[int, dict] = {}
+        self._shards: List[_Shard] = []
+        self._calls: Dict[int, Tuple[_Shard, asyncio.Future]] = {}
+        self._call_ids = itertools.count()
+        self._round_callbacks: List[Callable[[int, dict], None]] = []
+
+    def add_account(
+        self, account: Hashable, filtered_vins: Optional[List[Text]] = None, **kwargs
+    ) -> None:
+        """Add an account before start.
+
+        Args
+            account: Key of the account
+            filtered_vins: Only host these cars of the account
+            **kwargs: Controller arguments; they are sent to a worker and must
+                be picklable, so pass tokens rather than a websession
+
+        """
+        if account in self._accounts:
+            raise ValueError(f"Account {account} already added")
+        self._accounts[account] = (kwargs, filtered_vins)
+
+    def on_round(self, callback: Callable[[int, dict], None]) -> None:
+        """Call callback with the round number and payload of every worker round."""
+        self._round_callbacks.append(callback)
+
+    async def start(self) -> Dict[Hashable, Tuple[Any, Text]]:
+        """Start the workers and wait until they are connected.
+
+        Returns
+            Dict[Hashable, Tuple[Any, Text]]: (code, message) of the accounts
+            that failed to connect
+
+        """
+        loop = asyncio.get_event_loop()
+        shards = assign_shards(list(self._accounts), self.workers)
+        options = {
+            "interval": self.interval,
+            "update_kwargs": self.update_kwargs,
+            "rate_limit": self.rate_limit / len(shards) if self.rate_limit else None,
+            "rate_limit_burst": (
+                max(1, self.rate_limit_burst // len(shards))
+                if self.rate_limit_burst
+                else None
+            ),
+        }
+        for accounts in shards:
+            shard = _Shard(accounts)
+            shard.pipe, child = self._context.Pipe()
+            shard.ready = loop.create_future()
+            shard.process = self._context.Process(
+                target=_run_worker,
+                args=(
+                    child,
+                    [(key, *self._accounts[key]) for key in accounts],
+                    options,
+                ),
+                daemon=True,
+            )
+            shard.process.start()
+            child.close()
+            _start_reader(
+                shard.pipe, lambda message, shard=shard: self._handle(shard, message)
+            )
+            self._shards.append(shard)
+        await asyncio.gather(*(shard.ready for shard in self._shards))
+        errors = {}
+        for shard in self._shards:
+            errors.update(shard.errors)
+        return errors
+
+    def _handle(self, shard: _Shard, message: Optional[tuple]) -> None:
+        """Apply a message of a worker."""
+        if message is None:
+            _LOGGER.debug("Worker of %s exited", shard.accounts)
+            if not shard.ready.done():
+                # Exited before connecting, e.g., killed or failed to import
+                error = _error(TeslaException("WORKER_EXITED"))
+                for account in shard.accounts:
+                    shard.errors[account] = error
+                shard.ready.set_result(None)
+            for call_id, (call_shard, future) in list(self._calls.items()):
+                if call_shard is shard:
+                    del self._calls[call_id]
+                    if not future.done():
+                        future.set_exception(TeslaException("WORKER_EXITED"))
+            return
+        kind = message[0]
+        if kind == MSG_READY:
+            self._restore(shard, message[1])
+            shard.ready.set_result(None)
+        elif kind == MSG_ROUND:
+            _, rounds, elapsed, payload = message
+            shard.rounds = rounds
+            shard.round_seconds = elapsed
+            self._apply_round(shard, payload)
+            for callback in self._round_callbacks:
+                callback(rounds, payload)
+        elif kind == MSG_RESULT:
+            _, call_id, ok, value = message
+            _, future = self._calls.pop(call_id, (None, None))
+            if future is None or future.done():
+                return
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(TeslaException(value[0] or value[1]))
+
+    def _restore(self, shard: _Shard, ready: dict) -> None:
+        """Build the cars and sites of a connected worker from its snapshots."""
+        for account, (snapshot, error) in ready.items():
+            if snapshot is None:
+                shard.errors[account] = error
+                continue
+            controller = _RemoteController(self, shard, account)
+            self._controllers[account] = controller
+            for car in snapshot["vehicle_list"]:
+                vin = car["vin"]
+                saved = snapshot["vehicles"][vin]
+                controller.car_online[vin] = saved["online"]
+                controller.vin_map[str(car["id"])] = vin
+                self._vehicle_data[vin] = saved["data"]
+                self.cars[vin] = TeslaCar(car, controller, self._vehicle_data[vin])
+            saved_sites = {saved["id"]: saved for saved in snapshot["energysites"]}
+            for energysite in snapshot["energysite_list"]:
+                saved = saved_sites[energysite["energy_site_id"]]
+                self._site_data[saved["id"]] = saved["data"]
+                site = create_energysite(
+                    controller.api,
+                    energysite,
+                    saved["config"],
+                    saved["data"],
+                    saved["summary"],
+                )
+                if site is not None:
+                    self.energysites[saved["id"]] = site
+
+    def _apply_round(self, shard: _Shard, payload: dict) -> None:
+        """Apply the deltas of an update round."""
+        for account, update in payload.items():
+            if update["error"]:
+                shard.errors[account] = update["error"]
+            else:
+                shard.errors.pop(account, None)
+            controller = self._controllers.get(account)
+            if controller is None:
+                continue
+            controller.car_online.update(update["online"])
+            for vin, delta in update["vehicles"]:
+                if vin in self.cars:
+                    apply_delta(self._vehicle_data[vin], delta)
+                    self.cars[vin].refresh_state()
+            for energysite_id, delta in update["sites"]:
+                if energysite_id in self._site_data:
+                    apply_delta(self._site_data[energysite_id], delta)
+
+    async def call(
+        self, shard: _Shard, account: Hashable, method: Text, *args, **kwargs
+    ) -> Any:
+        """Call an async Controller method of an account in its worker."""
+        call_id = next(self._call_ids)
+        future = asyncio.get_event_loop().create_future()
+        self._calls[call_id] = (shard, future)
+        shard.pipe.send((MSG_CALL, call_id, account, method, args, kwargs))
+        return await future
+
+    def health(self) -> List[Dict[Text, Any]]:
+        """Return the accounts, liveness, rounds and errors of each worker."""
+        return [
+            {
+                "accounts": shard.accounts,
+                "alive": shard.process.is_alive(),
+                "rounds": shard.rounds,
+                "round_seconds": shard.round_seconds,
+                "errors": dict(shard.errors),
+            }
+            for shard in self._shards
+        ]
+
+    async def stop(self, timeout: float = 10) -> None:
+        """Stop the workers, disconnecting their accounts."""
+        loop = asyncio.get_event_loop()
+        for shard in self._shards:
+            try:
+                shard.pipe.send((MSG_STOP,))
+            except OSError:
+                pass
+        for shard in self._shards:
+            await loop.run_in_executor(None, shard.process.join, timeout)
+            if shard.process.is_alive():
+                shard.process.terminate()
+            shard.pipe.close()
+        self._shards = []
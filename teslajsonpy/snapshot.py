@@ -0,0 +1,64 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+from json import JSONDecodeError
+import logging
+import os
+from typing import Any, Dict, Optional, Text
+
+import orjson
+
+_LOGGER = logging.getLogger(__name__)
+
+# Bumped whenever the layout of Controller.get_snapshot changes
+SNAPSHOT_VERSION = 1
+
+
+def is_compatible(snapshot: Any) -> bool:
+    """Return whether a snapshot can be restored by this version."""
+    return isinstance(snapshot, dict) and snapshot.get("version") == SNAPSHOT_VERSION
+
+
+def save_snapshot(path: Text, snapshot: Dict[Text, Any]) -> None:
+    """Write a controller snapshot to a file.
+
+    The snapshot is written next to path and renamed over it, so a crash
+    while saving leaves the previous snapshot intact. It holds tokens, so the
+    file is only readable by its owner.
+
+    Args
+        path: File to write
+        snapshot: Result of Controller.get_snapshot
+
+    """
+    temp = f"{path}.tmp"
+    descriptor = os.open(temp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(descriptor, "wb") as file:
+        file.write(orjson.dumps(snapshot))  # pylint: disable=no-member
+    os.replace(temp, path)
+
+
+def load_snapshot(path: Text) -> Optional[Dict[Text, Any]]:
+    """Read a controller snapshot written by save_snapshot.
+
+    Returns
+        Optional[Dict[Text, Any]]: The snapshot, or None if the file is
+        missing, unreadable or of another SNAPSHOT_VERSION
+
+    """
+    try:
+        with open(path, "rb") as file:
+            snapshot = orjson.loads(file.read())  # pylint: disable=no-member
+    except FileNotFoundError:
+        return None
+    except (OSError, JSONDecodeError) as ex:
+        _LOGGER.warning("Unable to read snapshot %s: %s", path, ex)
+        return None
+    if not is_compatible(snapshot):
+        _LOGGER.info("Ignoring snapshot %s of another version", path)
+        return None
+    return snapshot
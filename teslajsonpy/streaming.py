@@ -0,0 +1,569 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+from json import JSONDecodeError
+import logging
+import random
+import time
+from typing import Awaitable, Callable, Dict, List, Optional, Set, Text
+
+import aiohttp
+import orjson
+
+from teslajsonpy.const import (
+    STREAMING_BACKOFF_BASE,
+    STREAMING_BACKOFF_MAX,
+    STREAMING_COLUMNS,
+    STREAMING_MAX_RECONNECTS,
+    STREAMING_MAX_SOCKETS,
+    STREAMING_RESUBSCRIBES,
+    STREAMING_VEHICLES_PER_SOCKET,
+    WEBSOCKET_TIMEOUT,
+    WS_URL,
+)
+from teslajsonpy.recording import TrafficRecorder
+
+_LOGGER = logging.getLogger(__name__)
+
+MessageCallback = Callable[[dict], None]
+# Called with force=True to refresh oauth, else only if it is about to expire
+TokenRefresher = Callable[[bool], Awaitable[None]]
+
+AUTH_ERROR = "Can't validate token. "
+
+
+def backoff_delay(attempt: int, base: float, maximum: float) -> float:
+    """Return the jittered exponential delay before a reconnect attempt.
+
+    Args
+        attempt: Number of the attempt, starting at 1
+        base: Delay of the first attempt
+        maximum: Largest delay before jitter
+
+    Returns
+        float: Seconds between half and all of min(maximum, base * 2 ** (attempt - 1))
+
+    """
+    try:
+        delay = min(maximum, base * 2 ** (attempt - 1))
+    except OverflowError:
+        delay = maximum
+    return delay * random.uniform(0.5, 1)
+
+
+def _is_vehicle_disconnected(data: dict) -> bool:
+    return (
+        data.get("error_type") == "vehicle_disconnected"
+        or data.get("value") == "disconnected"
+    )
+
+
+def _is_auth_error(data: dict) -> bool:
+    return data.get("value") == AUTH_ERROR
+
+
+class StreamSubscription:
+    """Routing of the streaming messages of one vehicle."""
+
+    __slots__ = (
+        "vehicle_id",
+        "on_message",
+        "on_disconnect",
+        "socket",
+        "last_message",
+        "last_frame",
+        "failures",
+        "resubscribe",
+    )
+
+    def __init__(
+        self,
+        vehicle_id: Text,
+        on_message: Optional[MessageCallback],
+        on_disconnect: Optional[MessageCallback],
+    ) -> None:
+        """Initialize StreamSubscription."""
+        self.vehicle_id: Text = vehicle_id
+        self.on_message: Optional[MessageCallback] = on_message
+        self.on_disconnect: Optional[MessageCallback] = on_disconnect
+        self.socket: Optional["StreamSocket"] = None
+        self.last_message: float = time.monotonic()
+        self.last_frame: Optional[float] = None
+        # Consecutive disconnects or auth errors without a data:update since
+        self.failures: int = 0
+        self.resubscribe: Optional[asyncio.Task] = None
+
+
+class StreamSocket:
+    """A supervised websocket of the pool and the vehicles subscribed on it."""
+
+    def __init__(self) -> None:
+        """Initialize StreamSocket."""
+        self.websocket: Optional[aiohttp.ClientWebSocketResponse] = None
+        self.vehicle_ids: Set[Text] = set()
+        self.supervisor: Optional[asyncio.Task] = None
+        self.renew: Optional[asyncio.Task] = None
+        self.reconnects: int = 0
+        self.last_error: Optional[BaseException] = None
+
+    @property
+    def connected(self) -> bool:
+        """Return whether the websocket is open."""
+        return self.websocket is not None and not self.websocket.closed
+
+
+class StreamHealth:
+    """Health of the streaming websockets."""
+
+    __slots__ = (
+        "connected",
+        "sockets",
+        "vehicles",
+        "last_frame_age",
+        "reconnects",
+        "last_error",
+    )
+
+    def __init__(
+        self,
+        connected: int,
+        sockets: int,
+        vehicles: int,
+        last_frame_age: Optional[float],
+        reconnects: int,
+        last_error: Optional[BaseException],
+    ) -> None:
+        """Initialize StreamHealth.
+
+        Args
+            connected: Sockets currently open
+            sockets: Sockets in the pool, open or reconnecting
+            vehicles: Subscribed vehicles
+            last_frame_age: Seconds since the newest data:update, None if none yet
+            reconnects: Successful reconnects since the manager was created
+            last_error: Last connection error
+
+        """
+        self.connected = connected
+        self.sockets = sockets
+        self.vehicles = vehicles
+        self.last_frame_age = last_frame_age
+        self.reconnects = reconnects
+        self.last_error = last_error
+
+    @property
+    def healthy(self) -> bool:
+        """Return whether every socket in the pool is open."""
+        return self.connected == self.sockets
+
+    def as_dict(self) -> dict:
+        """Return the health as a dict."""
+        return {
+            "connected": self.connected,
+            "sockets": self.sockets,
+            "vehicles": self.vehicles,
+            "last_frame_age": self.last_frame_age,
+            "reconnects": self.reconnects,
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }
+
+
+class StreamingManager:
+    """Pool of supervised streaming websockets multiplexing many vehicles.
+
+    Each vehicle is subscribed by ``vehicle_id`` on the fullest socket with
+    room for it; a new socket is opened only when every socket holds
+    ``vehicles_per_socket`` vehicles. Messages are routed to the callbacks of
+    the vehicle in their ``tag``.
+
+    A supervisor task per socket reconnects with jittered backoff when the
+    socket closes and resubscribes its vehicles. Vehicles reported
+    disconnected are resubscribed after refreshing oauth if it is about to
+    expire, and auth errors force a refresh. A subscription ends, calling
+    on_disconnect, after ``resubscribe_attempts`` failed resubscribes, after
+    ``max_reconnects`` failed connection attempts in a row, or when the
+    vehicle sends nothing for WEBSOCKET_TIMEOUT seconds, e.g., once parked.
+    """
+
+    def __init__(
+        self,
+        get_token: Callable[[], Text],
+        url: Text = WS_URL,
+        vehicles_per_socket: int = STREAMING_VEHICLES_PER_SOCKET,
+        max_sockets: int = STREAMING_MAX_SOCKETS,
+        session: Optional[aiohttp.ClientSession] = None,
+        refresh_token: Optional[TokenRefresher] = None,
+        max_reconnects: Optional[int] = STREAMING_MAX_RECONNECTS,
+        resubscribe_attempts: int = STREAMING_RESUBSCRIBES,
+        backoff_base: float = STREAMING_BACKOFF_BASE,
+        backoff_max: float = STREAMING_BACKOFF_MAX,
+    ) -> None:
+        """Initialize StreamingManager.
+
+        Args
+            get_token: Returns the current access token for subscriptions
+            url: Streaming websocket url
+            vehicles_per_socket: Vehicles subscribed on a socket before opening another
+            max_sockets: Open sockets at most; further vehicles share the least loaded
+            session: aiohttp session for the websockets. Created and owned if None.
+            refresh_token: Refreshes oauth before resubscribing
+            max_reconnects: Failed connects in a row before giving up, None for no limit
+            resubscribe_attempts: Resubscribes of a vehicle without data before ending
+            backoff_base: Seconds before the first reconnect or resubscribe
+            backoff_max: Largest seconds between reconnects or resubscribes
+
+        """
+        self.get_token = get_token
+        self.url: Text = url
+        self.vehicles_per_socket: int = max(1, vehicles_per_socket)
+        self.max_sockets: int = max(1, max_sockets)
+        self.refresh_token: Optional[TokenRefresher] = refresh_token
+        self.max_reconnects: Optional[int] = max_reconnects
+        self.resubscribe_attempts: int = resubscribe_attempts
+        self.backoff_base: float = backoff_base
+        self.backoff_max: float = backoff_max
+        self.columns: Text = ",".join(STREAMING_COLUMNS)
+        self.subscriptions: Dict[Text, StreamSubscription] = {}
+        self.sockets: List[StreamSocket] = []
+        self.reconnects: int = 0
+        self.last_error: Optional[BaseException] = None
+        # Receives every decoded message when set
+        self.recorder: Optional[TrafficRecorder] = None
+        self._session: Optional[aiohttp.ClientSession] = session
+        self._owns_session: bool = session is None
+
+    def is_subscribed(self, vehicle_id: Text) -> bool:
+        """Return whether vehicle_id is subscribed or subscribing."""
+        return str(vehicle_id) in self.subscriptions
+
+    def health(self) -> StreamHealth:
+        """Return the health of the streaming websockets."""
+        frames = [
+            subscription.last_frame
+            for subscription in self.subscriptions.values()
+            if subscription.last_frame is not None
+        ]
+        return StreamHealth(
+            connected=sum(1 for socket in self.sockets if socket.connected),
+            sockets=len(self.sockets),
+            vehicles=len(self.subscriptions),
+            last_frame_age=time.monotonic() - max(frames) if frames else None,
+            reconnects=self.reconnects,
+            last_error=self.last_error,
+        )
+
+    def last_frame_age(self, vehicle_id: Text) -> Optional[float]:
+        """Return seconds since the last data:update of a vehicle, None if none."""
+        subscription = self.subscriptions.get(str(vehicle_id))
+        if subscription is None or subscription.last_frame is None:
+            return None
+        return time.monotonic() - subscription.last_frame
+
+    async def subscribe(
+        self,
+        vehicle_id: Text,
+        on_message: Optional[MessageCallback] = None,
+        on_disconnect: Optional[MessageCallback] = None,
+    ) -> None:
+        """Subscribe a vehicle to streaming.
+
+        The subscription is sent once its socket is connected. Subscribing an
+        already subscribed vehicle only replaces its callbacks.
+
+        Args
+            vehicle_id: vehicle_id from Tesla api
+            on_message: Called with every decoded message tagged with vehicle_id
+            on_disconnect: Called with the message ending the subscription
+
+        """
+        vehicle_id = str(vehicle_id)
+        subscription = self.subscriptions.get(vehicle_id)
+        if subscription is not None:
+            subscription.on_message = on_message
+            subscription.on_disconnect = on_disconnect
+            return
+        subscription = StreamSubscription(vehicle_id, on_message, on_disconnect)
+        self.subscriptions[vehicle_id] = subscription
+        socket = self._socket_for_subscription()
+        subscription.socket = socket
+        socket.vehicle_ids.add(vehicle_id)
+        if socket.supervisor is None:
+            socket.supervisor = asyncio.create_task(self._supervise(socket))
+        elif socket.connected:
+            await self._send_subscribe(socket, vehicle_id)
+
+    async def unsubscribe(self, vehicle_id: Text) -> None:
+        """Stop streaming a vehicle without calling on_disconnect."""
+        subscription = self.subscriptions.pop(str(vehicle_id), None)
+        if subscription is None:
+            return
+        self._cancel_resubscribe(subscription)
+        socket = subscription.socket
+        if socket is None:
+            return
+        socket.vehicle_ids.discard(subscription.vehicle_id)
+        if socket.connected:
+            await socket.websocket.send_json(
+                {"msg_type": "data:unsubscribe", "tag": subscription.vehicle_id}
+            )
+        if not socket.vehicle_ids:
+            await self._close_socket(socket)
+
+    async def close(self) -> None:
+        """Close all websockets and the owned session."""
+        for subscription in self.subscriptions.values():
+            self._cancel_resubscribe(subscription)
+        self.subscriptions = {}
+        for socket in list(self.sockets):
+            socket.vehicle_ids.clear()
+            await self._close_socket(socket)
+        if self._owns_session and self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _socket_for_subscription(self) -> StreamSocket:
+        """Return the socket a new vehicle should be subscribed on."""
+        with_room = [
+            socket
+            for socket in self.sockets
+            if len(socket.vehicle_ids) < self.vehicles_per_socket
+        ]
+        if with_room:
+            return max(with_room, key=lambda socket: len(socket.vehicle_ids))
+        if len(self.sockets) >= self.max_sockets:
+            return min(self.sockets, key=lambda socket: len(socket.vehicle_ids))
+        socket = StreamSocket()
+        self.sockets.append(socket)
+        return socket
+
+    async def _close_socket(self, socket: StreamSocket) -> None:
+        """Remove a socket from the pool, stop its tasks and close it."""
+        if socket in self.sockets:
+            self.sockets.remove(socket)
+        current = asyncio.current_task()
+        for task in (socket.supervisor, socket.renew):
+            if task is not None and task is not current:
+                task.cancel()
+        if socket.websocket is not None:
+            await socket.websocket.close()
+
+    async def _connect(self, socket: StreamSocket) -> None:
+        """Open the websocket of a socket and subscribe its vehicles."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession()
+            self._owns_session = True
+        _LOGGER.debug("Connecting to websocket %s", self.url)
+        socket.websocket = await self._session.ws_connect(self.url)
+        for vehicle_id in list(socket.vehicle_ids):
+            await self._send_subscribe(socket, vehicle_id)
+
+    async def _supervise(self, socket: StreamSocket) -> None:
+        """Keep a socket connected while it has vehicles."""
+        attempt = 0
+        try:
+            while socket.vehicle_ids:
+                if attempt:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                    _LOGGER.debug(
+                        "Reconnecting to websocket in %.1f s, attempt %s",
+                        delay,
+                        attempt,
+                    )
+                    await asyncio.sleep(delay)
+                    if not socket.vehicle_ids:
+                        break
+                try:
+                    await self._connect(socket)
+                except (aiohttp.ClientError, asyncio.TimeoutError) as ex:
+                    _LOGGER.debug("Unable to connect to %s: %s", self.url, ex)
+                    socket.last_error = self.last_error = ex
+                    attempt += 1
+                    if self._gave_up(attempt):
+                        break
+                    continue
+                if attempt:
+                    socket.reconnects += 1
+                    self.reconnects += 1
+                socket.renew = asyncio.create_task(self._renew(socket))
+                received = await self._read(socket)
+                socket.renew.cancel()
+                # A connection that delivered data starts the backoff over
+                attempt = 1 if received else attempt + 1
+                if self._gave_up(attempt):
+                    break
+        finally:
+            if socket in self.sockets:
+                self.sockets.remove(socket)
+            if socket.renew is not None:
+                socket.renew.cancel()
+            for vehicle_id in list(socket.vehicle_ids):
+                subscription = self.subscriptions.get(vehicle_id)
+                if subscription is not None and subscription.socket is socket:
+                    self._end(subscription, "disconnected")
+            socket.vehicle_ids.clear()
+            if socket.websocket is not None and not socket.websocket.closed:
+                await socket.websocket.close()
+
+    def _gave_up(self, attempt: int) -> bool:
+        """Return whether a connection attempt is past max_reconnects."""
+        return self.max_reconnects is not None and attempt > self.max_reconnects
+
+    async def _send_subscribe(self, socket: StreamSocket, vehicle_id: Text) -> None:
+        _LOGGER.debug("Subscribing %s to websocket", vehicle_id)
+        await socket.websocket.send_json(
+            {
+                "msg_type": "data:subscribe_oauth",
+                "token": self.get_token(),
+                "value": self.columns,
+                "tag": vehicle_id,
+                "created:timestamp": round(time.time() * 1000),
+            }
+        )
+
+    async def _renew(self, socket: StreamSocket) -> None:
+        """Renew active subscriptions of a socket and end idle ones."""
+        while socket.connected:
+            await asyncio.sleep(WEBSOCKET_TIMEOUT - 1)
+            now = time.monotonic()
+            for vehicle_id in list(socket.vehicle_ids):
+                subscription = self.subscriptions.get(vehicle_id)
+                if subscription is None:
+                    socket.vehicle_ids.discard(vehicle_id)
+                elif subscription.resubscribe is not None:
+                    continue
+                elif now > subscription.last_message + WEBSOCKET_TIMEOUT:
+                    _LOGGER.debug("Websocket for %s timed out", vehicle_id)
+                    self._end(subscription, "timeout")
+                elif socket.connected:
+                    await self._send_subscribe(socket, vehicle_id)
+            if not socket.vehicle_ids:
+                await self._close_socket(socket)
+
+    async def _read(self, socket: StreamSocket) -> bool:
+        """Route the messages of a socket until it closes.
+
+        Returns
+            bool: Whether any data:update was received
+
+        """
+        received = False
+        async for msg in socket.websocket:
+            if msg.type in (aiohttp.WSMsgType.BINARY, aiohttp.WSMsgType.TEXT):
+                try:
+                    data = orjson.loads(msg.data)  # pylint: disable=no-member
+                except JSONDecodeError:
+                    _LOGGER.debug("Received bad websocket message: %s", msg.data)
+                    continue
+                if data.get("msg_type") == "data:update":
+                    received = True
+                if self.recorder is not None:
+                    self.recorder.record_message(data)
+                self._route(data)
+            elif msg.type == aiohttp.WSMsgType.ERROR:
+                socket.last_error = self.last_error = socket.websocket.exception()
+                _LOGGER.debug("WSMsgType error: %s", socket.last_error)
+                break
+        return received
+
+    def _route(self, data: dict) -> None:
+        """Call the callbacks of the vehicle a message is tagged with."""
+        msg_type = data.get("msg_type")
+        if msg_type == "control:hello":
+            _LOGGER.debug("Succesfully connected to websocket %s", self.url)
+            return
+        subscription = self.subscriptions.get(str(data.get("tag")))
+        if subscription is None:
+            _LOGGER.debug("Websocket message for unsubscribed vehicle: %s", data)
+            return
+        subscription.last_message = time.monotonic()
+        if msg_type == "data:update":
+            subscription.last_frame = subscription.last_message
+            subscription.failures = 0
+        elif msg_type == "data:error":
+            if _is_auth_error(data):
+                _LOGGER.debug(
+                    "Can't validate token for websocket of %s", subscription.vehicle_id
+                )
+                self._schedule_resubscribe(subscription, data, force_refresh=True)
+                return
+            if _is_vehicle_disconnected(data):
+                _LOGGER.debug(
+                    "Websocket reported %s disconnected", subscription.vehicle_id
+                )
+                self._schedule_resubscribe(subscription, data, force_refresh=False)
+                return
+        if subscription.on_message:
+            subscription.on_message(data)
+
+    def _schedule_resubscribe(
+        self, subscription: StreamSubscription, data: dict, force_refresh: bool
+    ) -> None:
+        """Resubscribe a vehicle after a backoff or end it after too many tries."""
+        if subscription.resubscribe is not None:
+            return
+        subscription.failures += 1
+        if subscription.failures > self.resubscribe_attempts:
+            self._end(subscription, data.get("value", "disconnected"), data)
+            return
+        subscription.resubscribe = asyncio.create_task(
+            self._resubscribe(subscription, force_refresh)
+        )
+
+    async def _resubscribe(
+        self, subscription: StreamSubscription, force_refresh: bool
+    ) -> None:
+        try:
+            await asyncio.sleep(
+                backoff_delay(
+                    subscription.failures, self.backoff_base, self.backoff_max
+                )
+            )
+            if self.refresh_token is not None:
+                try:
+                    await self.refresh_token(force_refresh)
+                except Exception as ex:  # pylint: disable=broad-except
+                    _LOGGER.debug("Unable to refresh token for websocket: %s", ex)
+                    self.last_error = ex
+            socket = subscription.socket
+            if (
+                self.subscriptions.get(subscription.vehicle_id) is subscription
+                and socket is not None
+                and socket.connected
+            ):
+                subscription.last_message = time.monotonic()
+                await self._send_subscribe(socket, subscription.vehicle_id)
+        finally:
+            subscription.resubscribe = None
+
+    @staticmethod
+    def _cancel_resubscribe(subscription: StreamSubscription) -> None:
+        if subscription.resubscribe is not None:
+            subscription.resubscribe.cancel()
+            subscription.resubscribe = None
+
+    def _end(
+        self,
+        subscription: StreamSubscription,
+        reason: Text,
+        data: Optional[dict] = None,
+    ) -> None:
+        """Drop a subscription and call its on_disconnect."""
+        if self.subscriptions.get(subscription.vehicle_id) is subscription:
+            del self.subscriptions[subscription.vehicle_id]
+        self._cancel_resubscribe(subscription)
+        if subscription.socket is not None:
+            subscription.socket.vehicle_ids.discard(subscription.vehicle_id)
+        if subscription.on_disconnect:
+            subscription.on_disconnect(
+                data
+                or {
+                    "msg_type": "data:error",
+                    "tag": subscription.vehicle_id,
+                    "value": reason,
+                }
+            )
@@ -0,0 +1,228 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+from collections import deque
+import logging
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Text,
+    Tuple,
+)
+
+from teslajsonpy.const import TELEMETRY_BACKLOG_SIZE, TELEMETRY_QUEUE_SIZE
+from teslajsonpy.frames import FrameDecoder, Row
+
+_LOGGER = logging.getLogger(__name__)
+
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # discard the oldest queued frame
+OVERFLOW_CONFLATE = "conflate"  # replace the newest queued frame
+OVERFLOW_BLOCK = "block"  # hold frames in a bounded backlog, dropping the newest
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE, OVERFLOW_BLOCK)
+
+
+class TelemetryStream:
+    """Async iterator over the streaming frames of a vehicle.
+
+    Frames are decoded rows put on a bounded queue by :meth:`put`, which never
+    waits, so a slow consumer only affects its own stream. OVERFLOW_BLOCK keeps
+    frames in order by holding them in a backlog of at most max_backlog frames;
+    frames arriving once it is full are dropped. Rows are turned into
+    dicts of the subscribed fields when they are consumed.
+
+    Use as ``async with controller.stream(vin) as frames: async for frame in
+    frames`` or close it explicitly when done.
+    """
+
+    def __init__(
+        self,
+        vin: Text,
+        decoder: FrameDecoder,
+        fields: Optional[Iterable[Text]] = None,
+        maxsize: int = TELEMETRY_QUEUE_SIZE,
+        overflow: Text = OVERFLOW_DROP_OLDEST,
+        max_backlog: int = TELEMETRY_BACKLOG_SIZE,
+        on_start: Optional[Callable[[], Awaitable[None]]] = None,
+        on_close: Optional[Callable[["TelemetryStream"], None]] = None,
+    ) -> None:
+        """Initialize TelemetryStream.
+
+        Args
+            vin: vin of the vehicle
+            decoder: Decoder of the rows put on the stream
+            fields: Streaming columns to include, e.g., speed. None for all.
+            maxsize: Frames queued before the overflow policy applies
+            overflow: OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE or OVERFLOW_BLOCK
+            max_backlog: Frames held past maxsize by OVERFLOW_BLOCK
+            on_start: Awaited on the first iteration, e.g., to subscribe streaming
+            on_close: Called once the stream is closed
+
+        Raises
+            ValueError: Unknown field or overflow policy
+
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        columns = decoder.columns if fields is None else ("timestamp", *fields)
+        unknown = [field for field in columns if field not in decoder.index]
+        if unknown:
+            raise ValueError(f"Unknown streaming fields: {', '.join(unknown)}")
+        self.vin: Text = vin
+        self.fields: Tuple[Text, ...] = tuple(dict.fromkeys(columns))
+        self.maxsize: int = max(1, maxsize)
+        self.overflow: Text = overflow
+        self.max_backlog: int = max(0, max_backlog)
+        self.dropped: int = 0
+        self.closed: bool = False
+        self._indexes: Tuple[int, ...] = tuple(decoder.index[f] for f in self.fields)
+        self._queue: Deque[Row] = deque()
+        self._backlog: Deque[Row] = deque()
+        self._waiter: Optional[asyncio.Future] = None
+        self._on_start = on_start
+        self._on_close = on_close
+
+    def __len__(self) -> int:
+        """Return number of frames waiting, including the backlog."""
+        return len(self._queue) + len(self._backlog)
+
+    @property
+    def backlog(self) -> int:
+        """Return frames held past maxsize by OVERFLOW_BLOCK."""
+        return len(self._backlog)
+
+    def put(self, row: Row) -> None:
+        """Queue a decoded row without waiting."""
+        if self.closed:
+            return
+        queue = self._queue
+        if len(queue) >= self.maxsize:
+            if self.overflow == OVERFLOW_DROP_OLDEST:
+                queue.popleft()
+                self.dropped += 1
+            elif self.overflow == OVERFLOW_CONFLATE:
+                queue.pop()
+                self.dropped += 1
+            else:
+                if len(self._backlog) < self.max_backlog:
+                    self._backlog.append(row)
+                else:
+                    self.dropped += 1
+                return
+        queue.append(row)
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def get(self) -> Dict[Text, Any]:
+        """Return the next frame, waiting for one if needed.
+
+        Raises
+            StopAsyncIteration: The stream is closed
+
+        """
+        while not self._queue:
+            if self.closed:
+                raise StopAsyncIteration
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        row = self._queue.popleft()
+        if self._backlog:
+            self._queue.append(self._backlog.popleft())
+        return {field: row[index] for field, index in zip(self.fields, self._indexes)}
+
+    def get_nowait(self) -> List[Dict[Text, Any]]:
+        """Return every queued frame without waiting."""
+        frames = []
+        while self._queue:
+            row = self._queue.popleft()
+            frames.append(
+                {field: row[index] for field, index in zip(self.fields, self._indexes)}
+            )
+            if self._backlog:
+                self._queue.append(self._backlog.popleft())
+        return frames
+
+    def __aiter__(self) -> "TelemetryStream":
+        """Return the stream as its iterator."""
+        return self
+
+    async def __anext__(self) -> Dict[Text, Any]:
+        """Return the next frame."""
+        if self._on_start is not None:
+            on_start, self._on_start = self._on_start, None
+            await on_start()
+        return await self.get()
+
+    async def __aenter__(self) -> "TelemetryStream":
+        """Start the stream."""
+        if self._on_start is not None:
+            on_start, self._on_start = self._on_start, None
+            await on_start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        """Close the stream."""
+        self.close()
+
+    def close(self) -> None:
+        """Stop the stream; a waiting consumer sees the end of iteration."""
+        if self.closed:
+            return
+        self.closed = True
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+        if self._on_close is not None:
+            self._on_close(self)
+
+
+class TelemetryHub:
+    """Telemetry streams of every vehicle fed from decoded frames."""
+
+    def __init__(self) -> None:
+        """Initialize TelemetryHub."""
+        self._streams: Dict[Text, List[TelemetryStream]] = {}
+
+    def __bool__(self) -> bool:
+        """Return whether there are streams."""
+        return bool(self._streams)
+
+    def __contains__(self, vin: object) -> bool:
+        """Return whether vin has streams."""
+        return vin in self._streams
+
+    def add(self, stream: TelemetryStream) -> None:
+        """Add a stream."""
+        self._streams.setdefault(stream.vin, []).append(stream)
+
+    def remove(self, stream: TelemetryStream) -> None:
+        """Remove a stream."""
+        streams = self._streams.get(stream.vin, [])
+        if stream in streams:
+            streams.remove(stream)
+        if not streams:
+            self._streams.pop(stream.vin, None)
+
+    def publish(self, vin: Text, row: Row) -> None:
+        """Queue a decoded row on every stream of vin."""
+        for stream in self._streams.get(vin, ()):
+            stream.put(row)
+
+    def close(self) -> None:
+        """Close every stream."""
+        for streams in list(self._streams.values()):
+            for stream in list(streams):
+                stream.close()
@@ -0,0 +1,269 @@
+#  SPDX-License-Identifier: Apache-2.0
+"""
+Python Package for controlling Tesla API.
+
+For more details about this api, please refer to the documentation at
+https://github.com/zabuldon/teslajsonpy
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Dict, Optional, Text
+
+from teslajsonpy.const import (
+    WAKE_CHECK_BACKOFF,
+    WAKE_CHECK_INTERVAL,
+    WAKE_CHECK_MAX_INTERVAL,
+    WAKE_TIMEOUT,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class WakeStats:
+    """Wake statistics of a car."""
+
+    __slots__ = (
+        "vin",
+        "in_progress",
+        "wakes",
+        "failures",
+        "shared",
+        "probes",
+        "last_seconds",
+        "mean_seconds",
+        "max_seconds",
+    )
+
+    def __init__(
+        self,
+        vin: Text,
+        in_progress: bool,
+        wakes: int,
+        failures: int,
+        shared: int,
+        probes: int,
+        last_seconds: Optional[float],
+        mean_seconds: Optional[float],
+        max_seconds: Optional[float],
+    ) -> None:
+        """Initialize WakeStats.
+
+        Args
+            vin: VIN of the car
+            in_progress: Whether the car is being woken
+            wakes: Wakes that brought the car online
+            failures: Wakes that timed out or raised
+            shared: Callers that joined a wake already in progress
+            probes: Vehicle summary requests checking whether the car woke
+            last_seconds: Duration of the last successful wake, None if none yet
+            mean_seconds: Mean duration of the successful wakes
+            max_seconds: Longest successful wake
+
+        """
+        self.vin = vin
+        self.in_progress = in_progress
+        self.wakes = wakes
+        self.failures = failures
+        self.shared = shared
+        self.probes = probes
+        self.last_seconds = last_seconds
+        self.mean_seconds = mean_seconds
+        self.max_seconds = max_seconds
+
+    def as_dict(self) -> dict:
+        """Return the statistics as a dict."""
+        return {
+            "vin": self.vin,
+            "in_progress": self.in_progress,
+            "wakes": self.wakes,
+            "failures": self.failures,
+            "shared": self.shared,
+            "probes": self.probes,
+            "last_seconds": self.last_seconds,
+            "mean_seconds": self.mean_seconds,
+            "max_seconds": self.max_seconds,
+        }
+
+
+class _WakeState:
+    """Wake in progress and history of a car."""
+
+    __slots__ = (
+        "task",
+        "online",
+        "wakes",
+        "failures",
+        "shared",
+        "probes",
+        "last_seconds",
+        "total_seconds",
+        "max_seconds",
+    )
+
+    def __init__(self) -> None:
+        self.task: Optional[asyncio.Task] = None
+        self.online: Optional[asyncio.Event] = None
+        self.wakes: int = 0
+        self.failures: int = 0
+        self.shared: int = 0
+        self.probes: int = 0
+        self.last_seconds: Optional[float] = None
+        self.total_seconds: float = 0.0
+        self.max_seconds: Optional[float] = None
+
+    @property
+    def mean_seconds(self) -> Optional[float]:
+        """Return the mean duration of the successful wakes."""
+        return self.total_seconds / self.wakes if self.wakes else None
+
+
+class WakeCoordinator:
+    """Wakes of the cars of a controller, shared by their callers.
+
+    A wake sends one WAKE_UP and then waits for the car to be reported online
+    by :meth:`signal`, which Controller.set_car_online calls for product list
+    refreshes, streaming frames and WAKE_UP responses. Only while nothing
+    reports does it probe the vehicle summary, first after WAKE_CHECK_INTERVAL
+    or half the usual wake time of the car, then backing off. Callers waking a
+    car that is already being woken wait for the same wake.
+    """
+
+    def __init__(
+        self,
+        timeout: float = WAKE_TIMEOUT,
+        interval: float = WAKE_CHECK_INTERVAL,
+        max_interval: float = WAKE_CHECK_MAX_INTERVAL,
+        backoff: float = WAKE_CHECK_BACKOFF,
+    ) -> None:
+        """Initialize WakeCoordinator.
+
+        Args
+            timeout: Max seconds to wait for a car to wake
+            interval: Seconds before the first probe
+            max_interval: Largest seconds between probes
+            backoff: Growth of the wait after each probe
+
+        """
+        self.timeout = timeout
+        self.interval = interval
+        self.max_interval = max_interval
+        self.backoff = backoff
+        self._states: Dict[Text, _WakeState] = {}
+
+    def signal(self, vin: Text) -> None:
+        """Wake the waiters of a car reported online."""
+        state = self._states.get(vin)
+        if state is not None and state.online is not None:
+            state.online.set()
+
+    async def wake(
+        self,
+        vin: Text,
+        send: Callable[[], Awaitable[None]],
+        probe: Callable[[], Awaitable[None]],
+        is_online: Callable[[], bool],
+    ) -> bool:
+        """Wake a car, or wait for the wake already in progress.
+
+        Args
+            vin: VIN of the car
+            send: Send WAKE_UP, setting the online status from its response
+            probe: Fetch the online status, e.g., from the vehicle summary
+            is_online: Return the online status
+
+        Returns
+            bool: Whether the car is online
+
+        """
+        state = self._states.setdefault(vin, _WakeState())
+        if state.task is None:
+            state.task = asyncio.ensure_future(
+                self._wake(vin, state, send, probe, is_online)
+            )
+            state.task.add_done_callback(lambda task: self._wake_done(state, task))
+        else:
+            state.shared += 1
+        # A cancelled caller leaves the wake running for the others
+        return await asyncio.shield(state.task)
+
+    @staticmethod
+    def _wake_done(state: _WakeState, task: asyncio.Task) -> None:
+        state.task = None
+        if not task.cancelled():
+            # Retrieved even if every caller was cancelled
+            task.exception()
+
+    def _first_interval(self, state: _WakeState) -> float:
+        """Return the seconds before the first probe of a wake."""
+        if state.wakes:
+            return min(max(self.interval, state.mean_seconds / 2), self.max_interval)
+        return self.interval
+
+    async def _wake(
+        self,
+        vin: Text,
+        state: _WakeState,
+        send: Callable[[], Awaitable[None]],
+        probe: Callable[[], Awaitable[None]],
+        is_online: Callable[[], bool],
+    ) -> bool:
+        start = time.monotonic()
+        deadline = start + self.timeout
+        state.online = asyncio.Event()
+        _LOGGER.debug(
+            "%s: Sending wake request with timeout of %s seconds",
+            vin[-5:],
+            self.timeout,
+        )
+        try:
+            await send()
+            interval = self._first_interval(state)
+            while True:
+                state.online.clear()
+                remaining = deadline - time.monotonic()
+                if is_online() or remaining <= 0:
+                    break
+                try:
+                    await asyncio.wait_for(
+                        state.online.wait(), min(interval, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    state.probes += 1
+                    await probe()
+                    interval = min(interval * self.backoff, self.max_interval)
+        except BaseException:
+            state.failures += 1
+            raise
+        finally:
+            state.online = None
+        elapsed = time.monotonic() - start
+        online = is_online()
+        _LOGGER.debug(
+            "%s: Wakeup took %.1f seconds, online: %s", vin[-5:], elapsed, online
+        )
+        if not online:
+            state.failures += 1
+            return False
+        state.wakes += 1
+        state.last_seconds = elapsed
+        state.total_seconds += elapsed
+        state.max_seconds = max(state.max_seconds or 0.0, elapsed)
+        return True
+
+    def stats(self) -> Dict[Text, WakeStats]:
+        """Return the wake statistics of every car woken so far."""
+        return {
+            vin: WakeStats(
+                vin,
+                state.task is not None,
+                state.wakes,
+                state.failures,
+                state.shared,
+                state.probes,
+                state.last_seconds,
+                state.mean_seconds,
+                state.max_seconds,
+            )
+            for vin, state in self._states.items()
+        }
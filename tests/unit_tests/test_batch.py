@@ -0,0 +1,87 @@
+"""Test batched car commands."""
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.exceptions import TeslaException
+
+from tests.tesla_mock import TeslaMock, VIN
+
+
+async def _sleeping_car(monkeypatch, fail=None):
+    """Return a sleeping car and the requests and wake ups it makes."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    _controller.set_car_online(vin=VIN, online_status=False)
+    sent = []
+    wakes = []
+
+    async def _api(self, name, path_vars=None, wake_if_asleep=False, **kwargs):
+        # pylint: disable=unused-argument
+        if wake_if_asleep and not self.is_car_online(vin=VIN):
+            raise AssertionError(f"{name} sent to a sleeping car")
+        sent.append(name)
+        if name == fail:
+            raise TeslaException(429)
+        return {"response": {"result": True, "reason": ""}}
+
+    async def _wake_up(self, car_id):
+        wakes.append(car_id)
+        self.set_car_online(vin=VIN, online_status=True)
+        return True
+
+    monkeypatch.setattr(Controller, "api", _api)
+    monkeypatch.setattr(Controller, "wake_up", _wake_up)
+    return _controller.cars[VIN], sent, wakes
+
+
+@pytest.mark.asyncio
+async def test_batch_wakes_once(monkeypatch):
+    """Test a batch wakes the car once and sends its commands in order."""
+    _car, sent, wakes = await _sleeping_car(monkeypatch)
+    async with _car.batch() as batch:
+        batch.set_hvac_mode("on")
+        batch.set_temperature(21.0)
+        sentry = batch.set_sentry_mode(True)
+        assert not sent
+
+    assert len(wakes) == 1
+    assert sent == [
+        "CLIMATE_ON",
+        "CHANGE_CLIMATE_TEMPERATURE_SETTING",
+        "SET_SENTRY_MODE",
+    ]
+    assert [name for name, _ in batch.results] == sent
+    assert sentry.done() and sentry.result() is None
+    assert _car.is_climate_on
+    assert _car.driver_temp_setting == 21.0
+    assert _car.sentry_mode
+
+    with pytest.raises(AttributeError):
+        batch.vin  # pylint: disable=pointless-statement
+    with pytest.raises(RuntimeError):
+        _car.batch().honk_horn()
+
+
+@pytest.mark.asyncio
+async def test_batch_fails_fast(monkeypatch):
+    """Test a non-retryable error fails the rest of the batch unsent."""
+    _car, sent, _ = await _sleeping_car(monkeypatch, fail="CLIMATE_ON")
+    async with _car.batch() as batch:
+        first = batch.lock()
+        second = batch.set_hvac_mode("on")
+        third = batch.honk_horn()
+
+    assert sent == ["LOCK", "CLIMATE_ON"]
+    assert first.result() is None
+    assert _car.is_locked
+    assert second.exception().code == 429
+    assert third.exception().code == 429
+    assert [name for name, _ in batch.results] == [
+        "LOCK",
+        "CLIMATE_ON",
+        "HONK_HORN",
+    ]
+    assert isinstance(batch.results[2][1], TeslaException)
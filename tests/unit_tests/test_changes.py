@@ -0,0 +1,117 @@
+"""Test change sets."""
+
+import copy
+
+import pytest
+
+from teslajsonpy.changes import ChangeDispatcher, diff_update
+from teslajsonpy.controller import Controller
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+
+def test_diff_update():
+    """Test leaf changes follow dict.update semantics."""
+    current = {
+        "charge_state": {"battery_level": 50, "charging_state": "Stopped"},
+        "drive_state": {"speed": None},
+        "state": "online",
+    }
+    update = {
+        "charge_state": {"battery_level": 51},
+        "drive_state": {"speed": None},
+        "climate_state": {"inside_temp": 20.5},
+    }
+
+    assert diff_update(current, update) == {
+        "charge_state.battery_level": (50, 51),
+        "charge_state.charging_state": ("Stopped", None),
+        "climate_state.inside_temp": (None, 20.5),
+    }
+    assert diff_update(current, {"state": "asleep"}, prefix="car.") == {
+        "car.state": ("online", "asleep")
+    }
+    assert not diff_update(current, copy.deepcopy(current))
+
+
+def test_dispatch_paths():
+    """Test subscribers only receive changes to their paths."""
+    dispatcher = ChangeDispatcher()
+    assert not dispatcher
+    leaf, section, everything, other_vin = [], [], [], []
+    dispatcher.subscribe(
+        lambda vin, changes: leaf.append(changes), ["charge_state.battery_level"]
+    )
+    unsubscribe = dispatcher.subscribe(
+        lambda vin, changes: section.append(changes), ["charge_state", "drive_state"]
+    )
+    dispatcher.subscribe(lambda vin, changes: everything.append(changes))
+    dispatcher.subscribe(
+        lambda vin, changes: other_vin.append(changes), ["charge_state"], vin="OTHER"
+    )
+    assert dispatcher
+
+    dispatcher.dispatch(
+        "VIN",
+        {
+            "charge_state.battery_level": (50, 51),
+            "charge_state.charge_limit_soc": (80, 90),
+            "climate_state.inside_temp": (20, 21),
+        },
+    )
+    dispatcher.dispatch("VIN", {"climate_state.inside_temp": (21, 22)})
+
+    assert leaf == [{"charge_state.battery_level": (50, 51)}]
+    assert section == [
+        {
+            "charge_state.battery_level": (50, 51),
+            "charge_state.charge_limit_soc": (80, 90),
+        }
+    ]
+    assert len(everything) == 2
+    assert not other_vin
+
+    unsubscribe()
+    dispatcher.dispatch("VIN", {"drive_state.speed": (1, 2)})
+    assert len(section) == 1
+
+
+@pytest.mark.asyncio
+async def test_controller_changes(monkeypatch):
+    """Test polls and websocket frames report changed fields."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    calls = []
+    _controller.subscribe_changes(
+        lambda vin, changes: calls.append((vin, changes)),
+        ["charge_state.battery_level", "drive_state.speed"],
+    )
+
+    data = copy.deepcopy(VEHICLE_DATA)
+
+    async def _get_vehicle_data(self, vin, wake_if_asleep=False):
+        # pylint: disable=unused-argument
+        return copy.deepcopy(data)
+
+    monkeypatch.setattr(Controller, "get_vehicle_data", _get_vehicle_data)
+
+    await _controller._get_and_process_car_data(vin)
+    assert not calls
+
+    data["charge_state"]["battery_level"] += 1
+    data["charge_state"]["charge_limit_soc"] += 1
+    await _controller._get_and_process_car_data(vin)
+    level = data["charge_state"]["battery_level"]
+    assert calls == [(vin, {"charge_state.battery_level": (level - 1, level)})]
+
+    _controller._process_websocket_message(
+        {
+            "msg_type": "data:update",
+            "tag": _controller.vin_to_vehicle_id(vin),
+            "value": "1650000000000,D,42,30,37.1,-122.1,90,37.2,-122.2,37.3,-122.3,91.5,wgs,1",
+        }
+    )
+    assert calls[-1][1] == {"drive_state.speed": (data["drive_state"]["speed"], 42)}
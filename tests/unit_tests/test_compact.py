@@ -0,0 +1,79 @@
+"""Test compact vehicle data."""
+
+import copy
+
+import pytest
+
+from teslajsonpy.compact import compact_vehicle_data, expand_vehicle_data
+from teslajsonpy.controller import Controller
+from teslajsonpy.schema import VEHICLE_FIELDS
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+GET_VEHICLE_DATA = Controller.get_vehicle_data
+
+
+def test_compact_vehicle_data():
+    """Test only used fields are kept and the raw blob holds the rest."""
+    compact, raw = compact_vehicle_data(VEHICLE_DATA)
+
+    assert compact["vin"] == VEHICLE_DATA["vin"]
+    assert "tokens" not in compact
+    assert "car_type" not in compact["vehicle_config"]
+    assert compact["vehicle_state"]["ft"] == VEHICLE_DATA["vehicle_state"]["ft"]
+    for field in VEHICLE_FIELDS:
+        section = VEHICLE_DATA.get(field.section, {})
+        if field.key in section:
+            assert compact[field.section][field.key] == section[field.key], field
+    rest = raw.decode()
+    assert rest["tokens"] == VEHICLE_DATA["tokens"]
+    assert "vin" not in rest
+    assert rest["vehicle_config"]["car_type"] == VEHICLE_DATA["vehicle_config"]["car_type"]
+    assert "ft" not in rest["vehicle_state"]
+    assert expand_vehicle_data(compact, raw) == VEHICLE_DATA
+    assert compact_vehicle_data({}) == ({}, None)
+
+
+def test_raw_partial_update():
+    """Test a partial response only replaces the blobs of its sections."""
+    _, raw = compact_vehicle_data(VEHICLE_DATA)
+    charge_state = raw.blobs["charge_state"]
+    partial = {
+        key: value for key, value in VEHICLE_DATA.items() if not isinstance(value, dict)
+    }
+    partial["color"] = "red"
+    partial["drive_state"] = dict(VEHICLE_DATA["drive_state"], new_field=1)
+    raw.update(compact_vehicle_data(partial)[1])
+
+    assert raw.blobs["charge_state"] is charge_state
+    rest = raw.decode()
+    assert rest["color"] == "red"
+    assert rest["drive_state"]["new_field"] == 1
+    assert rest["vehicle_config"]["car_type"] == VEHICLE_DATA["vehicle_config"]["car_type"]
+
+
+@pytest.mark.asyncio
+async def test_controller_compact(monkeypatch):
+    """Test car properties with compact vehicle data."""
+    TeslaMock(monkeypatch)
+    monkeypatch.setattr(Controller, "get_vehicle_data", GET_VEHICLE_DATA)
+
+    async def _api(self, name, path_vars=None, wake_if_asleep=False, **kwargs):
+        # pylint: disable=unused-argument
+        return {"response": copy.deepcopy(VEHICLE_DATA)}
+
+    monkeypatch.setattr(Controller, "api", _api)
+    _controller = Controller(None, compact_vehicle_data=True)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    _car = _controller.cars[vin]
+
+    for field in VEHICLE_FIELDS:
+        section = VEHICLE_DATA.get(field.section, {})
+        assert getattr(_car, field.name) == section.get(field.key, field.default)
+    assert _car.is_frunk_closed == (VEHICLE_DATA["vehicle_state"]["ft"] == 0)
+    assert _car.get_seat_heater_status(0) == VEHICLE_DATA["climate_state"][
+        "seat_heater_left"
+    ]
+    assert _controller.get_raw_vehicle_data(vin) == VEHICLE_DATA
@@ -0,0 +1,129 @@
+"""Test connection."""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from teslajsonpy.connection import Connection
+
+
+def _mock_refresh(monkeypatch, delay: float = 0.01) -> list:
+    """Patch oauth refresh and http calls; return list of refresh calls."""
+    calls = []
+
+    async def _refresh_access_token(self, refresh_token):
+        # pylint: disable=unused-argument
+        calls.append(refresh_token)
+        await asyncio.sleep(delay)
+        return {
+            "access_token": f"access_{len(calls)}",
+            "refresh_token": f"refresh_{len(calls)}",
+            "id_token": "id",
+            "expires_in": 28800,
+        }
+
+    async def _open(self, url, method="get", headers=None, data=None, **kwargs):
+        # pylint: disable=unused-argument
+        return {"response": headers["Authorization"]}
+
+    monkeypatch.setattr(Connection, "refresh_access_token", _refresh_access_token)
+    monkeypatch.setattr(Connection, "_Connection__open", _open)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_single_flight_refresh(monkeypatch):
+    """Test concurrent requests with an expired token share one refresh."""
+    calls = _mock_refresh(monkeypatch)
+    _connection = Connection(httpx.AsyncClient(), refresh_token="refresh_0")
+
+    results = await asyncio.gather(
+        *(_connection.get("vehicles") for _ in range(10))
+    )
+
+    assert calls == ["refresh_0"]
+    assert all(result["response"] == "Bearer access_1" for result in results)
+    assert _connection.refresh_token == "refresh_1"
+    assert _connection.token_refreshed
+
+
+@pytest.mark.asyncio
+async def test_refresh_ahead_of_expiration(monkeypatch):
+    """Test a token near expiration is refreshed in the background."""
+    calls = _mock_refresh(monkeypatch)
+    expiration = int(time.time()) + 60
+    _connection = Connection(
+        httpx.AsyncClient(),
+        access_token="access_0",
+        refresh_token="refresh_0",
+        expiration=expiration,
+    )
+
+    # The request does not wait for the refresh
+    result = await _connection.get("vehicles")
+    assert result["response"] == "Bearer access_0"
+
+    result = await _connection.get("vehicles")
+    assert result["response"] == "Bearer access_0"
+
+    await asyncio.sleep(0.05)
+    assert calls == ["refresh_0"]
+    assert _connection.expiration > expiration
+
+    result = await _connection.get("vehicles")
+    assert result["response"] == "Bearer access_1"
+
+
+def _mock_open(monkeypatch) -> list:
+    """Patch http calls with a slow response; return list of calls."""
+    calls = []
+
+    async def _open(self, url, method="get", headers=None, data=None, **kwargs):
+        # pylint: disable=unused-argument
+        calls.append((method, url, data))
+        await asyncio.sleep(0.01)
+        return {"response": {"url": url}}
+
+    monkeypatch.setattr(Connection, "_Connection__open", _open)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_coalesce_get_requests(monkeypatch):
+    """Test identical concurrent GET requests share one round-trip."""
+    calls = _mock_open(monkeypatch)
+    _connection = Connection(
+        httpx.AsyncClient(), access_token="access", expiration=int(time.time()) + 3600
+    )
+
+    url = "api/1/vehicles/1/vehicle_data"
+    results = await asyncio.gather(
+        *(_connection.post("", method="get", url=url) for _ in range(5)),
+        _connection.post("", method="get", url=url, data={"let_sleep": True}),
+    )
+
+    assert len(calls) == 2
+    assert all(result == results[0] for result in results[:5])
+    # Each caller may mutate its response without affecting the others
+    results[0]["response"]["url"] = "changed"
+    assert all(result["response"]["url"] == url for result in results[1:5])
+
+    # Sequential requests are not served from a cache
+    await _connection.post("", method="get", url=url)
+    assert len(calls) == 3
+
+
+@pytest.mark.asyncio
+async def test_commands_not_coalesced(monkeypatch):
+    """Test POST commands are always sent."""
+    calls = _mock_open(monkeypatch)
+    _connection = Connection(
+        httpx.AsyncClient(), access_token="access", expiration=int(time.time()) + 3600
+    )
+
+    url = "api/1/vehicles/1/command/honk_horn"
+    await asyncio.gather(*(_connection.post("", url=url) for _ in range(3)))
+
+    assert len(calls) == 3
@@ -0,0 +1,177 @@
+"""Test controller."""
+
+import asyncio
+import copy
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.exceptions import TeslaException
+
+from tests.tesla_mock import CAR_LIST, TeslaMock, VEHICLE_DATA
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_sequential(monkeypatch):
+    """Test tasks are awaited one at a time by default."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+
+    assert _controller.max_concurrency == 1
+
+    in_flight = 0
+    peak = 0
+
+    async def _task(value):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0)
+        in_flight -= 1
+        return value
+
+    assert await _controller._run_tasks([_task(i) for i in range(5)]) == list(
+        range(5)
+    )
+    assert peak == 1
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_concurrent(monkeypatch):
+    """Test tasks run concurrently up to max_concurrency."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None, max_concurrency=3)
+    await _controller.connect()
+
+    in_flight = 0
+    peak = 0
+
+    async def _task(value):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return value
+
+    assert await _controller._run_tasks([_task(i) for i in range(10)]) == list(
+        range(10)
+    )
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_run_tasks_concurrent_exception(monkeypatch):
+    """Test an exception is raised after all concurrent tasks complete."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None, max_concurrency=2)
+    await _controller.connect()
+
+    finished = []
+
+    async def _ok(value):
+        await asyncio.sleep(0.01)
+        finished.append(value)
+
+    async def _fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        await _controller._run_tasks([_fail(), _ok(1), _ok(2)])
+    assert finished == [1, 2]
+
+
+@pytest.mark.asyncio
+async def test_generate_car_objects_concurrent(monkeypatch):
+    """Test cars are fetched concurrently and a failing car is still added."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None, startup_concurrency=4)
+    await _controller.connect()
+    cars = []
+    for index in range(10):
+        car = copy.deepcopy(CAR_LIST[0])
+        car["id"] += index
+        car["vehicle_id"] += index
+        car["vin"] = f"{car['vin'][:-2]}{index:02}"
+        cars.append(car)
+    _controller._vehicle_list = cars
+    in_flight = 0
+    peak = 0
+
+    async def _get_vehicle_data(self, vin, wake_if_asleep=False):
+        # pylint: disable=unused-argument
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01 * (10 - int(vin[-2:])))
+        in_flight -= 1
+        if vin == cars[3]["vin"]:
+            raise TeslaException(408)
+        return copy.deepcopy(VEHICLE_DATA)
+
+    monkeypatch.setattr(Controller, "get_vehicle_data", _get_vehicle_data)
+    await _controller.generate_car_objects()
+
+    assert peak == 4
+    assert list(_controller.cars) == [car["vin"] for car in cars]
+    assert not _controller.cars[cars[3]["vin"]].data_available
+    assert _controller.cars[cars[4]["vin"]].data_available
+
+
+@pytest.mark.asyncio
+async def test_update_filtered_vins(monkeypatch):
+    """Test update skips cars left out by filtered_vins."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects(filtered_vins=["5YJSA00000000000"])
+    assert not _controller.cars
+    await _controller.update(force=True)
+    assert not _controller.get_car_online()
+
+def test_http2_client(monkeypatch):
+    """Test an http2 controller can be created with or without h2 installed."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(
+        None,
+        http2=True,
+        max_concurrency=30,
+        max_connections=50,
+        keepalive_expiry=30,
+    )
+
+    assert _controller.max_concurrency == 30
+
+
+@pytest.mark.asyncio
+async def test_websocket_message(monkeypatch):
+    """Test a streaming frame updates the drive state of the car."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    vehicle_id = _controller.vin_to_vehicle_id(vin)
+
+    _controller._process_websocket_message(
+        {
+            "msg_type": "data:update",
+            "tag": vehicle_id,
+            "value": "1650000000000,D,42,30,37.1,-122.1,90,37.2,-122.2,37.3,-122.3,91.5,wgs,1",
+        }
+    )
+
+    car = _controller.cars[vin]
+    assert car.shift_state == "D"
+    assert car.speed == 42
+    assert car.power == 30
+    assert car.latitude == 37.2
+    assert car.longitude == -122.2
+    assert car.heading == 90
+    assert car.native_heading == 91.5
+
+    # Frames for unknown vehicles are ignored
+    _controller._process_websocket_message(
+        {"msg_type": "data:update", "tag": "1", "value": "1650000000000,P"}
+    )
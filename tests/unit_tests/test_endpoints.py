@@ -0,0 +1,54 @@
+"""Test endpoint registry."""
+
+import pkgutil
+
+import orjson
+import pytest
+
+from teslajsonpy.endpoints import Endpoint, get_endpoint_registry
+
+
+def test_registry_is_shared():
+    """Test the registry is parsed once per process."""
+    assert get_endpoint_registry() is get_endpoint_registry()
+    assert len(get_endpoint_registry()) > 0
+
+
+def test_build_uri_matches_format():
+    """Test precompiled URIs match formatting the raw endpoints."""
+    raw = orjson.loads(pkgutil.get_data("teslajsonpy", "endpoints.json"))
+    registry = get_endpoint_registry()
+
+    for name, spec in raw.items():
+        endpoint = registry[name]
+        path_vars = {var: f"{var}_value" for var in endpoint.path_vars}
+        assert endpoint.build_uri(path_vars) == spec["URI"].format(**path_vars)
+        assert endpoint.method == spec["TYPE"].lower()
+
+
+def test_build_url():
+    """Test building urls by endpoint name."""
+    registry = get_endpoint_registry()
+
+    method, uri = registry.build_url("WAKE_UP", {"vehicle_id": 123})
+    assert method == "post"
+    assert uri == "api/1/vehicles/123/wake_up"
+
+    with pytest.raises(ValueError):
+        registry.build_url("UNKNOWN_ENDPOINT")
+
+    with pytest.raises(ValueError):
+        registry.build_url("WAKE_UP", {})
+
+    with pytest.raises(NotImplementedError):
+        registry.build_url("STATUS")
+
+
+def test_endpoint_is_compact():
+    """Test endpoints do not carry a per instance dict."""
+    endpoint = Endpoint("TEST", {"TYPE": "GET", "URI": "api/{{literal}}/{id}"})
+
+    assert endpoint.path_vars == ("id",)
+    assert endpoint.build_uri({"id": 1}) == "api/{literal}/1"
+    with pytest.raises(AttributeError):
+        endpoint.extra = True  # pylint: disable=attribute-defined-outside-init
@@ -0,0 +1,81 @@
+"""Test the multi-account fleet manager."""
+
+import time
+
+import httpx
+import pytest
+
+from teslajsonpy.fleet import FleetManager
+
+from tests.tesla_mock import (
+    PRODUCT_LIST,
+    SITE_CONFIG,
+    SITE_DATA,
+    SITE_SUMMARY,
+    VEHICLE_DATA,
+)
+
+RESPONSES = {
+    "products": PRODUCT_LIST,
+    "vehicle_data": VEHICLE_DATA,
+    "site_info": SITE_CONFIG,
+    "live_status": SITE_DATA,
+}
+
+
+class _ClosingTransport(httpx.MockTransport):
+    """MockTransport counting when it is closed."""
+
+    closed = 0
+
+    async def aclose(self) -> None:
+        self.closed += 1
+
+
+@pytest.mark.asyncio
+async def test_fleet_manager():
+    """Test accounts share the transport and fail independently."""
+    requests = []
+
+    def _handler(request):
+        token = request.headers["Authorization"].split()[-1]
+        requests.append(token)
+        if token == "revoked":
+            return httpx.Response(405, json={"response": None, "error": "disabled"})
+        name = request.url.path.rsplit("/", 1)[-1]
+        response = RESPONSES.get(name, SITE_SUMMARY)
+        return httpx.Response(200, json={"response": response})
+
+    transport = _ClosingTransport(_handler)
+    fleet = FleetManager(rate_limit=1000, transport=transport)
+    for token in ("first", "second", "revoked"):
+        fleet.add_account(
+            token, access_token=token, expiration=int(time.time()) + 3600
+        )
+    with pytest.raises(ValueError):
+        fleet.add_account("first")
+    assert len(fleet) == 3 and "second" in fleet
+
+    results = await fleet.connect()
+    assert isinstance(results["revoked"], Exception)
+    assert results["first"]["access_token"] == "first"
+    health = fleet.health()
+    assert health["first"].healthy
+    assert health["first"].cars == 1
+    assert health["second"].energysites == 2
+    assert not health["revoked"].healthy
+    assert health["revoked"].as_dict()["failures"] == 1
+
+    requests.clear()
+    results = await fleet.update(force=True)
+    assert list(results) == ["first", "second"]
+    assert not any(isinstance(result, Exception) for result in results.values())
+    assert set(requests) == {"first", "second"}
+    assert fleet.rate_limiter.budget["granted"]["second"] > 0
+    assert fleet.health()["second"].last_update
+
+    await fleet.remove_account("second")
+    assert list(fleet.controllers) == ["first", "revoked"]
+    assert not transport.closed
+    await fleet.close()
+    assert transport.closed == 1
@@ -0,0 +1,82 @@
+"""Test streaming frame decoding."""
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.frames import FrameDecoder
+
+from tests.tesla_mock import TeslaMock
+
+VALUE = "1650000000000,D,42,30,37.1,-122.1,90,37.2,-122.2,37.3,-122.3,91.5,wgs,1"
+
+
+def test_decode():
+    """Test values decode to typed rows with empty values as None."""
+    decoder = FrameDecoder()
+    row = decoder.decode(VALUE)
+
+    assert row[decoder.index["timestamp"]] == 1650000000000
+    assert row[decoder.index["shift_state"]] == "D"
+    assert row[decoder.index["est_lat"]] == 37.1
+    assert row[decoder.index["native_location_supported"]] == 1
+    assert decoder.drive_state_update(row)["latitude"] == 37.2
+
+    short = decoder.as_dict(decoder.decode("1650000000000,,0"))
+    assert short["shift_state"] is None
+    assert short["speed"] == 0
+    assert short["native_type"] is None
+
+    with pytest.raises(ValueError):
+        decoder.decode("1650000000000,D,fast")
+    with pytest.raises(ValueError):
+        FrameDecoder(("timestamp", "warp"))
+
+
+def test_decode_batch():
+    """Test a burst of frames decodes into columns."""
+    decoder = FrameDecoder(("timestamp", "shift_state", "speed"))
+    batch = decoder.decode_batch(
+        [
+            {"msg_type": "control:hello"},
+            {"msg_type": "data:update", "tag": 1, "value": "2,D,10"},
+            {"msg_type": "data:update", "tag": 2, "value": "1,R,x"},
+            {"msg_type": "data:update", "tag": 2, "value": "3,P,"},
+            {"msg_type": "data:update", "tag": 1, "value": "1,D,5"},
+        ]
+    )
+
+    assert len(batch) == 3
+    assert batch.tags == ["1", "2", "1"]
+    assert batch.columns == {
+        "timestamp": [2, 3, 1],
+        "shift_state": ["D", "P", "D"],
+        "speed": [10, None, 5],
+    }
+    assert batch.errors == ["2"]
+    assert decoder.latest(batch) == {"1": (2, "D", 10), "2": (3, "P", None)}
+    assert not decoder.decode_batch([])
+
+
+@pytest.mark.asyncio
+async def test_controller_frames(monkeypatch):
+    """Test the controller applies frames in order and calls listeners."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    vehicle_id = _controller.vin_to_vehicle_id(vin)
+    messages = []
+    _controller.register_websocket_callback(messages.append)
+    burst = [
+        {"msg_type": "data:update", "tag": vehicle_id, "value": VALUE},
+        {"msg_type": "data:update", "tag": "1", "value": VALUE},
+        {"msg_type": "data:update", "tag": vehicle_id, "value": "1650000001000,D,55"},
+    ]
+
+    for message in burst:
+        _controller._process_websocket_message(message)
+
+    assert _controller.cars[vin].speed == 55
+    assert _controller.cars[vin].power is None
+    assert messages == burst
@@ -0,0 +1,74 @@
+"""Test telemetry history."""
+
+import copy
+import math
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.history import RingBuffer
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+
+def test_ring_buffer_window():
+    """Test the ring keeps the newest samples and answers trailing windows."""
+    history = RingBuffer(("power", "speed"), capacity=4)
+    assert len(history) == 0
+    assert not any(history.window(60, now=100).values())
+
+    for second in range(10):
+        history.append(second * 10, {"power": second, "speed": None})
+    assert not history.append(5, {"power": 99})
+    assert history.stale == 1
+
+    assert len(history) == 4
+    assert list(history.window()["timestamp"]) == [60, 70, 80, 90]
+    window = history.window(25, ["power"], now=95)
+    assert list(window) == ["timestamp", "power"]
+    assert list(window["timestamp"]) == [70, 80, 90]
+    assert list(window["power"]) == [7, 8, 9]
+    assert all(math.isnan(speed) for speed in history.window()["speed"])
+
+    history.append(100, {"speed": 50})
+    timestamps, speeds = history.series("speed", now=100)
+    assert list(timestamps) == [100]
+    assert list(speeds) == [50]
+
+    history.clear()
+    assert not history.window()["timestamp"]
+
+
+@pytest.mark.asyncio
+async def test_controller_history(monkeypatch):
+    """Test polls and frames are recorded when history is enabled."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None, history_size=10)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    data = copy.deepcopy(VEHICLE_DATA)
+
+    async def _get_vehicle_data(self, vin, wake_if_asleep=False):
+        # pylint: disable=unused-argument
+        return copy.deepcopy(data)
+
+    monkeypatch.setattr(Controller, "get_vehicle_data", _get_vehicle_data)
+    await _controller._get_and_process_car_data(vin)
+    poll_time = data["drive_state"]["timestamp"] / 1000
+    _controller._process_websocket_message(
+        {
+            "msg_type": "data:update",
+            "tag": _controller.vin_to_vehicle_id(vin),
+            "value": f"{data['drive_state']['timestamp'] + 1000},D,42,30",
+        }
+    )
+
+    history = _controller.get_history(vin, 60, ["battery_level", "power"])
+    assert not history["timestamp"]
+    history = _controller.get_history(vin)
+    assert list(history["timestamp"]) == [poll_time, poll_time + 1]
+    assert history["battery_level"][0] == data["charge_state"]["battery_level"]
+    assert math.isnan(history["battery_level"][1])
+    assert history["power"][1] == 30
+    assert not _controller.get_history("UNKNOWN")
@@ -0,0 +1,140 @@
+"""Test instrumentation."""
+
+import time
+
+import httpx
+import pytest
+from tenacity import retry, stop_after_attempt
+
+from teslajsonpy.connection import Connection
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.instrumentation import (
+    Histogram,
+    HistogramCollector,
+    Instrumentation,
+    before_sleep_instrumented,
+)
+
+
+def test_histogram_quantile():
+    """Test quantiles are interpolated within buckets."""
+    histogram = Histogram((0.1, 0.2, 0.4))
+    assert histogram.quantile(0.5) is None
+
+    for value in (0.05, 0.15, 0.15, 0.3, 1.0):
+        histogram.observe(value)
+
+    assert histogram.count == 5
+    assert histogram.sum == pytest.approx(1.65)
+    assert histogram.quantile(0.2) == pytest.approx(0.1)
+    assert histogram.quantile(0.5) == pytest.approx(0.175)
+    # Values past the largest bound report the largest bound
+    assert histogram.quantile(0.99) == 0.4
+
+    snapshot = histogram.snapshot()
+    assert snapshot["buckets"] == [(0.1, 1), (0.2, 3), (0.4, 4), (float("inf"), 5)]
+
+
+def _connection(handler, instrumentation) -> Connection:
+    return Connection(
+        httpx.AsyncClient(transport=httpx.MockTransport(handler)),
+        access_token="access",
+        expiration=int(time.time()) + 3600,
+        instrumentation=instrumentation,
+    )
+
+
+@pytest.mark.asyncio
+async def test_request_events():
+    """Test request events carry endpoint, status, bytes and timings."""
+    body = b'{"response": {"state": "online"}}'
+
+    def _handler(request):
+        if request.url.path.endswith("error"):
+            return httpx.Response(500, content=b"{}")
+        return httpx.Response(200, content=body)
+
+    events = []
+
+    class _Recorder(Instrumentation):
+        def on_request_start(self, event):
+            events.append(("start", event.endpoint, event.status))
+
+        def on_request_end(self, event):
+            events.append(("end", event.endpoint, event.status))
+
+    collector = HistogramCollector()
+    _connection_ = _connection(_handler, _Recorder())
+    await _connection_.post("", method="get", url="api/1/products", endpoint="PRODUCT_LIST")
+    assert events == [("start", "PRODUCT_LIST", None), ("end", "PRODUCT_LIST", 200)]
+
+    _connection_.instrumentation = collector
+    await _connection_.post("", method="get", url="api/1/products", endpoint="PRODUCT_LIST")
+    with pytest.raises(TeslaException):
+        await _connection_.post("", url="api/1/error", endpoint="HONK_HORN")
+    await _connection_.get("vehicles")
+
+    snapshot = collector.snapshot()
+    assert snapshot["in_flight"] == 0
+    products = snapshot["endpoints"]["PRODUCT_LIST"]
+    assert products["statuses"] == {200: 1}
+    assert products["bytes"] == len(body)
+    assert products["wall_time"]["count"] == 1
+    assert products["decode_time"]["count"] == 1
+    assert collector.quantile("PRODUCT_LIST", 0.99) is not None
+    honk = snapshot["endpoints"]["HONK_HORN"]
+    assert honk["statuses"] == {500: 1}
+    assert honk["errors"] == {"TeslaException": 1}
+    assert honk["decode_time"]["count"] == 0
+    assert snapshot["endpoints"]["UNKNOWN"]["wall_time"]["count"] == 1
+
+
+def test_retry_events():
+    """Test tenacity retries are reported with the endpoint name."""
+
+    class _Api:
+        def __init__(self):
+            self.instrumentation = HistogramCollector()
+            self.calls = 0
+
+        @retry(
+            stop=stop_after_attempt(3),
+            before_sleep=before_sleep_instrumented,
+            reraise=True,
+        )
+        def post(self, endpoint=None):
+            self.calls += 1
+            if self.calls < 3:
+                raise TeslaException(503)
+            return True
+
+    api = _Api()
+    assert api.post(endpoint="VEHICLE_DATA")
+    assert api.instrumentation.endpoints["VEHICLE_DATA"].retries == 2
+
+
+@pytest.mark.asyncio
+async def test_token_refresh_events(monkeypatch):
+    """Test token refreshes are reported."""
+
+    async def _refresh_access_token(self, refresh_token):
+        # pylint: disable=unused-argument
+        return {
+            "access_token": "access_1",
+            "refresh_token": "refresh_1",
+            "id_token": "id",
+            "expires_in": 28800,
+        }
+
+    monkeypatch.setattr(Connection, "refresh_access_token", _refresh_access_token)
+    collector = HistogramCollector()
+    _connection_ = _connection(
+        lambda request: httpx.Response(200, content=b"{}"), collector
+    )
+    _connection_.expiration = 0
+    _connection_.refresh_token = "refresh_0"
+
+    await _connection_.get("vehicles")
+
+    assert collector.token_refresh.count == 1
+    assert collector.token_refresh_errors == 0
@@ -0,0 +1,100 @@
+"""Test rate limit governor."""
+
+import asyncio
+import time
+
+import pytest
+
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.ratelimit import (
+    PRIORITY_COMMAND,
+    PRIORITY_POLL,
+    FleetRateLimiter,
+    RateLimiter,
+)
+
+
+@pytest.mark.asyncio
+async def test_unlimited_by_default():
+    """Test requests are not held back without a configured rate."""
+    limiter = RateLimiter()
+
+    for _ in range(100):
+        await limiter.acquire(PRIORITY_POLL)
+
+    assert limiter.budget["tokens"] is None
+    assert limiter.budget["throttled"] == 0
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_throttles_polling():
+    """Test polling waits for tokens once the burst is used."""
+    limiter = RateLimiter(rate=100, burst=2)
+
+    start = time.monotonic()
+    for _ in range(4):
+        await limiter.acquire(PRIORITY_POLL)
+
+    assert time.monotonic() - start >= 0.015
+    assert limiter.budget["throttled"] == 2
+
+
+@pytest.mark.asyncio
+async def test_retry_after_sheds_polling_only():
+    """Test a 429 with Retry-After sheds polling but not commands."""
+    limiter = RateLimiter()
+
+    limiter.update_from_response(429, {"Retry-After": "30"})
+    assert limiter.paused
+    assert 29 <= limiter.budget["paused_for"] <= 30
+
+    with pytest.raises(TeslaException) as ex:
+        await limiter.acquire(PRIORITY_POLL)
+    assert ex.value.code == 429
+    assert limiter.budget["shed"] == 1
+
+    await asyncio.wait_for(limiter.acquire(PRIORITY_COMMAND), 1)
+
+
+def test_rate_limit_headers():
+    """Test rate limit headers lower the budget and pause when exhausted."""
+    limiter = RateLimiter(rate=1, burst=60)
+
+    limiter.update_from_response(200, {"X-RateLimit-Limit": "60", "X-RateLimit-Remaining": "5"})
+    assert limiter.budget["limit"] == 60
+    assert limiter.budget["remaining"] == 5
+    assert limiter.budget["tokens"] <= 5.1
+    assert not limiter.paused
+
+    limiter.update_from_response(200, {"RateLimit-Remaining": "0", "RateLimit-Reset": "10"})
+    assert limiter.paused
+
+    # 429 without Retry-After still pauses
+    limiter = RateLimiter()
+    limiter.update_from_response(429, {})
+    assert limiter.paused
+
+
+@pytest.mark.asyncio
+async def test_fleet_round_robin():
+    """Test a shared budget serves waiting accounts in turn."""
+    fleet = FleetRateLimiter(rate=200, burst=1)
+    busy = RateLimiter(fleet=fleet, account="busy")
+    quiet = RateLimiter(fleet=fleet, account="quiet")
+    order = []
+
+    async def _poll(limiter):
+        await limiter.acquire(PRIORITY_POLL)
+        order.append(limiter.account)
+
+    await asyncio.gather(
+        *(_poll(busy) for _ in range(8)), *(_poll(quiet) for _ in range(2))
+    )
+
+    # The first request takes the burst, then accounts alternate
+    assert order[:5] == ["busy", "busy", "quiet", "busy", "quiet"]
+    assert fleet.budget["granted"] == {"busy": 8, "quiet": 2}
+    assert not fleet.waiting
+
+    await quiet.acquire(PRIORITY_COMMAND)
+    assert fleet.granted["quiet"] == 2
@@ -0,0 +1,92 @@
+"""Test traffic recording and replay."""
+
+import gzip
+import time
+
+import httpx
+import pytest
+
+from teslajsonpy.connection import Connection
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.recording import (
+    REDACTED,
+    RecordingTransport,
+    ReplayTransport,
+    TrafficRecorder,
+    read_recording,
+)
+
+from tests.tesla_mock import PRODUCT_LIST
+
+
+def _connection(transport) -> Connection:
+    return Connection(
+        httpx.AsyncClient(transport=transport),
+        access_token="secret_access",
+        expiration=int(time.time()) + 3600,
+    )
+
+
+@pytest.mark.asyncio
+async def test_record_and_replay(tmp_path):
+    """Test exchanges are recorded without tokens and replayed in order."""
+    path = str(tmp_path / "session.jsonl.gz")
+    calls = []
+
+    def _handler(request):
+        calls.append(request.url.path)
+        if request.url.path.endswith("products"):
+            return httpx.Response(
+                200,
+                json={"response": PRODUCT_LIST[: len(calls)], "count": len(calls)},
+                headers={"set-cookie": "session=secret", "ratelimit-remaining": "9"},
+            )
+        return httpx.Response(
+            200, json={"response": {"result": True, "token": "secret_token"}}
+        )
+
+    with TrafficRecorder(path) as recorder:
+        recorder_connection = _connection(
+            RecordingTransport(recorder, httpx.MockTransport(_handler))
+        )
+        first = await recorder_connection.get("products")
+        await recorder_connection.get("products")
+        await recorder_connection.post(
+            "vehicles/1/command/honk_horn", data={"token": "secret_token"}
+        )
+        recorder.record_message(
+            {"msg_type": "data:update", "tag": "1", "value": "1,D,5"}
+        )
+        recorder.record_message({"msg_type": "data:subscribe_oauth", "token": "x"})
+    assert first["response"] == PRODUCT_LIST[:1]
+
+    with gzip.open(path, "rb") as file:
+        assert b"secret" not in file.read()
+    entries = list(read_recording(path))
+    assert [entry["type"] for entry in entries] == ["http", "http", "http", "ws", "ws"]
+    assert entries[0]["key"] == "GET /api/1/products"
+    assert entries[0]["headers"] == {
+        "content-type": "application/json",
+        "ratelimit-remaining": "9",
+    }
+    assert entries[2]["request"] == {"token": REDACTED}
+    assert entries[2]["body"]["response"]["token"] == REDACTED
+    assert entries[4]["data"]["token"] == REDACTED
+
+    replay = ReplayTransport(path)
+    replay_connection = _connection(replay)
+    assert (await replay_connection.get("products"))["count"] == 1
+    assert (await replay_connection.get("products"))["count"] == 2
+    # The last recorded response is repeated
+    assert (await replay_connection.get("products"))["count"] == 2
+    assert (await replay_connection.post("vehicles/1/command/honk_horn"))[
+        "response"
+    ]["result"]
+    with pytest.raises(TeslaException):
+        await replay_connection.get("vehicles/2/vehicle_data")
+    assert replay.unmatched == 1
+
+    messages = []
+    assert await replay.replay_messages(messages.append) == 2
+    assert messages[0]["value"] == "1,D,5"
+    assert len(calls) == 3
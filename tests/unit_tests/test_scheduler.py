@@ -0,0 +1,151 @@
+"""Test polling scheduler."""
+
+import asyncio
+import time
+
+import pytest
+
+from teslajsonpy.controller import SCHEDULE_PRODUCT_LIST, SCHEDULE_VEHICLE, Controller
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.scheduler import PollingScheduler
+
+from tests.tesla_mock import TeslaMock, VIN
+
+
+def test_schedule_and_pop_due():
+    """Test keys are popped in due order."""
+    scheduler = PollingScheduler()
+
+    assert scheduler.next_due() is None
+    assert scheduler.schedule("a", 30)
+    assert scheduler.schedule("b", 10)
+    assert not scheduler.schedule("c", 20)
+
+    assert len(scheduler) == 3
+    assert scheduler.next_due() == 10
+    assert scheduler.pop_due(5) == []
+    assert scheduler.pop_due(25) == [("b", 10), ("c", 20)]
+    assert "b" not in scheduler
+    assert scheduler.next_due() == 30
+
+
+def test_reschedule_and_cancel():
+    """Test rescheduled and cancelled keys leave no stale entries behind."""
+    scheduler = PollingScheduler()
+
+    scheduler.schedule("a", 10)
+    scheduler.schedule("b", 20)
+    scheduler.schedule("a", 40)
+    assert scheduler.get_due("a") == 40
+    assert scheduler.next_due() == 20
+
+    scheduler.cancel("b")
+    assert scheduler.next_due() == 40
+    assert scheduler.pop_due(100) == [("a", 40)]
+    assert scheduler.next_due() is None
+    assert len(scheduler) == 0
+
+
+def test_compaction():
+    """Test the heap stays bounded when keys are rescheduled repeatedly."""
+    scheduler = PollingScheduler()
+
+    for i in range(1000):
+        scheduler.schedule(i % 10, 1000 - i)
+
+    assert len(scheduler) == 10
+    assert len(scheduler._heap) <= 2 * len(scheduler) + 16
+    assert scheduler.next_due() == 1
+
+
+@pytest.mark.asyncio
+async def test_controller_scheduler(monkeypatch):
+    """Test the scheduler polls due vehicles in the background."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    _controller.set_car_online(vin=VIN, online_status=True)
+
+    await _controller.start_scheduler()
+    assert _controller.scheduler_running
+
+    # A car that has never been updated is due immediately
+    await asyncio.sleep(0.05)
+    assert _controller.get_last_update_time(vin=VIN) > 0
+    due = _controller._scheduler.get_due((SCHEDULE_VEHICLE, VIN))
+    assert due > time.time()
+
+    # A car going offline is removed until it wakes up
+    _controller.set_car_online(vin=VIN, online_status=False)
+    assert _controller._scheduler.get_due((SCHEDULE_VEHICLE, VIN)) is None
+    _controller.set_car_online(vin=VIN, online_status=True)
+    assert _controller._scheduler.get_due((SCHEDULE_VEHICLE, VIN)) is not None
+
+    await _controller.stop_scheduler()
+    assert not _controller.scheduler_running
+
+
+@pytest.mark.asyncio
+async def test_scheduler_survives_errors(monkeypatch):
+    """Test an unexpected poll error is logged and disconnect stops polling."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    _controller.set_car_online(vin=VIN, online_status=True)
+    polls = []
+
+    async def _poll_scheduled(self, key):
+        polls.append(key)
+        if len(polls) == 1:
+            raise KeyError(key)
+
+    monkeypatch.setattr(Controller, "_poll_scheduled", _poll_scheduled)
+    await _controller.start_scheduler()
+    await asyncio.sleep(0.05)
+    assert len(polls) == 1
+    assert _controller.scheduler_running
+
+    # Waking the car schedules it again
+    _controller.set_car_online(vin=VIN, online_status=False)
+    _controller.set_car_online(vin=VIN, online_status=True)
+    await asyncio.sleep(0.05)
+    assert len(polls) == 2
+
+    await _controller.disconnect()
+    assert not _controller.scheduler_running
+
+
+@pytest.mark.asyncio
+async def test_scheduler_failed_key_keeps_others(monkeypatch):
+    """Test a failing due product neither skips nor unschedules the others."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    _controller.set_car_online(vin=VIN, online_status=True)
+    polled = []
+
+    async def _update_product_list(self, cur_time):
+        # pylint: disable=unused-argument
+        polled.append(SCHEDULE_PRODUCT_LIST)
+        raise TeslaException(429)
+
+    async def _get_and_process_car_data(self, vin):
+        # pylint: disable=unused-argument
+        polled.append(vin)
+
+    monkeypatch.setattr(Controller, "_update_product_list", _update_product_list)
+    monkeypatch.setattr(
+        Controller, "_get_and_process_car_data", _get_and_process_car_data
+    )
+    await _controller.start_scheduler()
+    # The product list is due first and fails
+    _controller._scheduler.schedule(SCHEDULE_PRODUCT_LIST, 1)
+    _controller._scheduler.schedule((SCHEDULE_VEHICLE, VIN), 2)
+    await asyncio.sleep(0.05)
+    assert polled == [SCHEDULE_PRODUCT_LIST, VIN]
+    assert _controller._scheduler.get_due(SCHEDULE_PRODUCT_LIST) > time.time()
+    assert _controller._scheduler.get_due((SCHEDULE_VEHICLE, VIN)) > time.time()
+    await _controller.stop_scheduler()
@@ -0,0 +1,77 @@
+"""Test vehicle field schema."""
+
+import configparser
+import copy
+import os
+
+import pytest
+
+from teslajsonpy.car import TeslaCar
+from teslajsonpy.controller import Controller
+from teslajsonpy.schema import VEHICLE_FIELDS, VehicleState
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+
+def _lookup(data: dict, field):
+    section = data if field.section is None else data.get(field.section, {})
+    return section.get(field.key, field.default)
+
+
+def test_state_fields():
+    """Test state fields match vehicle data lookups."""
+    state = VehicleState(VEHICLE_DATA)
+    for field in VEHICLE_FIELDS:
+        assert getattr(state, field.name) == _lookup(VEHICLE_DATA, field), field
+
+    assert VehicleState().defrost_mode == 0
+    assert VehicleState().battery_level is None
+    with pytest.raises(AttributeError):
+        state.unknown_field = 1
+
+    state.load_section("charge_state", None)
+    assert state.battery_level is None
+    assert state.inside_temp == VEHICLE_DATA["climate_state"]["inside_temp"]
+
+
+@pytest.mark.asyncio
+async def test_car_properties(monkeypatch):
+    """Test generated properties follow polls and commands."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    _car = _controller.cars[vin]
+
+    assert isinstance(TeslaCar.battery_level, property)
+    assert TeslaCar.battery_level.__doc__.startswith("Return car battery level")
+    for field in VEHICLE_FIELDS:
+        assert getattr(_car, field.name) == _lookup(VEHICLE_DATA, field), field
+    assert _car.fields.battery_level == _car.battery_level
+
+    data = copy.deepcopy(VEHICLE_DATA)
+    data["charge_state"]["battery_level"] = 12
+
+    async def _get_vehicle_data(self, vin, wake_if_asleep=False):
+        # pylint: disable=unused-argument
+        return data
+
+    monkeypatch.setattr(Controller, "get_vehicle_data", _get_vehicle_data)
+    await _controller._get_and_process_car_data(vin)
+    assert _car.battery_level == 12
+
+    await _car.change_charge_limit(71)
+    assert _car.charge_limit_soc == 71
+
+
+def test_pylint_generated_members():
+    """Test pylintrc declares every generated field for no-member checks."""
+    config = configparser.ConfigParser()
+    config.read(os.path.join(os.path.dirname(__file__), "..", "..", "pylintrc"))
+    declared = {
+        name.strip()
+        for name in config["TYPECHECK"]["generated-members"].split(",")
+        if name.strip()
+    }
+    assert declared == {field.name for field in VEHICLE_FIELDS}
@@ -0,0 +1,143 @@
+"""Test the sharded multi-process runner."""
+
+import asyncio
+import copy
+
+from aiohttp import web
+import pytest
+
+from teslajsonpy.exceptions import TeslaException
+from teslajsonpy.sharding import ShardedRunner, apply_delta, assign_shards
+
+from tests.tesla_mock import (
+    PRODUCT_LIST,
+    SITE_CONFIG,
+    SITE_DATA,
+    SITE_SUMMARY,
+    VEHICLE_DATA,
+)
+
+
+def test_shard_helpers():
+    """Test shard assignment and delta application."""
+    assert assign_shards(["a", "b", "c"], 2) == [["a", "c"], ["b"]]
+    assert assign_shards(["a"], 4) == [["a"]]
+
+    data = {"charge_state": {"battery_level": 50}, "state": "online"}
+    apply_delta(
+        data, {"charge_state.battery_level": 60, "climate_state.inside_temp": 20}
+    )
+    assert data == {
+        "charge_state": {"battery_level": 60},
+        "climate_state": {"inside_temp": 20},
+        "state": "online",
+    }
+
+
+class _ApiServer:
+    """Owner API serving the mock products with a rising battery level."""
+
+    def __init__(self):
+        self.battery_level = 50
+        self.commands = []
+        self.runner = None
+
+    async def handler(self, request):
+        if request.headers["Authorization"] == "Bearer revoked":
+            return web.json_response({"response": None}, status=405)
+        name = request.path.rsplit("/", 1)[-1]
+        if name == "products":
+            response = PRODUCT_LIST
+        elif name == "vehicle_data":
+            self.battery_level += 1
+            response = copy.deepcopy(VEHICLE_DATA)
+            response["charge_state"]["battery_level"] = self.battery_level
+        elif "/command/" in request.path:
+            self.commands.append(name)
+            response = {"result": True, "reason": ""}
+        else:
+            response = {
+                "site_info": SITE_CONFIG,
+                "live_status": SITE_DATA,
+            }.get(name, SITE_SUMMARY)
+        return web.json_response({"response": response})
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}"
+
+
+@pytest.mark.asyncio
+async def test_sharded_runner():
+    """Test workers forward their cars, deltas and command results."""
+    server = _ApiServer()
+    url = await server.start()
+    runner = ShardedRunner(workers=2, interval=0.2, update_kwargs={"force": True})
+    for token in ("valid", "revoked"):
+        runner.add_account(
+            token,
+            access_token=token,
+            expiration=2**31,
+            api_proxy_url=url,
+            update_interval=0,
+        )
+    with pytest.raises(ValueError):
+        runner.add_account("valid")
+    rounds = asyncio.Queue()
+    runner.on_round(lambda number, payload: rounds.put_nowait(payload))
+    try:
+        errors = await asyncio.wait_for(runner.start(), 60)
+        assert list(errors) == ["revoked"]
+        assert errors["revoked"][0] == 405
+        vin = VEHICLE_DATA["vin"]
+        assert list(runner.cars) == [vin]
+        assert len(runner.energysites) == 2
+        car = runner.cars[vin]
+        # Rounds may already have been applied while start returned
+        while not rounds.empty():
+            rounds.get_nowait()
+        first = car.battery_level
+
+        while True:
+            payload = await asyncio.wait_for(rounds.get(), 10)
+            if "valid" in payload and payload["valid"]["vehicles"]:
+                break
+        assert car.battery_level > first
+        assert car.is_on
+
+        assert car.is_locked is False
+        await car.lock()
+        assert car.is_locked
+        assert "door_lock" in server.commands
+        with pytest.raises(TeslaException):
+            await runner.call(
+                runner._controllers["valid"].shard, "valid", "api", "UNKNOWN"
+            )
+
+        health = runner.health()
+        assert all(shard["alive"] for shard in health)
+        assert sum(shard["rounds"] for shard in health) > 0
+    finally:
+        await runner.stop()
+        await server.runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_worker_exits_before_ready():
+    """Test the accounts of a worker that dies while connecting get an error."""
+    runner = ShardedRunner(workers=1)
+    # The worker fails to build the controller and exits without MSG_READY
+    runner.add_account("broken", not_a_controller_option=True)
+    try:
+        errors = await asyncio.wait_for(runner.start(), 60)
+        assert errors == {"broken": ("WORKER_EXITED", "WORKER_EXITED")}
+        assert not runner.cars
+        assert runner.health()[0]["errors"] == errors
+    finally:
+        await runner.stop()
@@ -0,0 +1,64 @@
+"""Test controller snapshots."""
+
+import os
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.snapshot import load_snapshot, save_snapshot
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compact", [False, True])
+async def test_snapshot_restore(monkeypatch, tmp_path, compact):
+    """Test a restored controller has the saved cars, sites and timers."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(
+        None, access_token="access", refresh_token="refresh", expiration=1234
+    )
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    await _controller.generate_energysite_objects()
+    vin = next(iter(_controller.cars))
+    _controller.set_last_park_time(vin=vin, timestamp=1000)
+    _controller.set_last_update_time(vin=vin, timestamp=2000)
+    _controller.set_update_interval_vin(vin=vin, value=120)
+
+    path = str(tmp_path / "snapshot.json")
+    save_snapshot(path, _controller.get_snapshot())
+    assert os.stat(path).st_mode & 0o777 == 0o600
+    snapshot = load_snapshot(path)
+
+    async def _api(self, name, path_vars=None, wake_if_asleep=False, **kwargs):
+        raise AssertionError(f"{name} called during restore")
+
+    monkeypatch.setattr(Controller, "api", _api)
+    restored = Controller(None, compact_vehicle_data=compact)
+    assert restored.restore_snapshot(snapshot)
+
+    assert restored.get_tokens()["refresh_token"] == "refresh"
+    assert restored.get_expiration() == 1234
+    assert list(restored.cars) == list(_controller.cars)
+    assert list(restored.energysites) == list(_controller.energysites)
+    car = restored.cars[vin]
+    assert car.battery_level == VEHICLE_DATA["charge_state"]["battery_level"]
+    assert restored.get_raw_vehicle_data(vin) == VEHICLE_DATA
+    assert restored.vin_to_vehicle_id(vin) == _controller.vin_to_vehicle_id(vin)
+    assert restored.get_last_park_time(vin=vin) == 1000
+    assert restored.get_last_update_time(vin=vin) == 2000
+    assert restored.get_update_interval_vin(vin=vin) == 120
+    for energysite_id, energysite in restored.energysites.items():
+        saved = _controller.energysites[energysite_id]
+        assert type(energysite) is type(saved)
+        assert energysite.solar_power == saved.solar_power
+
+
+def test_incompatible_snapshot(tmp_path):
+    """Test snapshots of another version are ignored."""
+    path = str(tmp_path / "snapshot.json")
+    assert load_snapshot(path) is None
+    save_snapshot(path, {"version": 0})
+    assert load_snapshot(path) is None
+    assert not Controller(None).restore_snapshot({"version": 0})
@@ -0,0 +1,218 @@
+"""Test streaming."""
+
+import asyncio
+
+from aiohttp import WSMsgType, web
+import orjson
+import pytest
+
+from teslajsonpy.streaming import StreamingManager
+
+
+class _StreamingServer:
+    """Websocket server recording subscriptions per connection."""
+
+    def __init__(self):
+        self.connections = []
+        self.runner = None
+
+    async def handler(self, request):
+        websocket = web.WebSocketResponse()
+        await websocket.prepare(request)
+        tags = []
+        self.connections.append((websocket, tags))
+        await websocket.send_bytes(orjson.dumps({"msg_type": "control:hello"}))
+        async for msg in websocket:
+            if msg.type != WSMsgType.TEXT:
+                continue
+            data = orjson.loads(msg.data)
+            if data["msg_type"] == "data:subscribe_oauth":
+                assert data["token"] == "token"
+                tags.append(data["tag"])
+            elif data["msg_type"] == "data:unsubscribe":
+                tags.remove(data["tag"])
+        return websocket
+
+    async def start(self) -> str:
+        app = web.Application()
+        app.router.add_get("/streaming/", self.handler)
+        self.runner = web.AppRunner(app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        return f"http://127.0.0.1:{port}/streaming/"
+
+    async def send(self, tag, msg_type="data:update", value="1,D,5"):
+        for websocket, tags in self.connections:
+            if tag in tags and not websocket.closed:
+                await websocket.send_bytes(
+                    orjson.dumps({"msg_type": msg_type, "tag": tag, "value": value})
+                )
+
+
+async def _until(condition):
+    for _ in range(100):
+        if condition():
+            return
+        await asyncio.sleep(0.01)
+    raise AssertionError("condition not met")
+
+
+@pytest.mark.asyncio
+async def test_multiplexed_subscriptions():
+    """Test vehicles share sockets and messages are routed by tag."""
+    server = _StreamingServer()
+    url = await server.start()
+    manager = StreamingManager(
+        lambda: "token", url=url, vehicles_per_socket=2, resubscribe_attempts=0
+    )
+    messages = {}
+    disconnects = []
+    try:
+        await asyncio.gather(
+            *(
+                manager.subscribe(
+                    vehicle_id,
+                    on_message=lambda data, vid=vehicle_id: messages.setdefault(
+                        vid, []
+                    ).append(data["value"]),
+                    on_disconnect=disconnects.append,
+                )
+                for vehicle_id in ("1", "2", "3")
+            )
+        )
+        # Subscribing again does not send another subscription
+        await manager.subscribe("1", on_message=None)
+        await manager.subscribe(
+            "1",
+            on_message=lambda data: messages.setdefault("1", []).append(data["value"]),
+        )
+        await _until(lambda: sum(len(tags) for _, tags in server.connections) == 3)
+        assert len(manager.sockets) == 2
+        assert sorted(len(tags) for _, tags in server.connections) == [1, 2]
+
+        for tag in ("1", "2", "3", "4"):
+            await server.send(tag, value=f"{tag},D,5")
+        await _until(lambda: len(messages) == 3)
+        assert messages == {"1": ["1,D,5"], "2": ["2,D,5"], "3": ["3,D,5"]}
+
+        await server.send("2", msg_type="data:error", value="disconnected")
+        await _until(lambda: disconnects)
+        assert disconnects[0]["tag"] == "2"
+        assert not manager.is_subscribed("2")
+        assert manager.is_subscribed("1")
+
+        await manager.unsubscribe("3")
+        await _until(lambda: all("3" not in tags for _, tags in server.connections))
+        # The emptied socket is closed
+        assert len(manager.sockets) == 1
+        assert len(disconnects) == 1
+    finally:
+        await manager.close()
+        await server.runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_reconnect_and_resubscribe():
+    """Test a closed socket is reconnected and its vehicles resubscribed."""
+    server = _StreamingServer()
+    url = await server.start()
+    manager = StreamingManager(lambda: "token", url=url, backoff_base=0.01)
+    messages = []
+    disconnects = []
+    try:
+        for vehicle_id in ("1", "2"):
+            await manager.subscribe(
+                vehicle_id, on_message=messages.append, on_disconnect=disconnects.append
+            )
+        await _until(lambda: server.connections and len(server.connections[0][1]) == 2)
+        await server.send("1")
+        await _until(lambda: messages)
+        assert manager.health().healthy
+        assert manager.last_frame_age("1") is not None
+        assert manager.last_frame_age("2") is None
+
+        await server.connections[0][0].close()
+        await _until(
+            lambda: len(server.connections) == 2
+            and sorted(server.connections[1][1]) == ["1", "2"]
+        )
+        await server.send("2")
+        await _until(lambda: len(messages) == 2)
+
+        health = manager.health()
+        assert health.reconnects == 1
+        assert health.connected == health.sockets == 1
+        assert health.vehicles == 2
+        assert health.as_dict()["last_frame_age"] < 1
+        assert not disconnects
+    finally:
+        await manager.close()
+        await server.runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_resubscribe_after_errors():
+    """Test auth errors refresh the token and disconnects resubscribe."""
+    server = _StreamingServer()
+    url = await server.start()
+    refreshes = []
+
+    async def _refresh_token(force):
+        refreshes.append(force)
+
+    manager = StreamingManager(
+        lambda: "token",
+        url=url,
+        refresh_token=_refresh_token,
+        resubscribe_attempts=2,
+        backoff_base=0.01,
+    )
+    disconnects = []
+    try:
+        await manager.subscribe("1", on_disconnect=disconnects.append)
+        await _until(lambda: server.connections and server.connections[0][1])
+        tags = server.connections[0][1]
+
+        await server.send("1", msg_type="data:error", value="Can't validate token. ")
+        await _until(lambda: len(tags) == 2)
+        assert refreshes == [True]
+
+        await server.send("1", msg_type="data:error", value="disconnected")
+        await _until(lambda: len(tags) == 3)
+        assert refreshes == [True, False]
+        assert not disconnects
+
+        # Out of resubscribe attempts without a data:update in between
+        await server.send("1", msg_type="data:error", value="disconnected")
+        await _until(lambda: disconnects)
+        assert disconnects[0]["value"] == "disconnected"
+        assert not manager.is_subscribed("1")
+    finally:
+        await manager.close()
+        await server.runner.cleanup()
+
+
+@pytest.mark.asyncio
+async def test_reconnects_exhausted():
+    """Test vehicles are disconnected once reconnecting gives up."""
+    server = _StreamingServer()
+    url = await server.start()
+    await server.runner.cleanup()
+    manager = StreamingManager(
+        lambda: "token", url=url, max_reconnects=2, backoff_base=0.01
+    )
+    disconnects = []
+    try:
+        await manager.subscribe("1", on_disconnect=disconnects.append)
+        assert manager.health().connected == 0
+        await _until(lambda: disconnects)
+        assert disconnects == [
+            {"msg_type": "data:error", "tag": "1", "value": "disconnected"}
+        ]
+        assert not manager.subscriptions
+        assert not manager.sockets
+        assert manager.health().last_error is not None
+    finally:
+        await manager.close()
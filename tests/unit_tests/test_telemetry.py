@@ -0,0 +1,126 @@
+"""Test telemetry streams."""
+
+import asyncio
+
+import pytest
+
+from teslajsonpy.connection import Connection
+from teslajsonpy.controller import Controller
+from teslajsonpy.frames import FrameDecoder
+from teslajsonpy.telemetry import (
+    OVERFLOW_BLOCK,
+    OVERFLOW_CONFLATE,
+    OVERFLOW_DROP_OLDEST,
+    TelemetryStream,
+)
+
+from tests.tesla_mock import TeslaMock
+
+DECODER = FrameDecoder(("timestamp", "shift_state", "speed"))
+
+
+def _fill(overflow):
+    stream = TelemetryStream("VIN", DECODER, ["speed"], maxsize=2, overflow=overflow)
+    for speed in range(1, 5):
+        stream.put((speed, "D", speed * 10))
+    return stream
+
+
+def test_overflow_policies():
+    """Test full queues drop, conflate or keep frames by policy."""
+    drop_oldest = _fill(OVERFLOW_DROP_OLDEST)
+    assert drop_oldest.dropped == 2
+    assert drop_oldest.get_nowait() == [
+        {"timestamp": 3, "speed": 30},
+        {"timestamp": 4, "speed": 40},
+    ]
+
+    conflate = _fill(OVERFLOW_CONFLATE)
+    assert conflate.dropped == 2
+    assert [frame["speed"] for frame in conflate.get_nowait()] == [10, 40]
+
+    block = _fill(OVERFLOW_BLOCK)
+    assert block.dropped == 0
+    assert block.backlog == 2
+    assert len(block) == 4
+    assert [frame["speed"] for frame in block.get_nowait()] == [10, 20, 30, 40]
+
+    capped = TelemetryStream(
+        "VIN", DECODER, ["speed"], maxsize=2, overflow=OVERFLOW_BLOCK, max_backlog=1
+    )
+    for speed in range(1, 5):
+        capped.put((speed, "D", speed * 10))
+    assert capped.backlog == 1
+    assert capped.dropped == 1
+    assert [frame["speed"] for frame in capped.get_nowait()] == [10, 20, 30]
+
+    with pytest.raises(ValueError):
+        TelemetryStream("VIN", DECODER, ["odometer"])
+    with pytest.raises(ValueError):
+        TelemetryStream("VIN", DECODER, overflow="latest")
+
+
+@pytest.mark.asyncio
+async def test_close_ends_iteration():
+    """Test closing a stream ends a waiting consumer."""
+    stream = TelemetryStream("VIN", DECODER)
+    frames = []
+
+    async def _consume():
+        async for frame in stream:
+            frames.append(frame)
+
+    consumer = asyncio.ensure_future(_consume())
+    await asyncio.sleep(0)
+    stream.put((1, "D", 5))
+    await asyncio.sleep(0)
+    stream.close()
+    await asyncio.wait_for(consumer, 1)
+    assert frames == [{"timestamp": 1, "shift_state": "D", "speed": 5}]
+
+
+@pytest.mark.asyncio
+async def test_controller_stream(monkeypatch):
+    """Test controller streams receive frames and subscribe the vehicle."""
+    TeslaMock(monkeypatch)
+    subscribed = []
+
+    async def _websocket_connect(self, vin, vehicle_id, **kwargs):
+        # pylint: disable=unused-argument
+        subscribed.append(vehicle_id)
+
+    monkeypatch.setattr(Connection, "websocket_connect", _websocket_connect)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    vehicle_id = _controller.vin_to_vehicle_id(vin)
+
+    with pytest.raises(ValueError):
+        _controller.stream("UNKNOWN")
+
+    async with _controller.stream(vin, fields=["speed", "power"]) as frames:
+        assert subscribed == [vehicle_id]
+        slow = _controller.stream(vin, maxsize=1)
+        for speed in (10, 20):
+            _controller._process_websocket_message(
+                {
+                    "msg_type": "data:update",
+                    "tag": vehicle_id,
+                    "value": f"16500000000{speed},D,{speed},5",
+                }
+            )
+        assert await frames.__anext__() == {
+            "timestamp": 1650000000010,
+            "speed": 10,
+            "power": 5,
+        }
+        assert (await frames.__anext__())["speed"] == 20
+        assert slow.dropped == 1
+        slow.close()
+
+    assert frames.closed
+    _controller._process_websocket_message(
+        {"msg_type": "data:update", "tag": vehicle_id, "value": "1650000000030,D,30"}
+    )
+    assert not frames.get_nowait()
@@ -0,0 +1,72 @@
+"""Test tiered VEHICLE_DATA polling."""
+
+import copy
+import time
+
+import pytest
+
+from teslajsonpy.const import VEHICLE_DATA_ENDPOINTS
+from teslajsonpy.controller import Controller
+
+from tests.tesla_mock import TeslaMock, VEHICLE_DATA
+
+GET_VEHICLE_DATA = Controller.get_vehicle_data
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("compact", [False, True])
+async def test_tiered_vehicle_data(monkeypatch, compact):
+    """Test sections are polled by activity and merged into the cache."""
+    TeslaMock(monkeypatch)
+    monkeypatch.setattr(Controller, "get_vehicle_data", GET_VEHICLE_DATA)
+    data = copy.deepcopy(VEHICLE_DATA)
+    requested = []
+
+    async def _api(self, name, path_vars=None, wake_if_asleep=False, **kwargs):
+        # pylint: disable=unused-argument
+        sections = kwargs.get("endpoints")
+        requested.append(sections)
+        if sections is None:
+            return {"response": copy.deepcopy(data)}
+        sections = sections.split(";")
+        return {
+            "response": {
+                key: copy.deepcopy(value)
+                for key, value in data.items()
+                if not isinstance(value, dict) or key in sections
+            }
+        }
+
+    monkeypatch.setattr(Controller, "api", _api)
+    _controller = Controller(
+        None, tiered_vehicle_data=True, compact_vehicle_data=compact
+    )
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    vin = next(iter(_controller.cars))
+    _car = _controller.cars[vin]
+    assert requested == [None]
+
+    data["vehicle_config"]["car_type"] = "models2"
+    data["charge_state"]["battery_level"] = 12
+    await _controller._get_and_process_car_data(vin)
+    assert requested[-1] == ";".join(VEHICLE_DATA_ENDPOINTS["idle"])
+    assert _car.battery_level == 12
+    assert (
+        _controller.get_raw_vehicle_data(vin)["vehicle_config"]
+        == VEHICLE_DATA["vehicle_config"]
+    )
+
+    data["drive_state"]["shift_state"] = "D"
+    await _controller._get_and_process_car_data(vin)
+    await _controller._get_and_process_car_data(vin)
+    assert requested[-1] == ";".join(VEHICLE_DATA_ENDPOINTS["driving"])
+    assert _car.is_in_gear
+    assert _controller.get_raw_vehicle_data(vin)["climate_state"]
+
+    _controller.set_last_wake_up_time(vin=vin, timestamp=time.time() + 1)
+    await _controller._get_and_process_car_data(vin)
+    assert requested[-1] == ";".join(VEHICLE_DATA_ENDPOINTS["wake"])
+    assert _controller.get_raw_vehicle_data(vin)["vehicle_config"]["car_type"] == (
+        "models2"
+    )
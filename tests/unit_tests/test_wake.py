@@ -0,0 +1,79 @@
+"""Test the wake coordinator."""
+
+import asyncio
+import time
+
+import pytest
+
+from teslajsonpy.controller import Controller
+from teslajsonpy.wake import WakeCoordinator
+
+from tests.tesla_mock import TeslaMock, VIN
+
+
+@pytest.mark.asyncio
+async def test_shared_wake_signaled(monkeypatch):
+    """Test callers share one WAKE_UP that ends when the car is reported online."""
+    TeslaMock(monkeypatch)
+    _controller = Controller(None)
+    await _controller.connect()
+    await _controller.generate_car_objects()
+    _controller.set_car_online(vin=VIN, online_status=False)
+    sent = []
+
+    async def _api(self, name, path_vars=None, wake_if_asleep=False, **kwargs):
+        # pylint: disable=unused-argument
+        sent.append(name)
+        return {"response": {"state": "asleep"}}
+
+    monkeypatch.setattr(Controller, "api", _api)
+    car_id = _controller.cars[VIN].id
+    start = time.monotonic()
+    wakes = [asyncio.ensure_future(_controller.wake_up(car_id)) for _ in range(3)]
+    await asyncio.sleep(0.05)
+    # e.g., a product list refresh or a streaming frame
+    _controller.set_car_online(vin=VIN)
+    assert await asyncio.gather(*wakes) == [True, True, True]
+
+    assert time.monotonic() - start < 0.5
+    assert sent == ["WAKE_UP"]
+    stats = _controller.get_wake_stats()[VIN]
+    assert stats.wakes == 1
+    assert stats.shared == 2
+    assert stats.probes == 0
+    assert not stats.in_progress
+    assert stats.as_dict()["last_seconds"] < 0.5
+
+
+@pytest.mark.asyncio
+async def test_wake_probes_with_backoff():
+    """Test probes back off and a car that never wakes fails the wake."""
+    coordinator = WakeCoordinator(
+        timeout=0.35, interval=0.02, max_interval=0.08, backoff=2
+    )
+    probes = []
+    online = False
+
+    async def _send():
+        pass
+
+    async def _probe():
+        nonlocal online
+        probes.append(time.monotonic())
+        online = len(probes) == 3
+
+    assert await coordinator.wake(VIN, _send, _probe, lambda: online)
+    gaps = [later - earlier for earlier, later in zip(probes, probes[1:])]
+    assert gaps[1] > gaps[0]
+
+    online = False
+    probes.clear()
+    assert not await coordinator.wake(VIN, _send, _probe, lambda: False)
+    stats = coordinator.stats()[VIN]
+    assert stats.wakes == 1
+    assert stats.failures == 1
+    assert stats.probes == 3 + len(probes)
+    # Later wakes wait about half the usual wake time before probing
+    assert coordinator._first_interval(coordinator._states[VIN]) == max(
+        0.02, stats.mean_seconds / 2
+    )